@@ -1,19 +1,115 @@
-"""Main AI player using Alpha-Beta search."""
+"""Main AI player using Alpha-Beta (or MCTS) search."""
+import json
 import time
-from typing import List, Tuple
+from typing import List, Tuple, Optional
 from argparse import ArgumentParser
 
 from client import ClientSocket
 from game_state import GameState, Move
-from alphabeta import find_best_move
+from alphabeta import AlphaBetaSearch
+from mcts import MCTSSearch
+from evaluation import EVALUATIONS
+from recorder import GameRecorder
+from slow_turns import SlowTurnCapture, PROFILERS, THRESHOLD_FACTOR
+from metrics import PlayerMetrics, MetricsServer
+from preprocess import DEFAULT_CACHE_DIR, MapAnalysis, load_or_analyze
+from opening_book import OpeningBook
+from memory import GCMonitor, freeze_heap, collect_between_turns
+from search_worker import SearchWorker
+
+
+# Search engines selectable from the command line, all sharing the
+# (max_depth, time_limit) constructor and search(state) interface
+ENGINES = {
+    "alphabeta": AlphaBetaSearch,
+    "mcts": MCTSSearch,
+}
+# Seconds after compute_move starts by which a move must be decided (the
+# server allows 2), unless the time limit itself is longer
+TURN_DEADLINE = 1.95
 
 
 class AIPlayer:
     """AI Player for Vampires VS Werewolves game."""
     
-    def __init__(self, name: str = "AlphaBetaAI"):
+    def __init__(self, name: str = "AlphaBetaAI", engine: str = "alphabeta",
+                 max_depth: int = 4, time_limit: float = 1.8, pooled: bool = False,
+                 evaluation: str = "default", record_path: Optional[str] = None,
+                 profile_path: Optional[str] = None, slow_turn_dir: Optional[str] = None,
+                 slow_turn_threshold: Optional[float] = None, slow_turn_profiler: str = "sample",
+                 metrics_port: Optional[int] = None, preprocess_budget: float = 0.1,
+                 map_cache_dir=None, book_path: Optional[str] = None,
+                 worker: bool = False, planner: bool = False, prune_splits: bool = False,
+                 gc_report: bool = False):
         self.name = name
         self.game_state = GameState()
+        self.engine = engine
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.pooled = pooled
+        self.evaluation = evaluation
+        if pooled and engine != "alphabeta":
+            raise ValueError("Pooled search mode requires the alphabeta engine")
+        if evaluation != "default" and engine != "alphabeta":
+            raise ValueError("Evaluation variants require the alphabeta engine")
+        if profile_path and engine != "alphabeta":
+            raise ValueError("Search profiling requires the alphabeta engine")
+        if (planner or prune_splits) and engine != "alphabeta":
+            raise ValueError("The coarse planner and split pruning require the alphabeta engine")
+        if worker and slow_turn_dir:
+            raise ValueError("Slow-turn capture requires the in-process search")
+        engine_options = {"pooled": True} if pooled else {}
+        if evaluation != "default":
+            engine_options["evaluate"] = EVALUATIONS[evaluation]
+        if profile_path:
+            engine_options["profile"] = True
+        if planner:
+            engine_options["planner"] = True
+        if prune_splits:
+            engine_options["prune_splits"] = True
+        # One searcher for the whole game, so pooled buffers survive between turns
+        self.searcher = ENGINES[engine](max_depth=max_depth, time_limit=time_limit, **engine_options)
+        self.engine_options = engine_options
+        # Persistent search process started after MAP (see search_worker.py)
+        self.use_worker = worker
+        self.worker: Optional[SearchWorker] = None
+        # Engine of the last in-process search (None after a worker search)
+        self.last_search = None
+        self.last_turn_stats = {}
+        # perf_counter() timestamp at which the last move was decided
+        self.move_decided_at: Optional[float] = None
+        # GC pauses per turn, watched only in pooled mode or when reported
+        # (the callback is process-wide and runs on every collection)
+        self.gc_monitor: Optional[GCMonitor] = None
+        if pooled or gc_report:
+            self.gc_monitor = GCMonitor()
+            self.gc_monitor.install()
+        # Optional binary log of the game (see recorder.py)
+        self.recorder = GameRecorder(record_path) if record_path else None
+        # Optional JSON-lines log of the search profile, one record per turn
+        self.profile_log = open(profile_path, "a") if profile_path else None
+        self.turns_computed = 0
+        # Optional profiling of every search, kept only for turns over the threshold
+        # (default: THRESHOLD_FACTOR times the time limit)
+        if slow_turn_threshold is None:
+            slow_turn_threshold = time_limit * THRESHOLD_FACTOR
+        self.slow_turns = (SlowTurnCapture(slow_turn_dir, slow_turn_threshold, profiler=slow_turn_profiler)
+                           if slow_turn_dir else None)
+        # Static map tables built between MAP and the first UPD (see preprocess.py)
+        self.preprocess_budget = preprocess_budget
+        self.map_cache_dir = map_cache_dir
+        self.map_analysis: Optional[MapAnalysis] = None
+        # Opening book consulted before searching (see opening_book.py)
+        self.book = OpeningBook.load(book_path) if book_path else None
+        # Turn telemetry, served over HTTP when a metrics port is given
+        # (the search caches are counted from each turn's stats, which also come back from the worker)
+        self.metrics = PlayerMetrics()
+        if self.book is not None:
+            self.metrics.add_cache("opening_book", lambda: (self.book.hits, self.book.misses))
+        self.metrics_server = None
+        if metrics_port is not None:
+            self.metrics_server = MetricsServer(self.metrics, port=metrics_port).start()
+            print(f"Metrics on http://127.0.0.1:{self.metrics_server.port}/metrics")
     
     def update_from_message(self, message: List):
         """Update game state from server message."""
@@ -38,44 +134,119 @@ class AIPlayer:
             humans = []  # Will be populated from map data
             home = list(self.game_state.home_position) if self.game_state.home_position else [0, 0]
             self.game_state.initialize_from_messages(size, humans, home, data)
+            if self.preprocess_budget > 0:
+                self.map_analysis = load_or_analyze(self.game_state, self.preprocess_budget, self.map_cache_dir)
+            if self.use_worker:
+                if self.worker is not None:
+                    self.worker.close()
+                self.worker = SearchWorker(self.game_state.rows, self.game_state.cols, ENGINES[self.engine],
+                                           self.max_depth, self.time_limit, **self.engine_options)
+                print(f"Search worker started: {self.worker}, round trip {self.worker.ping() * 1e6:.0f}us")
+            if self.pooled:
+                # Setup objects live for the whole game: keep them out of collections
+                freeze_heap()
         elif tag == "upd":
             self.game_state.update_from_upd(data)
+        
+        if self.recorder is not None:
+            self.recorder.record_message(message, self.game_state)
     
     def compute_move(self) -> Tuple[int, List[Tuple[int, int, int, int, int]]]:
         """
-        Compute best move using Alpha-Beta search.
+        Compute best move using the selected search engine.
         
         Returns:
             Tuple of (number_of_moves, list_of_moves)
         """
         print(f"\n{self.game_state}")
         print("Computing move...")
+        self.last_turn_stats = {}
         
         # Edge case: We have no units (eliminated)
         our_count = self.game_state.get_total_count(self.game_state.our_species) if self.game_state.our_species else 0
         if our_count == 0:
             print("Warning: No units remaining, sending empty move")
+            self.move_decided_at = time.perf_counter()
             return 0, []
         
         # Edge case: Opponent not yet initialized (shouldn't happen but be safe)
         if self.game_state.opponent_species is None:
             print("Warning: Opponent not initialized yet, using fallback")
+            self.metrics.count_fallback()
             best_moves = self.get_fallback_move()
+            self.move_decided_at = time.perf_counter()
             move_tuples = [move.to_tuple() for move in best_moves]
             return len(move_tuples), move_tuples
         
         start_time = time.time()
+        turn_started = time.perf_counter()
         
-        # Use Alpha-Beta to find best move
-        best_moves = find_best_move(self.game_state, max_depth=4, time_limit=1.8)
+        if self.book is not None:
+            hit = self.book.lookup(self.game_state)
+            if hit is not None:
+                best_moves, depth = hit
+                elapsed = time.time() - start_time
+                self.last_turn_stats = {"book": True, "depth": depth, "nodes": 0, "time": elapsed,
+                                        "move_time": elapsed}
+                self.turns_computed += 1
+                self.metrics.observe_turn(self.last_turn_stats, elapsed)
+                self.move_decided_at = time.perf_counter()
+                move_tuples = [move.to_tuple() for move in best_moves]
+                print(f"Book move (searched to depth {depth}): {move_tuples}")
+                return len(move_tuples), move_tuples
+        
+        if self.gc_monitor is not None:
+            self.gc_monitor.reset()
+        
+        # Use the selected search engine to find best move
+        search_stats = None
+        if self.worker is not None:
+            deadline = turn_started + max(TURN_DEADLINE, self.time_limit)
+            try:
+                best_moves = self.worker.search(self.game_state, deadline=deadline)
+            except (TimeoutError, RuntimeError):
+                # Later turns search in process
+                self.worker.close()
+                self.worker = None
+                raise
+            search_stats = self.worker.stats
+            self.last_search = None
+            print(f"Worker dispatch {search_stats['dispatch_latency'] * 1e6:.0f}us "
+                  f"({search_stats['changed_cells']} cells), return {search_stats['return_latency'] * 1e6:.0f}us")
+        elif self.slow_turns is None:
+            best_moves = self.searcher.search(self.game_state)
+        else:
+            best_moves = self.slow_turns.run(self.searcher.search, self.game_state,
+                                             {"turn": self.turns_computed + 1, "engine": self.engine,
+                                              "max_depth": self.max_depth, "time_limit": self.time_limit,
+                                              "evaluation": self.evaluation})
+        if self.worker is None:
+            self.last_search = self.searcher
         
         elapsed = time.time() - start_time
+        if search_stats is None:
+            search_stats = self.searcher.stats
+        self.last_turn_stats = dict(search_stats, move_time=elapsed)
+        if self.gc_monitor is not None:
+            self.last_turn_stats.update(self.gc_monitor.snapshot())
+        self.turns_computed += 1
+        self.metrics.observe_turn(self.last_turn_stats, elapsed)
         print(f"Move computed in {elapsed:.3f}s")
+        if self.profile_log is not None and "profile" in self.last_turn_stats:
+            record = dict(self.last_turn_stats["profile"], turn=self.turns_computed, move_time=elapsed)
+            self.profile_log.write(json.dumps(record) + "\n")
+            self.profile_log.flush()
+        if self.gc_monitor is not None:
+            print(f"GC during turn: {self.gc_monitor.collections} collections, "
+                  f"{self.gc_monitor.pause_time * 1000:.2f}ms paused "
+                  f"(max {self.gc_monitor.max_pause * 1000:.2f}ms)")
         
         if not best_moves:
             # No valid moves found, try to make at least one move
-            print("Warning: No moves found by Alpha-Beta, using fallback")
+            print("Warning: No moves found by search, using fallback")
+            self.metrics.count_fallback()
             best_moves = self.get_fallback_move()
+        self.move_decided_at = time.perf_counter()
         
         # Convert to protocol format
         move_tuples = [move.to_tuple() for move in best_moves]
@@ -83,18 +254,70 @@ class AIPlayer:
         
         return len(move_tuples), move_tuples
     
+    def record_move_sent(self, moves: List[Tuple[int, int, int, int, int]], sent_at: Optional[float],
+                         fallback: bool = False):
+        """
+        Log the move actually sent and the delay between deciding it and handing it to the socket.
+        
+        Called from the send path, so the game record holds what the server
+        got: a search abandoned by a watchdog records nothing, and the
+        fallback sent instead is recorded without search stats.
+        
+        Args:
+            moves: Move tuples of the MOV
+            sent_at: perf_counter() timestamp taken once the MOV was sent
+            fallback: The MOV is get_fallback_move(), not the searched move
+        """
+        if self.recorder is not None:
+            self.recorder.record_move(moves, {} if fallback else self.last_turn_stats)
+        if fallback or sent_at is None or self.move_decided_at is None:
+            return
+        latency = sent_at - self.move_decided_at
+        self.last_turn_stats["send_latency"] = latency
+        print(f"Move on the wire {latency * 1000:.3f}ms after decision")
+    
+    def end_turn(self):
+        """Housekeeping once our move is sent, while the opponent thinks."""
+        if self.pooled:
+            elapsed = collect_between_turns()
+            print(f"Collected garbage between turns in {elapsed * 1000:.2f}ms")
+    
+    def close(self):
+        """Release process-wide hooks (the GC callback), finish the logs and stop the metrics server and worker."""
+        if self.gc_monitor is not None:
+            self.gc_monitor.uninstall()
+        if self.worker is not None:
+            self.worker.close()
+            self.worker = None
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.profile_log is not None:
+            self.profile_log.close()
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+    
     def get_fallback_move(self) -> List[Move]:
-        """Get a simple fallback move if Alpha-Beta fails."""
+        """Get a simple fallback move if the search fails."""
         groups = self.game_state.get_our_groups()
         
         if not groups:
             return []
         
-        # Just move from the largest group to an adjacent cell
+        # Move from the largest group
         groups.sort(key=lambda g: g[2], reverse=True)
         x, y, count = groups[0]
         
-        # Try to move to an adjacent cell
+        # Follow the map's flow field towards the best human cluster, unless
+        # the step lands on a group we cannot beat for sure
+        step = self.map_analysis.next_step(x, y) if self.map_analysis is not None else None
+        if step is not None:
+            target = self.game_state.board[step[0]][step[1]]
+            enemy = target.get_count(self.game_state.opponent_species) if self.game_state.opponent_species else 0
+            if target.humans <= count and enemy * 1.5 <= count:
+                return [Move(x, y, step[0], step[1], count)]
+        
+        # Otherwise move half of it to an adjacent cell
         for dx, dy in GameState.DIRECTIONS:
             new_x, new_y = x + dx, y + dy
             if 0 <= new_x < self.game_state.rows and 0 <= new_y < self.game_state.cols:
@@ -103,9 +326,29 @@ class AIPlayer:
         return []
 
 
+def player_from_args(args) -> AIPlayer:
+    """Build the player from the command-line options (missing ones take their defaults)."""
+    return AIPlayer(name="AlphaBetaAI_v1", engine=args.engine,
+                    max_depth=args.depth, time_limit=args.time_limit, pooled=args.pooled,
+                    evaluation=getattr(args, "evaluation", "default"),
+                    record_path=getattr(args, "record", None),
+                    profile_path=getattr(args, "profile", None),
+                    slow_turn_dir=getattr(args, "slow_turn_dir", None),
+                    slow_turn_threshold=getattr(args, "slow_turn_threshold", None),
+                    slow_turn_profiler=getattr(args, "slow_turn_profiler", "sample"),
+                    metrics_port=getattr(args, "metrics_port", None),
+                    preprocess_budget=getattr(args, "preprocess_budget", 0.1),
+                    map_cache_dir=getattr(args, "map_cache_dir", None),
+                    book_path=getattr(args, "book", None),
+                    worker=getattr(args, "worker", False),
+                    planner=getattr(args, "planner", False),
+                    prune_splits=getattr(args, "prune_splits", False),
+                    gc_report=getattr(args, "gc_report", False))
+
+
 def play_game(args):
     """Main game loop."""
-    player = AIPlayer(name="AlphaBetaAI_v1")
+    player = player_from_args(args)
     client_socket = ClientSocket(args.ip, args.port)
     
     # Send name
@@ -119,6 +362,14 @@ def play_game(args):
     
     print("Game initialized, starting main loop...")
     
+    try:
+        play_turns(player, client_socket)
+    finally:
+        player.close()
+
+
+def play_turns(player: AIPlayer, client_socket: ClientSocket):
+    """Read server messages and answer every UPD until the game ends."""
     # Main game loop
     turn = 0
     while True:
@@ -139,15 +390,20 @@ def play_game(args):
             try:
                 nb_moves, moves = player.compute_move()
                 client_socket.send_mov(nb_moves, moves)
+                player.record_move_sent(moves, client_socket.last_sent_at)
+                player.end_turn()
             except Exception as e:
                 print(f"Error computing move: {e}")
                 import traceback
                 traceback.print_exc()
+                player.metrics.count_exception()
                 # Try fallback
                 fallback = player.get_fallback_move()
                 if fallback:
+                    player.metrics.count_fallback()
                     move_tuples = [m.to_tuple() for m in fallback]
                     client_socket.send_mov(len(move_tuples), move_tuples)
+                    player.record_move_sent(move_tuples, client_socket.last_sent_at, fallback=True)
         
         elif message[0] == "end":
             print("\nGame ended!")
@@ -158,11 +414,56 @@ if __name__ == "__main__":
     parser = ArgumentParser(description="Vampires VS Werewolves AI Player")
     parser.add_argument("ip", nargs="?", default="localhost", help="Server IP address")
     parser.add_argument("port", nargs="?", default=5555, type=int, help="Server port")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default="alphabeta",
+                        help="Search engine (default: alphabeta)")
+    parser.add_argument("--depth", type=int, default=4, help="Maximum search depth")
+    parser.add_argument("--time-limit", type=float, default=1.8,
+                        help="Search time limit per move in seconds")
+    parser.add_argument("--evaluation", choices=sorted(EVALUATIONS), default="default",
+                        help="Evaluation variant (alphabeta only)")
+    parser.add_argument("--record", default=None,
+                        help="Write a binary game record to this file (see ai/recorder.py)")
+    parser.add_argument("--profile", default=None,
+                        help="Append a JSON search profile per turn to this file (alphabeta only)")
+    parser.add_argument("--slow-turn-dir", default=None,
+                        help="Profile each search and keep the position and profile of slow turns here")
+    parser.add_argument("--slow-turn-threshold", type=float, default=None,
+                        help=f"Search time in seconds above which a turn is captured "
+                             f"(default: {THRESHOLD_FACTOR} x --time-limit)")
+    parser.add_argument("--slow-turn-profiler", choices=PROFILERS, default="sample",
+                        help="Profiler of --slow-turn-dir: stack sampling, or cProfile (slower searches)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="Serve Prometheus metrics on http://127.0.0.1:PORT/metrics (0: any free port)")
+    parser.add_argument("--preprocess-budget", type=float, default=0.1,
+                        help="Seconds of map preprocessing after MAP (0 disables; see --map-cache-dir)")
+    parser.add_argument("--map-cache-dir", nargs="?", const=str(DEFAULT_CACHE_DIR), default=None,
+                        help=f"Cache the map tables on disk (default directory with no value: {DEFAULT_CACHE_DIR})")
+    parser.add_argument("--book", default=None,
+                        help="Opening book file (see ai/opening_book.py); books/openings.vvb ships with the repo")
+    parser.add_argument("--pooled", action="store_true",
+                        help="Allocation-light search: pooled buffers, no automatic GC during search")
+    parser.add_argument("--planner", action="store_true",
+                        help="Restrict our moves to the coarse planner's objectives on large maps (alphabeta only)")
+    parser.add_argument("--prune-splits", action="store_true",
+                        help="Also drop splits too small to convert or kill anything (heuristic, alphabeta only)")
+    parser.add_argument("--gc-report", action="store_true",
+                        help="Report garbage collection pauses per turn (always on with --pooled)")
+    parser.add_argument("--worker", action="store_true",
+                        help="Search in a persistent process fed through shared memory (ai/search_worker.py)")
+    parser.add_argument("--asyncio", action="store_true",
+                        help="asyncio client: keep reading the socket while the search runs")
+    parser.add_argument("--deadline", type=float, default=1.95,
+                        help="With --asyncio, send the fallback move if no move is ready after this many seconds")
     
     args = parser.parse_args()
     
     try:
-        play_game(args)
+        if args.asyncio:
+            import asyncio
+            from async_client import play_game_async
+            asyncio.run(play_game_async(args))
+        else:
+            play_game(args)
     except KeyboardInterrupt:
         print("\nGame interrupted by user")
     except Exception as e:
@@ -1,27 +1,131 @@
 """Alpha-Beta pruning search algorithm."""
-from typing import List, Tuple, Optional
+from typing import Callable, Dict, List, Tuple, Optional, Union
 import time
+from functools import partial
 from game_state import GameState, Move
-from move_generator import generate_all_moves, apply_move_to_state
+from move_generator import (generate_all_moves, apply_move_to_state, order_moves, is_quiet_move, prune_moves,
+                            MOVE_CACHE_STATS, PRUNE_RULES, DEFAULT_PRUNE_RULES)
 from evaluation import evaluate_state
+from memory import StatePool, AllocationCounter, gc_paused
+from search_profile import SearchProfiler
+from endgame import EndgameSolver, WIN, PROOF_SCOPE, is_endgame, evaluate_endgame
+from planner import Planner, MacroPlans, PLANNER_MIN_CELLS, TOP_PLANS
+
+# Width of the null window used to test reduced-depth moves against alpha/beta
+NULL_WINDOW = 1e-3
+# Share of the time limit the endgame solver may use before the search
+ENDGAME_SOLVE_SHARE = 0.3
 
 
 class AlphaBetaSearch:
     """Alpha-Beta pruning search with iterative deepening."""
     
-    def __init__(self, max_depth: int = 4, time_limit: float = 1.8):
+    def __init__(self, max_depth: int = 4, time_limit: float = 1.8,
+                 lmr: bool = True, lmr_min_depth: int = 3, lmr_full_moves: int = 4,
+                 lmr_reduction: int = 1,
+                 probcut: bool = False, probcut_min_depth: int = 3,
+                 probcut_margin: float = 300.0, probcut_reduction: int = 2,
+                 pooled: bool = False,
+                 evaluate: Optional[Callable[[GameState], float]] = None,
+                 profile: bool = False, endgame: bool = True,
+                 planner: bool = False, planner_min_cells: int = PLANNER_MIN_CELLS,
+                 plan_width: int = TOP_PLANS, move_cache: bool = True, prune: bool = True,
+                 prune_splits: bool = False):
         """
         Initialize Alpha-Beta search.
         
         Args:
             max_depth: Maximum search depth
             time_limit: Time limit in seconds (default 1.8s to stay under 2s)
+            lmr: Enable late move reductions
+            lmr_min_depth: Minimum remaining depth at which moves are reduced
+            lmr_full_moves: Number of moves searched at full depth before reducing
+            lmr_reduction: Plies removed from late quiet moves
+            probcut: Enable ProbCut-style pruning of clearly won/lost nodes
+            probcut_min_depth: Minimum remaining depth at which ProbCut is tried
+            probcut_margin: Evaluation margin beyond beta (or below alpha) that
+                counts as clearly winning (or losing)
+            probcut_reduction: Plies removed for the ProbCut verification search
+            pooled: Allocation-light mode: reuse per-ply state and move-list
+                buffers and keep automatic garbage collection off during search
+            evaluate: Leaf evaluation function (default evaluate_state; an
+                explicit one is kept in endgame positions too)
+            profile: Time each search phase and count per-ply events; the
+                record of the last search is stats["profile"]
+            endgame: Without humans left, evaluate with evaluate_endgame
+                (unless evaluate was given) and try the endgame solver first
+                (see endgame.py); a proven win is played without searching.
+                The outcome is stats["endgame"], whose "proof_scope" names
+                the move generator the proof covers: opponent replies outside
+                it (several moves in one turn) are not proven
+            planner: On boards of at least planner_min_cells cells, search
+                only our moves consistent with the top plan_width macro
+                plans (see planner.py); the opponent's replies are never
+                restricted. The plans are stats["planner"]
+            move_cache: Regenerate only the moves of the cells changed since
+                the parent node (see generate_all_moves); the per-cell
+                reuse counts are stats["move_cache"]
+            prune: Drop dominated and duplicate move combinations before
+                searching them (see prune_moves); removals per rule are
+                counted in stats["pruning"] (root removals under "root")
+                and summed in stats["move_pruning"] with the branching
+                factor before and after
+            prune_splits: Also drop pointless splits (heuristic, off by default)
+        
+        Raises:
+            ValueError: A reduction that does not shorten the search
+                (probcut_reduction below 1, lmr_reduction below 0)
         """
+        if probcut_reduction < 1:
+            raise ValueError(f"probcut_reduction must be at least 1, got {probcut_reduction}")
+        if lmr_reduction < 0:
+            raise ValueError(f"lmr_reduction must not be negative, got {lmr_reduction}")
         self.max_depth = max_depth
         self.time_limit = time_limit
+        self.lmr = lmr
+        self.lmr_min_depth = lmr_min_depth
+        self.lmr_full_moves = lmr_full_moves
+        self.lmr_reduction = lmr_reduction
+        self.probcut = probcut
+        self.probcut_min_depth = probcut_min_depth
+        self.probcut_margin = probcut_margin
+        self.probcut_reduction = probcut_reduction
+        self.pooled = pooled
+        self.evaluate = evaluate if evaluate is not None else evaluate_state
+        # Endgame mode switches to evaluate_endgame only for the default evaluation
+        self.endgame_evaluate = evaluate_endgame if evaluate is None else self.evaluate
+        self.pool: Optional[StatePool] = None
         self.nodes_explored = 0
         self.start_time = 0.0
         self.best_move_found: Optional[List[Move]] = None
+        self.completed_depth = 0
+        # Per remaining-depth counters: {depth: {counter: n}}, root move pruning under "root"
+        self.pruning_stats: Dict[Union[int, str], Dict[str, int]] = {}
+        self.stats = {}
+        # Hot-path hooks, replaced by timed versions when profiling
+        self._generate_moves = generate_all_moves if move_cache else partial(generate_all_moves, cache=False)
+        self.move_cache = move_cache
+        self._order_moves = order_moves
+        self._apply_move = apply_move_to_state
+        # Evaluation of the current search (evaluate, or evaluate_endgame)
+        self._leaf_evaluate = self.evaluate
+        self._evaluate = self.evaluate
+        self.endgame = endgame
+        self.endgame_solver = EndgameSolver()
+        self.planner = Planner(plan_width) if planner else None
+        self.planner_min_cells = planner_min_cells
+        # Plans of the current search (None when not planning)
+        self._plans: Optional[MacroPlans] = None
+        self.planned_out = 0
+        self.prune = prune
+        self.prune_rules = PRUNE_RULES if prune_splits else DEFAULT_PRUNE_RULES
+        # Move combinations generated and searched after pruning
+        self.moves_before_pruning = 0
+        self.moves_after_pruning = 0
+        self.profiler: Optional[SearchProfiler] = None
+        if profile:
+            self.profiler = SearchProfiler()
+            self.profiler.instrument(self)
     
     def search(self, state: GameState) -> List[Move]:
         """
@@ -33,19 +137,69 @@ class AlphaBetaSearch:
         Returns:
             Best move combination found
         """
+        if not self.pooled:
+            return self._search(state)
+        
+        if self.pool is None or not self.pool.fits(state):
+            self.pool = StatePool(state.rows, state.cols, self.max_depth + 1)
+        self.pool.ensure(self.max_depth + 1)
+        with gc_paused():
+            return self._search(state)
+    
+    def _search(self, state: GameState) -> List[Move]:
+        """Iterative deepening driver behind search()."""
+        allocations = AllocationCounter()
+        allocations.start()
         self.start_time = time.time()
         self.nodes_explored = 0
         self.best_move_found = None
+        self.pruning_stats = {}
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.reset()
+        cache_start = dict(MOVE_CACHE_STATS)
+        
+        self._plans = None
+        self.planned_out = 0
+        self.moves_before_pruning = self.moves_after_pruning = 0
+        if self.planner is not None and state.rows * state.cols >= self.planner_min_cells:
+            self._plans = self.planner.plans(state)
         
         # Generate all possible moves
-        all_moves = generate_all_moves(state, for_opponent=False)
+        all_moves = self._generate_moves(state, for_opponent=False)
+        if self._plans is not None:
+            all_moves = self._restrict(state, all_moves)
+        if self.prune:
+            all_moves = self._prune(state, all_moves, False, "root")
+        all_moves = self._order_moves(state, all_moves, for_opponent=False)
         
         if not all_moves:
             return []
         
-        # Iterative deepening
         completed_depth = 0
-        for depth in range(1, self.max_depth + 1):
+        endgame = self.endgame and is_endgame(state)
+        self._leaf_evaluate = self.endgame_evaluate if endgame else self.evaluate
+        if profiler is None:
+            self._evaluate = self._leaf_evaluate
+        endgame_stats = None
+        max_depth = self.max_depth
+        if endgame:
+            endgame_stats = {"solved": False, "result": None, "plies": 0, "solve_time": 0.0, "positions": 0,
+                             "memo_hits": 0, "proof_scope": PROOF_SCOPE}
+            if self.endgame_solver.applicable(state):
+                solved = self.endgame_solver.solve(state, self.time_limit * ENDGAME_SOLVE_SHARE)
+                endgame_stats = solved.to_dict()
+                if solved.result == WIN:
+                    # Proven win against every generate_all_moves reply: no need to search
+                    self.best_move_found = solved.move
+                    completed_depth = solved.plies
+                    max_depth = 0
+        
+        # Iterative deepening
+        # Per completed depth: elapsed time and nodes at completion
+        depth_times: List[float] = []
+        depth_nodes: List[int] = []
+        for depth in range(1, max_depth + 1):
             if self.out_of_time():
                 break
             
@@ -54,16 +208,53 @@ class AlphaBetaSearch:
                 if best_move:
                     self.best_move_found = best_move
                     completed_depth = depth
-                    print(f"Depth {depth}: value={value:.2f}, nodes={self.nodes_explored}")
+                    # Search the previous best move first at the next depth
+                    all_moves.remove(best_move)
+                    all_moves.insert(0, best_move)
+                    depth_times.append(time.time() - self.start_time)
+                    depth_nodes.append(self.nodes_explored)
+                    if profiler is not None:
+                        profiler.iteration(depth, value, self.nodes_explored, depth_times[-1])
             except TimeoutError:
+                if profiler is not None:
+                    profiler.timeout()
                 break
         
         elapsed = time.time() - self.start_time
-        print(f"Search complete: depth={completed_depth}, nodes={self.nodes_explored}, time={elapsed:.3f}s")
+        self.completed_depth = completed_depth
+        self.stats = {
+            "depth": completed_depth,
+            "nodes": self.nodes_explored,
+            "time": elapsed,
+            "nodes_per_sec": self.nodes_explored / elapsed if elapsed > 0 else 0.0,
+            "pruning": self.pruning_stats,
+            "depth_times": depth_times,
+            "depth_nodes": depth_nodes,
+        }
+        if endgame_stats is not None:
+            self.stats["endgame"] = endgame_stats
+        if self._plans is not None:
+            self.stats["planner"] = dict(self._plans.to_dict(), cached=self.planner.last_cached,
+                                         plan_time=self.planner.last_time, moves_pruned=self.planned_out)
+        if self.prune:
+            removed = {rule: sum(counters.get(rule, 0) for counters in self.pruning_stats.values())
+                       for rule in PRUNE_RULES}
+            self.stats["move_pruning"] = dict(
+                removed, generated=self.moves_before_pruning, searched=self.moves_after_pruning,
+                branching_reduction=(1 - self.moves_after_pruning / self.moves_before_pruning
+                                     if self.moves_before_pruning else 0.0))
+        if self.move_cache:
+            counts = {key: MOVE_CACHE_STATS[key] - cache_start[key] for key in cache_start}
+            cells = sum(counts.values())
+            counts["reuse_ratio"] = (cells - counts["generated"]) / cells if cells else 0.0
+            self.stats["move_cache"] = counts
+        self.stats.update(allocations.stop(self.nodes_explored))
+        if profiler is not None:
+            self.stats["profile"] = profiler.record(self.stats)
         
         return self.best_move_found if self.best_move_found else all_moves[0]
     
-    def alpha_beta_root(self, state: GameState, depth: int, 
+    def alpha_beta_root(self, state: GameState, depth: int,
                        moves: List[List[Move]]) -> Tuple[float, Optional[List[Move]]]:
         """
         Root level alpha-beta search.
@@ -85,8 +276,8 @@ class AlphaBetaSearch:
             if self.out_of_time():
                 raise TimeoutError()
             
-            new_state = apply_move_to_state(state, move_combo, for_opponent=False)
-            value = self.alpha_beta(new_state, depth - 1, alpha, beta, False)
+            new_state = self._apply_move(state, move_combo, for_opponent=False, out=self._buffer(1))
+            value = self.alpha_beta(new_state, depth - 1, alpha, beta, False, 1)
             
             if value > best_value:
                 best_value = value
@@ -96,8 +287,8 @@ class AlphaBetaSearch:
         
         return best_value, best_move
     
-    def alpha_beta(self, state: GameState, depth: int, alpha: float, 
-                   beta: float, maximizing: bool) -> float:
+    def alpha_beta(self, state: GameState, depth: int, alpha: float,
+                   beta: float, maximizing: bool, ply: int = 1) -> float:
         """
         Alpha-Beta pruning algorithm.
         
@@ -107,6 +298,7 @@ class AlphaBetaSearch:
             alpha: Alpha value for pruning
             beta: Beta value for pruning
             maximizing: True if maximizing player, False if minimizing
+            ply: Distance from the root (selects the pooled buffers)
             
         Returns:
             Evaluation value of the state
@@ -118,49 +310,153 @@ class AlphaBetaSearch:
         
         # Terminal conditions
         if depth == 0 or state.is_terminal():
-            return evaluate_state(state)
+            return self._evaluate(state)
+        
+        if self.probcut and depth >= self.probcut_min_depth:
+            cut = self.probcut_test(state, depth, alpha, beta, maximizing, ply)
+            if cut is not None:
+                return cut
+        
+        for_opponent = not maximizing
+        moves = self._generate_moves(state, for_opponent=for_opponent,
+                                     out=self.pool.moves(ply) if self.pooled else None)
+        
+        if not moves:
+            return self._evaluate(state)
+        
+        if self._plans is not None and maximizing:
+            moves = self._restrict(state, moves)
+        if self.prune:
+            moves = self._prune(state, moves, for_opponent, depth)
+        self._order_moves(state, moves, for_opponent)
+        reduce_late = self.lmr and depth >= self.lmr_min_depth
+        child_ply = ply + 1
+        child_buffer = self._buffer(child_ply)
         
         if maximizing:
             # Our turn (maximizing)
             value = float('-inf')
-            moves = generate_all_moves(state, for_opponent=False)
+            for index, move_combo in enumerate(moves):
+                new_state = self._apply_move(state, move_combo, for_opponent=False, out=child_buffer)
             
-            if not moves:
-                return evaluate_state(state)
+                if (reduce_late and index >= self.lmr_full_moves
+                        and is_quiet_move(state, move_combo, for_opponent=False)):
+                    # Late quiet move: prove it cannot beat alpha at reduced depth
+                    self._count(depth, "reductions")
+                    score = self.alpha_beta(new_state, max(0, depth - 1 - self.lmr_reduction),
+                                            alpha, alpha + NULL_WINDOW, False, child_ply)
+                    if score > alpha:
+                        self._count(depth, "re_searches")
+                        score = self.alpha_beta(new_state, depth - 1, alpha, beta, False, child_ply)
+                else:
+                    score = self.alpha_beta(new_state, depth - 1, alpha, beta, False, child_ply)
             
-            for move_combo in moves:
-                new_state = apply_move_to_state(state, move_combo, for_opponent=False)
-                value = max(value, self.alpha_beta(new_state, depth - 1, alpha, beta, False))
+                value = max(value, score)
                 alpha = max(alpha, value)
                 
                 if beta <= alpha:
+                    if self.profiler is not None:
+                        self.profiler.cutoff(ply, index)
                     break  # Beta cutoff
             
             return value
         else:
             # Opponent's turn (minimizing)
             value = float('inf')
-            moves = generate_all_moves(state, for_opponent=True)
+            for index, move_combo in enumerate(moves):
+                new_state = self._apply_move(state, move_combo, for_opponent=True, out=child_buffer)
             
-            if not moves:
-                return evaluate_state(state)
+                if (reduce_late and index >= self.lmr_full_moves
+                        and is_quiet_move(state, move_combo, for_opponent=True)):
+                    # Late quiet move: prove it cannot get under beta at reduced depth
+                    self._count(depth, "reductions")
+                    score = self.alpha_beta(new_state, max(0, depth - 1 - self.lmr_reduction),
+                                            beta - NULL_WINDOW, beta, True, child_ply)
+                    if score < beta:
+                        self._count(depth, "re_searches")
+                        score = self.alpha_beta(new_state, depth - 1, alpha, beta, True, child_ply)
+                else:
+                    score = self.alpha_beta(new_state, depth - 1, alpha, beta, True, child_ply)
             
-            for move_combo in moves:
-                new_state = apply_move_to_state(state, move_combo, for_opponent=True)
-                value = min(value, self.alpha_beta(new_state, depth - 1, alpha, beta, True))
+                value = min(value, score)
                 beta = min(beta, value)
                 
                 if beta <= alpha:
+                    if self.profiler is not None:
+                        self.profiler.cutoff(ply, index)
                     break  # Alpha cutoff
             
             return value
     
+    def probcut_test(self, state: GameState, depth: int, alpha: float,
+                     beta: float, maximizing: bool, ply: int = 1) -> Optional[float]:
+        """
+        ProbCut-style forward pruning for clearly decided nodes.
+        
+        When the static evaluation is far beyond the window, a reduced-depth
+        null-window search verifies that the node stays beyond the margin;
+        if it does, the node is cut without a full-depth search.
+        
+        Returns:
+            The bound to return for a cut node, or None to search normally
+        """
+        static = self._evaluate(state)
+        if maximizing and beta != float('inf'):
+            bound = beta + self.probcut_margin
+            if static < bound:
+                return None
+            self._count(depth, "probcut_tries")
+            score = self.alpha_beta(state, max(0, depth - self.probcut_reduction),
+                                    bound - NULL_WINDOW, bound, True, ply)
+            if score >= bound:
+                self._count(depth, "probcut_cuts")
+                return beta
+        elif not maximizing and alpha != float('-inf'):
+            bound = alpha - self.probcut_margin
+            if static > bound:
+                return None
+            self._count(depth, "probcut_tries")
+            score = self.alpha_beta(state, max(0, depth - self.probcut_reduction),
+                                    bound, bound + NULL_WINDOW, False, ply)
+            if score <= bound:
+                self._count(depth, "probcut_cuts")
+                return alpha
+        return None
+    
+    def _buffer(self, ply: int) -> Optional[GameState]:
+        """Get the pooled child-state buffer for a ply (None when not pooled)."""
+        if not self.pooled:
+            return None
+        self.pool.ensure(ply)
+        return self.pool.state(ply)
+    
+    def _restrict(self, state: GameState, moves: List[List[Move]]) -> List[List[Move]]:
+        """Keep our moves consistent with the current plans, counting the others."""
+        kept = self._plans.restrict(state, moves)
+        self.planned_out += len(moves) - len(kept)
+        return kept
+    
+    def _prune(self, state: GameState, moves: List[List[Move]], for_opponent: bool,
+               depth: Union[int, str]) -> List[List[Move]]:
+        """Drop dominated and duplicate moves, counting removals per rule at this depth."""
+        kept = prune_moves(state, moves, for_opponent, self.pruning_stats.setdefault(depth, {}),
+                           self.prune_rules)
+        self.moves_before_pruning += len(moves)
+        self.moves_after_pruning += len(kept)
+        return kept
+    
+    def _count(self, depth: int, counter: str):
+        """Increment a per-depth pruning counter."""
+        counters = self.pruning_stats.setdefault(depth, {})
+        counters[counter] = counters.get(counter, 0) + 1
+    
     def out_of_time(self) -> bool:
         """Check if we've exceeded time limit."""
         return (time.time() - self.start_time) >= self.time_limit
 
 
-def find_best_move(state: GameState, max_depth: int = 4, time_limit: float = 1.8) -> List[Move]:
+def find_best_move(state: GameState, max_depth: int = 4, time_limit: float = 1.8,
+                   stats: Optional[dict] = None) -> List[Move]:
     """
     Find the best move using Alpha-Beta search.
     
@@ -168,9 +464,13 @@ def find_best_move(state: GameState, max_depth: int = 4, time_limit: float = 1.8
         state: Current game state
         max_depth: Maximum search depth
         time_limit: Time limit in seconds
+        stats: Optional dict updated with the search statistics
         
     Returns:
         Best move combination
     """
     searcher = AlphaBetaSearch(max_depth=max_depth, time_limit=time_limit)
-    return searcher.search(state)
+    moves = searcher.search(state)
+    if stats is not None:
+        stats.update(searcher.stats)
+    return moves
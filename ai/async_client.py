@@ -0,0 +1,252 @@
+"""asyncio game client: the search runs in an executor while the socket keeps being read."""
+import asyncio
+import socket
+import struct
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+import config
+from client import EndException, ByeException, MAX_MOVES, MOVE_STRUCT, bytes_to_int
+
+
+class AsyncClientSocket:
+    """asyncio counterpart of ClientSocket with the same message shapes."""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._send_buffer = bytearray(b"MOV" + bytes(1 + MOVE_STRUCT.size * MAX_MOVES))
+        # perf_counter() timestamp of the last MOV handed to the transport
+        self.last_sent_at: Optional[float] = None
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    @classmethod
+    async def connect(cls, ip: str = config.SERVER_IP, port: int = config.SERVER_PORT) -> "AsyncClientSocket":
+        reader, writer = await asyncio.open_connection(ip, port)
+        return cls(reader, writer)
+
+    async def _get_message(self, length: int) -> int:
+        return bytes_to_int(await self._reader.readexactly(length))
+
+    async def _get_cells(self, size: int) -> List[tuple]:
+        """Read a count byte followed by that many cells of size bytes."""
+        nb = await self._get_message(1)
+        return list(struct.iter_unpack(f"{size}B", await self._reader.readexactly(size * nb)))
+
+    async def _parse_message(self) -> List:
+        command = (await self._reader.readexactly(3)).decode()
+        if command == "END":
+            raise EndException()
+        if command == "BYE":
+            raise ByeException()
+        elif command not in ["SET", "HUM", "HME", "MAP", "UPD"]:
+            raise ValueError("Command unknown")
+
+        if command == "SET":
+            return ["set", list(await self._reader.readexactly(2))]
+        if command == "HUM":
+            return ["hum", [list(cell) for cell in await self._get_cells(2)]]
+        if command == "HME":
+            return ["hme", list(await self._reader.readexactly(2))]
+        if command == "MAP":
+            return ["map", await self._get_cells(5)]
+        if command == "UPD":
+            return ["upd", await self._get_cells(5)]
+
+    async def get_message(self) -> Optional[List]:
+        """Next message, or None once the connection is closed."""
+        try:
+            return await self._parse_message()
+        except (asyncio.IncompleteReadError, OSError):
+            return None
+
+    async def send_nme(self, name: str):
+        encoded = name.encode()
+        self._writer.write(b"NME" + bytes([len(encoded)]) + encoded)
+        await self._writer.drain()
+
+    async def send_mov(self, nb_moves: int, moves):
+        if nb_moves > MAX_MOVES:
+            raise ValueError(f"At most {MAX_MOVES} moves fit in a MOV message")
+        buffer = self._send_buffer
+        buffer[3] = nb_moves
+        offset = 4
+        for move in moves:
+            MOVE_STRUCT.pack_into(buffer, offset, *move)
+            offset += MOVE_STRUCT.size
+        # write() copies the bytes, so the buffer can be reused right away
+        self._writer.write(buffer[:offset])
+        self.last_sent_at = time.perf_counter()
+        await self._writer.drain()
+
+    async def close(self):
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except OSError:
+            pass
+
+
+async def read_messages(client: AsyncClientSocket, queue: asyncio.Queue):
+    """
+    Forward every server message to a queue until the game is over.
+
+    END and BYE are queued as ["end", None] / ["bye", None] and a closed
+    connection as None, so the game loop sees them even mid-search.
+    """
+    while True:
+        try:
+            message = await client.get_message()
+        except EndException:
+            await queue.put(["end", None])
+            return
+        except ByeException:
+            await queue.put(["bye", None])
+            return
+        await queue.put(message)
+        if message is None:
+            return
+
+
+class AsyncGame:
+    """
+    Game loop that overlaps I/O with search.
+
+    compute_move runs on a single worker thread while the event loop keeps
+    reading the socket. A watchdog sends the fallback move if the search has
+    not answered by the deadline, and END/BYE stop the game even while a
+    search is running.
+    """
+
+    def __init__(self, player, client: AsyncClientSocket, deadline: float = 1.95):
+        """
+        Args:
+            player: AIPlayer (anything with update_from_message, compute_move,
+                get_fallback_move, record_move_sent, end_turn and metrics)
+            client: Connected AsyncClientSocket
+            deadline: Seconds after an UPD by which a move must be sent
+        """
+        self.player = player
+        self.client = client
+        self.deadline = deadline
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.turn = 0
+        self.watchdog_fallbacks = 0
+        self._search: Optional[asyncio.Future] = None
+        # Messages read while watching for END during a search, oldest first
+        self._held: deque = deque()
+
+    async def run(self):
+        """Play until END, BYE or a closed connection."""
+        await self.client.send_nme(self.player.name)
+        print(f"Connected as {self.player.name}")
+        reader = asyncio.create_task(read_messages(self.client, self.messages))
+        try:
+            while True:
+                message = await self.next_message()
+                # The turn clock starts when the UPD is taken, before any wait for an abandoned search
+                received = time.perf_counter()
+                if not message:
+                    print("No message received, ending game")
+                    break
+                if message[0] in ("end", "bye"):
+                    print("\nGame ended!")
+                    break
+
+                if self._search is not None and not self._search.done():
+                    # A search abandoned by the watchdog still reads the player's state
+                    await asyncio.wait([self._search])
+                self.player.update_from_message(message)
+                if message[0] == "upd":
+                    self.turn += 1
+                    print(f"\n{'='*60}")
+                    print(f"Turn {self.turn}")
+                    print(f"{'='*60}")
+                    if not await self.play_turn(received):
+                        break
+        finally:
+            reader.cancel()
+            self.executor.shutdown(wait=False)
+            await self.client.close()
+
+    async def play_turn(self, started: Optional[float] = None) -> bool:
+        """
+        Search and send one move.
+        
+        Args:
+            started: perf_counter() time the turn's UPD was taken (default:
+                now); the deadline counts from there
+
+        Returns:
+            False if the game ended while searching
+        """
+        if started is None:
+            started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        self._search = loop.run_in_executor(self.executor, self.player.compute_move)
+
+        remaining = max(0.0, self.deadline - (time.perf_counter() - started))
+        interrupt = asyncio.ensure_future(self._peek_game_over())
+        done, _ = await asyncio.wait([self._search, interrupt], timeout=remaining,
+                                     return_when=asyncio.FIRST_COMPLETED)
+        if interrupt in done:
+            print("\nGame ended during search")
+            return False
+        interrupt.cancel()
+
+        if self._search in done:
+            try:
+                nb_moves, moves = self._search.result()
+            except Exception as e:
+                print(f"Error computing move: {e}")
+                self.player.metrics.count_exception()
+                await self.send_fallback()
+                return True
+            await self.client.send_mov(nb_moves, moves)
+            self.player.record_move_sent(moves, self.client.last_sent_at)
+            self.player.end_turn()
+        else:
+            print(f"Watchdog: no move after {self.deadline:.2f}s, sending fallback")
+            self.watchdog_fallbacks += 1
+            await self.send_fallback()
+        return True
+
+    async def send_fallback(self):
+        fallback = self.player.get_fallback_move()
+        if fallback:
+            self.player.metrics.count_fallback()
+            move_tuples = [m.to_tuple() for m in fallback]
+            await self.client.send_mov(len(move_tuples), move_tuples)
+            self.player.record_move_sent(move_tuples, self.client.last_sent_at, fallback=True)
+
+    async def next_message(self):
+        """Next server message: the held ones first, then the queue."""
+        if self._held:
+            return self._held.popleft()
+        return await self.messages.get()
+    
+    async def _peek_game_over(self):
+        """Wait for a message that ends the game; anything else is held, in order, for later."""
+        while True:
+            message = await self.messages.get()
+            if not message or message[0] in ("end", "bye"):
+                return message
+            self._held.append(message)
+
+
+async def play_game_async(args):
+    """asyncio equivalent of ai_player.play_game."""
+    from ai_player import player_from_args
+
+    player = player_from_args(args)
+    client = await AsyncClientSocket.connect(args.ip, args.port)
+    game = AsyncGame(player, client, deadline=args.deadline)
+    try:
+        await game.run()
+    finally:
+        player.close()
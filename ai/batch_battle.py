@@ -0,0 +1,159 @@
+"""Vectorized Monte Carlo battle simulation using NumPy binomial draws.
+
+Requires NumPy, which is optional for the rest of the AI: import this module
+lazily (inside a try/except ImportError) from code that must run without it.
+"""
+from typing import Optional, Tuple, Union
+import numpy as np
+
+ArrayLike = Union[int, np.ndarray]
+
+
+def make_rng(seed: Optional[int] = None) -> np.random.Generator:
+    """Create a seeded NumPy random generator."""
+    return np.random.default_rng(seed)
+
+
+def battle_probabilities(attackers: ArrayLike, defenders: ArrayLike) -> np.ndarray:
+    """
+    Vectorized calculate_battle_probability.
+
+    Args:
+        attackers: Number(s) of attacking creatures
+        defenders: Number(s) of defending creatures
+
+    Returns:
+        Array of probabilities that attackers win (may exceed 1.0, as in
+        the scalar version; callers clip when drawing)
+    """
+    e1 = np.asarray(attackers, dtype=np.float64)
+    e2 = np.asarray(defenders, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        weaker = e1 / (2.0 * e2)
+        stronger = 0.5 + (e1 - e2) / (2.0 * e2)
+    return np.where(e1 == e2, 0.5, np.where(e1 < e2, weaker, stronger))
+
+
+def simulate_battles(attackers: ArrayLike, defenders: ArrayLike, is_human: bool = False,
+                     n: Optional[int] = None,
+                     rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resolve many battles at once, with the same distribution as simulate_battle.
+
+    Each battle costs four draws (outcome, attacker survivors, converted
+    humans, defender survivors) instead of one random() call per creature.
+
+    Args:
+        attackers: Attacker count, or array of counts (one per battle)
+        defenders: Defender count, or array of counts (one per battle)
+        is_human: Whether defenders are humans (survivors are converted)
+        n: Number of battles when attackers and defenders are scalars
+        rng: NumPy generator (a fresh unseeded one is used if None)
+
+    Returns:
+        Tuple of arrays (surviving_attackers, surviving_defenders)
+    """
+    surviving_attackers, surviving_defenders, _ = _resolve_battles(
+        attackers, defenders, is_human, n, rng)
+    return surviving_attackers, surviving_defenders
+
+
+def _resolve_battles(attackers: ArrayLike, defenders: ArrayLike, is_human: bool,
+                     n: Optional[int], rng: Optional[np.random.Generator]
+                     ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Resolve battles and also return the boolean array of attacker wins."""
+    if rng is None:
+        rng = make_rng()
+    attackers = np.asarray(attackers, dtype=np.int64)
+    defenders = np.asarray(defenders, dtype=np.int64)
+    shape = np.broadcast(attackers, defenders).shape
+    if n is not None:
+        shape = (n,) if shape == () else (n,) + shape
+    attackers = np.broadcast_to(attackers, shape)
+    defenders = np.broadcast_to(defenders, shape)
+
+    win_prob = np.clip(battle_probabilities(attackers, defenders), 0.0, 1.0)
+    wins = rng.random(shape) < win_prob
+
+    survivors = rng.binomial(attackers, win_prob)
+    if is_human:
+        survivors = survivors + rng.binomial(defenders, win_prob)
+    defender_survivors = rng.binomial(defenders, 1.0 - win_prob)
+
+    surviving_attackers = np.where(wins, survivors, 0)
+    surviving_defenders = np.where(wins, 0, defender_survivors)
+    return surviving_attackers, surviving_defenders, wins
+
+
+class BattleSampler:
+    """
+    Drop-in replacement for simulate_battle backed by a seeded NumPy generator.
+
+    Resolves one battle per call with binomial draws, so large battles in
+    rollouts cost a constant number of RNG calls.
+    """
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = make_rng(seed)
+
+    def __call__(self, attackers: int, defenders: int, is_human: bool = False) -> Tuple[int, int]:
+        """Simulate one battle and return (surviving_attackers, surviving_defenders)."""
+        rng = self.rng
+        if attackers == defenders:
+            win_prob = 0.5
+        elif attackers < defenders:
+            win_prob = attackers / (2.0 * defenders)
+        else:
+            win_prob = min(1.0, 0.5 + (attackers - defenders) / (2.0 * defenders))
+
+        if rng.random() < win_prob:
+            survivors = int(rng.binomial(attackers, win_prob))
+            if is_human:
+                survivors += int(rng.binomial(defenders, win_prob))
+            return survivors, 0
+        return 0, int(rng.binomial(defenders, 1.0 - win_prob))
+
+
+def battle_odds(attackers: int, defenders: int, is_human: bool = False,
+                n: int = 100000, seed: Optional[int] = None) -> dict:
+    """
+    Estimate battle odds for an offline study.
+
+    Args:
+        attackers: Number of attacking creatures
+        defenders: Number of defending creatures
+        is_human: Whether defenders are humans
+        n: Number of simulated battles
+        seed: Optional seed
+
+    Returns:
+        Dict with win rate and mean survivors on each side
+    """
+    surviving_attackers, surviving_defenders, wins = _resolve_battles(
+        attackers, defenders, is_human, n, make_rng(seed))
+    return {
+        "attackers": attackers,
+        "defenders": defenders,
+        "is_human": is_human,
+        "battles": n,
+        "win_rate": float(np.mean(wins)),
+        "mean_attackers": float(np.mean(surviving_attackers)),
+        "mean_defenders": float(np.mean(surviving_defenders)),
+        "mean_attackers_if_win": float(np.mean(surviving_attackers[wins])) if wins.any() else 0.0,
+    }
+
+
+if __name__ == "__main__":
+    from argparse import ArgumentParser
+
+    parser = ArgumentParser(description="Monte Carlo battle odds")
+    parser.add_argument("attackers", type=int)
+    parser.add_argument("defenders", type=int)
+    parser.add_argument("--human", action="store_true", help="Defenders are humans")
+    parser.add_argument("--n", type=int, default=100000, help="Number of simulated battles")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    odds = battle_odds(args.attackers, args.defenders, args.human, args.n, args.seed)
+    for key, value in odds.items():
+        print(f"{key}: {value}")
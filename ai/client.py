@@ -1,8 +1,17 @@
 import socket
-from typing import List
+import struct
+import time
+from typing import List, Optional
 
 import config
 
+# Largest protocol message is a MAP/UPD with 255 cells: 3 + 1 + 255 * 5 bytes
+BUFFER_SIZE = 4096
+
+# A MOV message is "MOV", a move count byte and up to 255 moves of 5 bytes
+MAX_MOVES = 255
+MOVE_STRUCT = struct.Struct("5B")
+
 
 class EndException(Exception):
     pass
@@ -21,12 +30,31 @@ def bytes_to_int(data: bytes) -> int:
 
 
 class ClientSocket:
-    def __init__(self, ip: str = config.SERVER_IP, port: int = config.SERVER_PORT):
-        self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    def __init__(self, ip: str = config.SERVER_IP, port: int = config.SERVER_PORT,
+                 sock: Optional[socket.socket] = None):
+        # Receive buffer: bytes [_start, _end) have been received but not parsed yet
+        self._buffer = bytearray(BUFFER_SIZE)
+        self._view = memoryview(self._buffer)
+        self._start = 0
+        self._end = 0
+        # Reused MOV buffer, the command bytes are written once
+        self._send_buffer = bytearray(b"MOV" + bytes(1 + MOVE_STRUCT.size * MAX_MOVES))
+        self._send_view = memoryview(self._send_buffer)
+        # perf_counter() timestamp of the last MOV handed to the kernel
+        self.last_sent_at: Optional[float] = None
         self._ip = ip
         self._port = port
-        self._connected = False
-        self.connect_to_server(self._ip, self._port)
+        if sock is not None:
+            # Already connected socket (e.g. one end of a socketpair)
+            self._socket = sock
+            self._connected = True
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._connected = False
+            self.connect_to_server(self._ip, self._port)
+        if self._socket.family in (socket.AF_INET, socket.AF_INET6):
+            # MOV and NME are tiny packets: don't let Nagle's algorithm hold them back
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
         print(f"socket: {self._socket}")
 
 
@@ -35,21 +63,45 @@ class ClientSocket:
             self._socket.connect((ip, port))
             self._connected = True
 
-    def _get_command(self) -> str:
+    def _read(self, length: int) -> memoryview:
+        """
+        Take the next length bytes from the receive buffer.
+
+        Refills the buffer with recv_into, which reads whatever the server has
+        already sent, so a whole message usually costs a single syscall. The
+        returned view is only valid until the next read.
+        """
         if not self._connected:
             self.connect_to_server(self._ip, self._port)
-        data = bytes()
-        while len(data) < 3:
-            data += self._socket.recv(3 - len(data))
-        return data.decode()
+        if length > BUFFER_SIZE:
+            raise ValueError(f"Message of {length} bytes exceeds the receive buffer")
+        if self._end - self._start < length:
+            if self._start + length > BUFFER_SIZE:
+                # Move the unread tail to the front to make room
+                pending = self._end - self._start
+                self._view[:pending] = self._view[self._start:self._end]
+                self._start, self._end = 0, pending
+            while self._end - self._start < length:
+                received = self._socket.recv_into(self._view[self._end:])
+                if received == 0:
+                    raise ConnectionError("Server closed the connection")
+                self._end += received
+        data = self._view[self._start:self._start + length]
+        self._start += length
+        if self._start == self._end:
+            self._start = self._end = 0
+        return data
+
+    def _get_command(self) -> str:
+        return bytes(self._read(3)).decode()
 
     def _get_message(self, length: int) -> int:
-        if not self._connected:
-            self.connect_to_server(self._ip, self._port)
-        data: bytes = bytes()
-        while len(data) < length:
-            data += self._socket.recv(1 - len(data))
-        return bytes_to_int(data)
+        return bytes_to_int(self._read(length))
+
+    def _get_cells(self) -> List[tuple]:
+        """Read a count byte followed by that many (x, y, humans, vampires, werewolves) cells."""
+        nb = self._get_message(1)
+        return list(struct.iter_unpack("5B", self._read(5 * nb)))
 
     def _parse_message(self) -> List:
         command: str = self._get_command()
@@ -64,30 +116,17 @@ class ClientSocket:
             return ["set", [self._get_message(1), self._get_message(1)]]
 
         if command == "HUM":
-            humans = []
             nb = self._get_message(1)
-            for i in range(nb):
-                humans.append([self._get_message(1), self._get_message(1)])
-            return ["hum", humans]
+            return ["hum", [list(cell) for cell in struct.iter_unpack("2B", self._read(2 * nb))]]
 
         if command == "HME":
             return ["hme", [self._get_message(1), self._get_message(1)]]
 
         if command == "MAP":
-            map = []
-            nb = self._get_message(1)
-            for i in range(nb):
-                map.append((self._get_message(1), self._get_message(1), self._get_message(1), self._get_message(1),
-                            self._get_message(1)))
-            return ["map", map]
+            return ["map", self._get_cells()]
 
         if command == "UPD":
-            upd = []
-            nb = self._get_message(1)
-            for i in range(nb):
-                upd.append((self._get_message(1), self._get_message(1), self._get_message(1), self._get_message(1),
-                            self._get_message(1)))
-            return ["upd", upd]
+            return ["upd", self._get_cells()]
 
     def get_message(self) -> List:
         try:
@@ -106,12 +145,18 @@ class ClientSocket:
             print("trying to connect to server")
             self.connect_to_server(self._ip, self._port)
 
-        self._socket.send("NME".encode() + bytes([len(name)]) + name.encode())
+        encoded = name.encode()
+        self._socket.sendall(b"NME" + bytes([len(encoded)]) + encoded)
 
     def send_mov(self, nb_moves: int, moves):
-        message = bytes([nb_moves])
+        if nb_moves > MAX_MOVES:
+            raise ValueError(f"At most {MAX_MOVES} moves fit in a MOV message")
+        buffer = self._send_buffer
+        buffer[3] = nb_moves
+        offset = 4
         for move in moves:
-            for data in move:
-                message += bytes([data])
+            MOVE_STRUCT.pack_into(buffer, offset, *move)
+            offset += MOVE_STRUCT.size
 
-        self._socket.send("MOV".encode() + message)
+        self._socket.sendall(self._send_view[:offset])
+        self.last_sent_at = time.perf_counter()
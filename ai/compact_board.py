@@ -0,0 +1,104 @@
+"""Compact flat-array board for fast, allocation-light simulation."""
+from typing import List, Tuple
+from functools import lru_cache
+from game_state import GameState, Species
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(rows: int, cols: int) -> Tuple[Tuple[int, ...], ...]:
+    """
+    Precompute the 8-directional neighbours of every cell.
+
+    Cells are addressed by flat index: idx = x * cols + y (x=row, y=col).
+
+    Args:
+        rows, cols: Board dimensions
+
+    Returns:
+        Tuple indexed by cell index, each entry a tuple of neighbour indices
+    """
+    table = []
+    for x in range(rows):
+        for y in range(cols):
+            neighbors = []
+            for dx, dy in GameState.DIRECTIONS:
+                nx, ny = x + dx, y + dy
+                if 0 <= nx < rows and 0 <= ny < cols:
+                    neighbors.append(nx * cols + ny)
+            table.append(tuple(neighbors))
+    return tuple(table)
+
+
+class CompactBoard:
+    """
+    Board stored as one flat list of counts per species.
+
+    counts[species][idx] holds the number of creatures of that species in
+    cell idx = x * cols + y. Buffers are allocated once and refilled in
+    place, so a single board can be reused for many simulations.
+    """
+
+    __slots__ = ('rows', 'cols', 'size', 'counts', 'neighbors')
+
+    def __init__(self, rows: int, cols: int):
+        self.rows = rows
+        self.cols = cols
+        self.size = rows * cols
+        self.counts: List[List[int]] = [[0] * self.size for _ in range(3)]
+        self.neighbors = neighbor_table(rows, cols)
+
+    @classmethod
+    def from_state(cls, state: GameState) -> 'CompactBoard':
+        """Build a compact board from a game state."""
+        board = cls(state.rows, state.cols)
+        board.load_state(state)
+        return board
+
+    def load_state(self, state: GameState):
+        """Overwrite this board in place with the contents of a game state."""
+        humans, vampires, werewolves = self.counts
+        idx = 0
+        for row in state.board:
+            for cell in row:
+                humans[idx] = cell.humans
+                vampires[idx] = cell.vampires
+                werewolves[idx] = cell.werewolves
+                idx += 1
+
+    def copy_from(self, other: 'CompactBoard'):
+        """Overwrite this board in place with another board of the same size."""
+        for species in range(3):
+            self.counts[species][:] = other.counts[species]
+
+    def store_into(self, state: GameState):
+        """Write this board back into an existing game state's cells."""
+        humans, vampires, werewolves = self.counts
+        idx = 0
+        for row in state.board:
+            for cell in row:
+                cell.humans = humans[idx]
+                cell.vampires = vampires[idx]
+                cell.werewolves = werewolves[idx]
+                idx += 1
+        state.invalidate_moves()
+
+    def groups(self, species: Species) -> List[int]:
+        """Get indices of all cells holding the given species."""
+        return [idx for idx, count in enumerate(self.counts[species]) if count]
+
+    def total(self, species: Species) -> int:
+        """Get total count of a species on the board."""
+        return sum(self.counts[species])
+
+    def index(self, x: int, y: int) -> int:
+        """Convert (row, col) coordinates to a flat index."""
+        return x * self.cols + y
+
+    def coords(self, idx: int) -> Tuple[int, int]:
+        """Convert a flat index to (row, col) coordinates."""
+        return divmod(idx, self.cols)
+
+    def __repr__(self) -> str:
+        return (f"CompactBoard(rows={self.rows}, cols={self.cols}, "
+                f"H={self.total(Species.HUMAN)} V={self.total(Species.VAMPIRE)} "
+                f"W={self.total(Species.WEREWOLF)})")
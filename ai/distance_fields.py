@@ -0,0 +1,89 @@
+"""
+Distance fields from every cell to the human groups a group can convert.
+
+Humans are converted for sure when the attackers are at least as many, so
+a group of n creatures can win every human group of at most n. For each
+distinct human group size h (a bucket), a field holds the Chebyshev steps
+from every cell to the nearest human group of size <= h. Buckets grow by
+adding sources, so each field is the previous one relaxed by a multi-source
+BFS from the new human groups only.
+
+Cells are flat indices idx = x * cols + y (x=row, y=col), as in
+compact_board. Fields depend only on the human cells: build_fields() is
+cached on them and GameState.human_distance_fields() reuses its fields
+until a human cell changes.
+"""
+from array import array
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from compact_board import neighbor_table
+
+UNREACHABLE = 0xFFFF
+
+
+class HumanDistanceFields:
+    """Per-bucket distance fields of one set of human groups."""
+
+    def __init__(self, rows: int, cols: int, humans: Tuple[Tuple[int, int], ...]):
+        self.rows = rows
+        self.cols = cols
+        # Human groups as (cell index, count)
+        self.humans = humans
+        # Group size needed by each bucket, ascending
+        self.sizes: List[int] = sorted({count for _, count in humans})
+        self.fields: List[array] = []
+
+    def bucket(self, count: int) -> int:
+        """Index of the largest bucket a group of count can convert, or -1."""
+        return bisect_right(self.sizes, count) - 1
+
+    def steps_to_conversion(self, x: int, y: int, count: int) -> Optional[int]:
+        """Steps from (x, y) to the nearest human group a group of count converts for sure."""
+        bucket = bisect_right(self.sizes, count) - 1
+        if bucket < 0:
+            return None
+        return self.fields[bucket][x * self.cols + y]
+
+    def nearest(self, x: int, y: int) -> int:
+        """Steps from (x, y) to the nearest human group of any size."""
+        return self.fields[-1][x * self.cols + y]
+
+    def __repr__(self) -> str:
+        return f"HumanDistanceFields({self.rows}x{self.cols}, humans={len(self.humans)}, sizes={self.sizes})"
+
+
+@lru_cache(maxsize=256)
+def build_fields(rows: int, cols: int, humans: Tuple[Tuple[int, int], ...]) -> HumanDistanceFields:
+    """
+    Build the fields of a set of human groups.
+
+    Args:
+        rows, cols: Board dimensions
+        humans: Non-empty tuple of (cell index, count) human groups
+
+    Returns:
+        The fields, shared by every caller with the same human groups
+    """
+    neighbors = neighbor_table(rows, cols)
+    result = HumanDistanceFields(rows, cols, humans)
+    distances = array("H", [UNREACHABLE]) * (rows * cols)
+    for size in result.sizes:
+        frontier = []
+        for idx, count in humans:
+            if count == size and distances[idx]:
+                distances[idx] = 0
+                frontier.append(idx)
+        steps = 0
+        while frontier:
+            steps += 1
+            next_frontier = []
+            for idx in frontier:
+                for neighbor in neighbors[idx]:
+                    if distances[neighbor] > steps:
+                        distances[neighbor] = steps
+                        next_frontier.append(neighbor)
+            frontier = next_frontier
+        result.fields.append(array("H", distances))
+    return result
@@ -0,0 +1,230 @@
+"""
+Endgame mode: positions without humans.
+
+Once the humans are gone only the pursuit between the two species is left.
+evaluate_endgame() replaces the general evaluation with material plus
+kill threats (1.5x rule) weighted by Chebyshev distance, and EndgameSolver
+tries to prove the result for small group counts.
+
+The solver is an AND/OR proof search with memoization over the engine's
+move model (generate_all_moves, one move per turn). A line is proven only
+through deterministic battles: a move into a random battle (neither side
+at 1.5x) counts as unknown. Results are exact within that move model.
+Memo keys are canonical over the map's symmetries (GameState.symmetries),
+so mirrored positions are proven once.
+"""
+import time
+from typing import Dict, List, Optional, Tuple
+
+from game_state import GameState, Move, transform_cell
+from move_generator import generate_all_moves, apply_move_to_state, order_moves
+
+WIN, UNKNOWN, LOSS = 1, 0, -1
+RESULT_NAMES = {WIN: "win", UNKNOWN: None, LOSS: "loss"}
+
+# What a proof covers: the opponent's replies are those of generate_all_moves
+# (one move per turn); multi-move turns the server also accepts are not
+PROOF_SCOPE = "generate_all_moves"
+# Solver limits: total groups on the board, plies searched, memo entries
+MAX_GROUPS = 4
+MAX_PLIES = 9
+MAX_MEMO = 200_000
+
+
+def is_endgame(state: GameState) -> bool:
+    """True when no humans are left on the board."""
+    return not any(cell.humans for row in state.board for cell in row)
+
+
+def chebyshev_distance(x1: int, y1: int, x2: int, y2: int) -> int:
+    """Moves needed to go from one cell to another (8 directions)."""
+    return max(abs(x1 - x2), abs(y1 - y2))
+
+
+def evaluate_endgame(state: GameState) -> float:
+    """
+    Lean evaluation for positions without humans.
+
+    Material dominates (same scale as evaluate_state); each group that can
+    kill an enemy group outright (1.5x) adds pressure growing as the
+    Chebyshev distance shrinks, and each group that can be killed costs
+    the same.
+    """
+    if state.our_species is None or state.opponent_species is None:
+        return 0.0
+    our_groups = state.get_our_groups()
+    opponent_groups = state.get_opponent_groups()
+    if not our_groups:
+        return -10000.0
+    if not opponent_groups:
+        return 10000.0
+
+    score = (sum(g[2] for g in our_groups) - sum(g[2] for g in opponent_groups)) * 100.0
+    for x, y, count in our_groups:
+        for ox, oy, opponent_count in opponent_groups:
+            distance = max(1, chebyshev_distance(x, y, ox, oy))
+            if count >= 1.5 * opponent_count:
+                score += 30.0 * opponent_count / distance
+            elif opponent_count >= 1.5 * count:
+                score -= 30.0 * count / distance
+    return score
+
+
+def is_deterministic(state: GameState, move_combo: List[Move], for_opponent: bool) -> bool:
+    """Check that every battle of a move combination has a certain outcome."""
+    enemy = state.our_species if for_opponent else state.opponent_species
+    attackers: Dict[Tuple[int, int], int] = {}
+    for move in move_combo:
+        target = (move.x_to, move.y_to)
+        attackers[target] = attackers.get(target, 0) + move.count
+    for (x, y), count in attackers.items():
+        defenders = state.board[x][y].get_count(enemy)
+        if defenders and not (count >= 1.5 * defenders or defenders >= 1.5 * count):
+            return False
+    return True
+
+
+def memo_key(state: GameState, our_groups: tuple, opponent_groups: tuple, our_turn: bool) -> tuple:
+    """Smallest (our groups, opponent groups, our turn) over the state's symmetries."""
+    if len(state.symmetries) == 1:
+        return our_groups, opponent_groups, our_turn
+    rows, cols = state.rows, state.cols
+    best = None
+    for transform in state.symmetries:
+        key = tuple(tuple(sorted(transform_cell(transform, x, y, rows, cols) + (count,)
+                                 for x, y, count in groups))
+                    for groups in (our_groups, opponent_groups))
+        if best is None or key < best:
+            best = key
+    return best + (our_turn,)
+
+
+class SolveResult:
+    """Outcome of EndgameSolver.solve."""
+
+    def __init__(self, result: int, move: Optional[List[Move]], plies: int, elapsed: float, positions: int,
+                 memo_hits: int = 0):
+        self.result = result
+        self.move = move
+        self.plies = plies
+        self.time = elapsed
+        self.positions = positions
+        self.memo_hits = memo_hits
+
+    @property
+    def solved(self) -> bool:
+        return self.result != UNKNOWN
+
+    def to_dict(self) -> dict:
+        return {"solved": self.solved, "result": RESULT_NAMES[self.result], "plies": self.plies,
+                "solve_time": self.time, "positions": self.positions, "memo_hits": self.memo_hits,
+                "proof_scope": PROOF_SCOPE}
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+class EndgameSolver:
+    """
+    Proof search for humanless positions with few groups.
+
+    The memo survives between calls, so positions proven on one turn are
+    answered instantly on the next.
+    """
+
+    def __init__(self, max_groups: int = MAX_GROUPS, max_plies: int = MAX_PLIES):
+        self.max_groups = max_groups
+        self.max_plies = max_plies
+        # (position, our turn) -> (result, plies searched)
+        self.memo: Dict[tuple, Tuple[int, int]] = {}
+        self.positions = 0
+        # Positions answered from the memo, over the solver's lifetime
+        self.memo_hits = 0
+        self._deadline = 0.0
+
+    def applicable(self, state: GameState) -> bool:
+        return (is_endgame(state)
+                and len(state.get_our_groups()) + len(state.get_opponent_groups()) <= self.max_groups)
+
+    def solve(self, state: GameState, time_limit: float) -> SolveResult:
+        """
+        Prove a win or loss for us (to move) within time_limit.
+
+        Iterative deepening on odd plies, so each iteration ends on our move.
+
+        Returns:
+            SolveResult; move is the winning move when result is WIN
+        """
+        start = time.perf_counter()
+        self._deadline = start + time_limit
+        self.positions = 0
+        memo_hits = self.memo_hits
+        if len(self.memo) > MAX_MEMO:
+            self.memo.clear()
+        result, move, plies = UNKNOWN, None, 0
+        try:
+            for depth in range(1, self.max_plies + 1, 2):
+                result, move = self._root(state, depth)
+                plies = depth
+                if result != UNKNOWN:
+                    break
+        except _OutOfTime:
+            pass
+        return SolveResult(result, move, plies, time.perf_counter() - start, self.positions,
+                           self.memo_hits - memo_hits)
+
+    def _root(self, state: GameState, plies: int) -> Tuple[int, Optional[List[Move]]]:
+        moves = order_moves(state, generate_all_moves(state, for_opponent=False), False)
+        all_lost = True
+        for combo in moves:
+            if not is_deterministic(state, combo, False):
+                all_lost = False
+                continue
+            result = self._prove(apply_move_to_state(state, combo, False), plies - 1, False)
+            if result == WIN:
+                return WIN, combo
+            if result != LOSS:
+                all_lost = False
+        return (LOSS if all_lost and moves else UNKNOWN), None
+
+    def _prove(self, state: GameState, plies: int, our_turn: bool) -> int:
+        our_groups = tuple(state.get_our_groups())
+        opponent_groups = tuple(state.get_opponent_groups())
+        if not opponent_groups:
+            return WIN
+        if not our_groups:
+            return LOSS
+        if plies == 0:
+            return UNKNOWN
+        key = memo_key(state, our_groups, opponent_groups, our_turn)
+        known = self.memo.get(key)
+        if known is not None and (known[0] != UNKNOWN or known[1] >= plies):
+            self.memo_hits += 1
+            return known[0]
+
+        self.positions += 1
+        if self.positions & 15 == 0 and time.perf_counter() > self._deadline:
+            raise _OutOfTime()
+
+        for_opponent = not our_turn
+        # Result for the side to move: a good move decides, all bad moves decide the other way
+        good, bad = (WIN, LOSS) if our_turn else (LOSS, WIN)
+        moves = generate_all_moves(state, for_opponent=for_opponent)
+        all_bad = True
+        result = UNKNOWN
+        for combo in order_moves(state, moves, for_opponent):
+            if not is_deterministic(state, combo, for_opponent):
+                all_bad = False
+                continue
+            child = self._prove(apply_move_to_state(state, combo, for_opponent), plies - 1, not our_turn)
+            if child == good:
+                result = good
+                break
+            if child != bad:
+                all_bad = False
+        else:
+            if all_bad:
+                result = bad
+        self.memo[key] = (result, plies)
+        return result
@@ -40,50 +40,31 @@ def evaluate_state(state: GameState) -> float:
     score += len(our_groups) * 10
     score -= len(opponent_groups) * 10
     
-    # 3. Proximity to humans (with risk assessment)
-    human_cells = []
-    for i in range(state.rows):
-        for j in range(state.cols):
-            if state.board[i][j].humans > 0:
-                human_cells.append((i, j, state.board[i][j].humans))
-    
-    if human_cells:
-        # Import here to avoid circular dependency
-        from move_generator import calculate_battle_probability
-        
-        # Evaluate proximity to winnable human groups
+    # 3. Proximity to humans (with risk assessment): steps to the nearest
+    # human group each group converts for sure, from the distance fields
+    fields = state.human_distance_fields()
+    if fields is not None:
         for x, y, count in our_groups:
-            for hx, hy, h_count in human_cells:
-                dist = manhattan_distance(x, y, hx, hy)
-                win_prob = calculate_battle_probability(count, h_count)
-                
-                if dist <= 2:  # Close proximity
-                    if win_prob >= 0.7:
-                        # High confidence win - reward being close
-                        score += 40 / (1 + dist)
-                    elif win_prob >= 0.5:
-                        # Moderate chance - small reward
-                        score += 15 / (1 + dist)
-                    elif win_prob < 0.5:
-                        # Risky or losing - penalize being too close
-                        score -= 50 / (1 + dist)
-                elif dist <= 4 and win_prob >= 0.7:
-                    # Moderate distance to highly winnable target - small bonus
+            steps = fields.steps_to_conversion(x, y, count)
+            if steps is not None:
+                if steps <= 2:
+                    # Sure conversion within reach - reward being close
+                    score += 40 / (1 + steps)
+                elif steps <= 4:
+                    # Moderate distance to a sure conversion - small bonus
                     score += 10
+            nearest = fields.nearest(x, y)
+            if nearest <= 2 and (steps is None or nearest < steps):
+                # A group we cannot convert is closer - penalize being too close
+                score -= 50 / (1 + nearest)
         
         # Same for opponent proximity to humans
         for x, y, count in opponent_groups:
-            for hx, hy, h_count in human_cells:
-                dist = manhattan_distance(x, y, hx, hy)
-                win_prob = calculate_battle_probability(count, h_count)
-                
-                if dist <= 2 and win_prob >= 0.7:
-                    # They have high confidence - penalize heavily
-                    score -= 40 / (1 + dist)
-                elif dist <= 2 and win_prob >= 0.5:
-                    # Moderate threat - penalize
-                    score -= 15 / (1 + dist)
-                elif dist <= 4 and win_prob >= 0.7:
+            steps = fields.steps_to_conversion(x, y, count)
+            if steps is not None:
+                if steps <= 2:
+                    score -= 40 / (1 + steps)
+                elif steps <= 4:
                     score -= 10
     
     # 4. Control of center (strategic advantage)
@@ -116,6 +97,24 @@ def evaluate_state(state: GameState) -> float:
     return score
 
 
+def evaluate_material(state: GameState) -> float:
+    """
+    Material-only evaluation: unit difference, with the same terminal scores.
+    
+    A cheap baseline for comparing evaluation variants.
+    """
+    if state.our_species is None or state.opponent_species is None:
+        return 0.0
+    
+    our_count = state.get_total_count(state.our_species)
+    opponent_count = state.get_total_count(state.opponent_species)
+    if our_count == 0:
+        return -10000.0
+    if opponent_count == 0:
+        return 10000.0
+    return (our_count - opponent_count) * 100.0
+
+
 def manhattan_distance(x1: int, y1: int, x2: int, y2: int) -> int:
     """Calculate Manhattan distance between two points."""
     return abs(x2 - x1) + abs(y2 - y1)
@@ -124,3 +123,10 @@ def manhattan_distance(x1: int, y1: int, x2: int, y2: int) -> int:
 def chebyshev_distance(x1: int, y1: int, x2: int, y2: int) -> int:
     """Calculate Chebyshev distance (king's move distance) between two points."""
     return max(abs(x2 - x1), abs(y2 - y1))
+
+
+# Evaluation variants selectable by name (AIPlayer / tournament configurations)
+EVALUATIONS = {
+    "default": evaluate_state,
+    "material": evaluate_material,
+}
@@ -1,6 +1,8 @@
 """Game state representation and move generation for Vampires VS Werewolves."""
 from typing import List, Tuple, Optional, Dict
 from enum import IntEnum
+from array import array
+from operator import attrgetter
 import copy
 
 
@@ -11,6 +13,11 @@ class Species(IntEnum):
     WEREWOLF = 2
 
 
+# Cell attribute of each species, for whole-board scans
+SPECIES_COUNT = {Species.HUMAN: attrgetter("humans"), Species.VAMPIRE: attrgetter("vampires"),
+                 Species.WEREWOLF: attrgetter("werewolves")}
+
+
 class Cell:
     """Represents a cell on the game board."""
     
@@ -48,9 +55,48 @@ class Cell:
         return f"Cell({self.x},{self.y}: H={self.humans} V={self.vampires} W={self.werewolves})"
 
 
+# Packed move layout (fits an unsigned 32-bit array('I') slot):
+#   bits 0-7   count (the protocol sends counts as one byte)
+#   bits 8-10  direction index into GameState.DIRECTIONS (target = source + direction)
+#   bits 11-31 source cell index (x * cols + y)
+MOVE_DIRECTION_SHIFT = 8
+MOVE_FROM_SHIFT = 11
+MOVE_COUNT_MASK = 0xFF
+MOVE_DIRECTION_MASK = 0x7
+
+# Dihedral transforms of the board, as bit sets applied in this order:
+# TRANSPOSE swaps x and y (square boards only), FLIP_X mirrors the rows
+# (x -> rows - 1 - x), FLIP_Y mirrors the columns. 0 is the identity.
+FLIP_X = 1
+FLIP_Y = 2
+TRANSPOSE = 4
+IDENTITY = 0
+TRANSFORMS = tuple(range(8))
+
+
+def transform_cell(transform: int, x: int, y: int, rows: int, cols: int) -> Tuple[int, int]:
+    """Map cell (x, y) of a rows x cols board through a dihedral transform."""
+    if transform & TRANSPOSE:
+        x, y, rows, cols = y, x, cols, rows
+    if transform & FLIP_X:
+        x = rows - 1 - x
+    if transform & FLIP_Y:
+        y = cols - 1 - y
+    return x, y
+
+
+def inverse_transform(transform: int) -> int:
+    """Transform undoing another (a transpose exchanges the two flips)."""
+    if transform & TRANSPOSE and (transform & FLIP_X) != (transform & FLIP_Y) >> 1:
+        return transform ^ (FLIP_X | FLIP_Y)
+    return transform
+
+
 class Move:
     """Represents a move from one cell to another."""
     
+    __slots__ = ('x_from', 'y_from', 'x_to', 'y_to', 'count')
+    
     def __init__(self, x_from: int, y_from: int, x_to: int, y_to: int, count: int):
         self.x_from = x_from
         self.y_from = y_from
@@ -73,7 +119,7 @@ class Move:
         return f"Move({self.x_from},{self.y_from}→{self.x_to},{self.y_to}:{self.count})"
     
     def __eq__(self, other) -> bool:
-        if not isinstance(other, Move):
+        if other.__class__ is not Move:
             return False
         return (self.x_from == other.x_from and self.y_from == other.y_from and
                 self.x_to == other.x_to and self.y_to == other.y_to and
@@ -81,6 +127,54 @@ class Move:
     
     def __hash__(self) -> int:
         return hash((self.x_from, self.y_from, self.x_to, self.y_to, self.count))
+    
+    def pack(self, cols: int) -> int:
+        """
+        Encode as a packed integer (see MOVE_FROM_SHIFT) for a board with cols columns.
+        
+        Raises:
+            ValueError: The count does not fit the 8-bit count field
+        """
+        if not 0 <= self.count <= MOVE_COUNT_MASK:
+            raise ValueError(f"Cannot pack a move of {self.count} units (at most {MOVE_COUNT_MASK})")
+        direction = _DIRECTION_INDEX[(self.x_to - self.x_from, self.y_to - self.y_from)]
+        return ((self.x_from * cols + self.y_from) << MOVE_FROM_SHIFT
+                | direction << MOVE_DIRECTION_SHIFT | self.count)
+    
+    def transformed(self, transform: int, rows: int, cols: int) -> 'Move':
+        """The same move on the board transformed (rows x cols: the untransformed size)."""
+        x_from, y_from = transform_cell(transform, self.x_from, self.y_from, rows, cols)
+        x_to, y_to = transform_cell(transform, self.x_to, self.y_to, rows, cols)
+        return Move(x_from, y_from, x_to, y_to, self.count)
+    
+    @classmethod
+    def from_packed(cls, code: int, cols: int) -> 'Move':
+        """Decode a packed integer produced by pack() or generate_packed_moves()."""
+        x_from, y_from = divmod(code >> MOVE_FROM_SHIFT, cols)
+        dx, dy = GameState.DIRECTIONS[(code >> MOVE_DIRECTION_SHIFT) & MOVE_DIRECTION_MASK]
+        return cls(x_from, y_from, x_from + dx, y_from + dy, code & MOVE_COUNT_MASK)
+
+
+def packed_move_indices(code: int, cols: int) -> Tuple[int, int, int]:
+    """Decode a packed move to (from_index, to_index, count) flat cell indices."""
+    source = code >> MOVE_FROM_SHIFT
+    dx, dy = GameState.DIRECTIONS[(code >> MOVE_DIRECTION_SHIFT) & MOVE_DIRECTION_MASK]
+    return source, source + dx * cols + dy, code & MOVE_COUNT_MASK
+
+
+def packed_move_to_tuple(code: int, cols: int) -> Tuple[int, int, int, int, int]:
+    """Convert a packed move straight to the server's (col, row, count, col, row) format."""
+    return Move.from_packed(code, cols).to_tuple()
+
+
+def pack_moves(moves: List[Move], cols: int) -> array:
+    """Store a move list compactly in an array('I')."""
+    return array('I', [move.pack(cols) for move in moves])
+
+
+def unpack_moves(codes: array, cols: int) -> List[Move]:
+    """Rebuild Move objects from an array of packed moves."""
+    return [Move.from_packed(code, cols) for code in codes]
 
 
 class GameState:
@@ -96,12 +190,23 @@ class GameState:
         self.our_species: Optional[Species] = None
         self.opponent_species: Optional[Species] = None
         self.home_position: Optional[Tuple[int, int]] = None
+        # Distance fields of the human layout (see human_distance_fields),
+        # stale while _humans_dirty: a human cell may have changed since
+        self._human_fields = None
+        self._humans_dirty = True
+        # Transforms preserving the map's initial human layout (see detect_symmetries)
+        self.symmetries: Tuple[int, ...] = (IDENTITY,)
+        # Per-cell move lists usable by move_generator.generate_all_moves:
+        # {species: ({cell index: (count, moves)}, cells changed since)}
+        self._moves_base: Dict = {}
     
     def initialize_from_messages(self, size: Tuple[int, int], humans: List[List[int]], 
                                   home: List[int], map_data: List[Tuple[int, int, int, int, int]]):
         """Initialize game state from server messages."""
         self.rows, self.cols = size
         self.board = [[Cell(i, j) for j in range(self.cols)] for i in range(self.rows)]
+        self._moves_base = {}
+        self._humans_dirty = True
         self.home_position = (home[0], home[1])
         
         # Set humans
@@ -123,9 +228,13 @@ class GameState:
         elif home_cell.werewolves > 0:
             self.our_species = Species.WEREWOLF
             self.opponent_species = Species.VAMPIRE
+        
+        self.symmetries = self.detect_symmetries()
     
     def update_from_upd(self, updates: List[Tuple[int, int, int, int, int]]):
         """Update game state from UPD message."""
+        self._moves_base = {}
+        self._humans_dirty = True
         for x, y, humans_count, vampires_count, werewolves_count in updates:
             cell = self.board[y][x]
             cell.humans = humans_count
@@ -146,37 +255,29 @@ class GameState:
     
     def get_our_groups(self) -> List[Tuple[int, int, int]]:
         """Get all cells with our species. Returns [(x, y, count), ...]."""
-        groups = []
-        if self.our_species is None:
-            return groups
-        for i in range(self.rows):
-            for j in range(self.cols):
-                cell = self.board[i][j]
-                count = cell.get_count(self.our_species)
-                if count > 0:
-                    groups.append((i, j, count))
-        return groups
+        return self._groups(self.our_species)
     
     def get_opponent_groups(self) -> List[Tuple[int, int, int]]:
         """Get all cells with opponent species. Returns [(x, y, count), ...]."""
+        return self._groups(self.opponent_species)
+    
+    def _groups(self, species: Optional[Species]) -> List[Tuple[int, int, int]]:
         groups = []
-        if self.opponent_species is None:
+        count_of = SPECIES_COUNT.get(species)
+        if count_of is None:
             return groups
-        for i in range(self.rows):
-            for j in range(self.cols):
-                cell = self.board[i][j]
-                count = cell.get_count(self.opponent_species)
+        for i, row in enumerate(self.board):
+            for j, count in enumerate(map(count_of, row)):
                 if count > 0:
                     groups.append((i, j, count))
         return groups
     
     def get_total_count(self, species: Species) -> int:
         """Get total count of a species on the board."""
-        total = 0
-        for i in range(self.rows):
-            for j in range(self.cols):
-                total += self.board[i][j].get_count(species)
-        return total
+        count_of = SPECIES_COUNT.get(species)
+        if count_of is None:
+            return 0
+        return sum(sum(map(count_of, row)) for row in self.board)
     
     def is_terminal(self) -> bool:
         """Check if game is in terminal state (one species eliminated)."""
@@ -186,12 +287,118 @@ class GameState:
         opponent_count = self.get_total_count(self.opponent_species)
         return our_count == 0 or opponent_count == 0
     
+    def human_distance_fields(self):
+        """Get the distance fields to the human groups (distance_fields.HumanDistanceFields).
+        
+        The board is scanned only when a human cell may have changed since
+        the last call (a battle on humans in apply_moves_in_place, a UPD or
+        invalidate_moves()), and the fields are rebuilt only when the human
+        layout differs; clones start with their parent's fields.
+        
+        Returns:
+            The fields, or None when no humans are left
+        """
+        if not self._humans_dirty:
+            return self._human_fields
+        self._humans_dirty = False
+        cols = self.cols
+        humans = tuple((i * cols + j, cell.humans)
+                       for i, row in enumerate(self.board) for j, cell in enumerate(row) if cell.humans)
+        if not humans:
+            self._human_fields = None
+            return None
+        fields = self._human_fields
+        if fields is None or fields.humans != humans or fields.cols != cols:
+            # Import here to avoid circular dependency
+            from distance_fields import build_fields
+            fields = self._human_fields = build_fields(self.rows, cols, humans)
+        return fields
+    
+    def invalidate_moves(self):
+        """Drop the cached per-cell move lists and human fields; needed after editing cells directly."""
+        self._moves_base = {}
+        self._humans_dirty = True
+    
+    def detect_symmetries(self) -> Tuple[int, ...]:
+        """Find the transforms mapping every human group onto a group of the same size.
+        
+        Run once per map on the initial position: positions of that map
+        related by one of these transforms are equivalent, so caches can
+        share their entries (see canonical_transform).
+        """
+        humans = {(i, j): cell.humans for i, row in enumerate(self.board)
+                  for j, cell in enumerate(row) if cell.humans}
+        found = []
+        for transform in TRANSFORMS:
+            if transform & TRANSPOSE and self.rows != self.cols:
+                continue
+            if all(humans.get(transform_cell(transform, x, y, self.rows, self.cols)) == count
+                   for (x, y), count in humans.items()):
+                found.append(transform)
+        return tuple(found)
+    
+    def relative_layout(self, transform: int = IDENTITY) -> Tuple[Tuple[int, ...], ...]:
+        """Occupied cells as sorted (x, y, humans, ours, theirs), after a transform."""
+        our_species, opponent_species = self.our_species, self.opponent_species
+        layout = []
+        for i, row in enumerate(self.board):
+            for j, cell in enumerate(row):
+                if cell.humans or cell.vampires or cell.werewolves:
+                    x, y = transform_cell(transform, i, j, self.rows, self.cols)
+                    layout.append((x, y, cell.humans,
+                                   cell.get_count(our_species) if our_species is not None else 0,
+                                   cell.get_count(opponent_species) if opponent_species is not None else 0))
+        layout.sort()
+        return tuple(layout)
+    
+    def canonical_transform(self) -> int:
+        """Transform among self.symmetries giving the smallest relative_layout.
+        
+        Positions related by a map symmetry share the same canonical
+        orientation, whichever species is ours.
+        """
+        if len(self.symmetries) == 1:
+            return self.symmetries[0]
+        return min(self.symmetries, key=self.relative_layout)
+    
+    def transformed(self, transform: int) -> 'GameState':
+        """Copy of the state seen through a transform (its symmetries reset to the identity)."""
+        rows, cols = (self.cols, self.rows) if transform & TRANSPOSE else (self.rows, self.cols)
+        new_state = GameState(rows, cols)
+        new_state.our_species = self.our_species
+        new_state.opponent_species = self.opponent_species
+        if self.home_position is not None:
+            # home_position is in protocol coordinates (column, row)
+            x, y = transform_cell(transform, self.home_position[1], self.home_position[0], self.rows, self.cols)
+            new_state.home_position = (y, x)
+        for i, row in enumerate(self.board):
+            for j, cell in enumerate(row):
+                if cell.humans or cell.vampires or cell.werewolves:
+                    x, y = transform_cell(transform, i, j, self.rows, self.cols)
+                    target = new_state.board[x][y]
+                    target.humans = cell.humans
+                    target.vampires = cell.vampires
+                    target.werewolves = cell.werewolves
+        return new_state
+    
+    def canonical(self) -> Tuple['GameState', int]:
+        """The state in canonical orientation and the transform leading to it.
+        
+        Moves found on the canonical state map back with
+        move.transformed(inverse_transform(transform), ...) on the canonical size.
+        """
+        transform = self.canonical_transform()
+        return (self.transformed(transform) if transform != IDENTITY else self), transform
+    
     def clone(self) -> 'GameState':
         """Create a deep copy of the game state."""
         new_state = GameState(self.rows, self.cols)
         new_state.our_species = self.our_species
         new_state.opponent_species = self.opponent_species
         new_state.home_position = self.home_position
+        new_state._human_fields = self._human_fields
+        new_state._humans_dirty = self._humans_dirty
+        new_state.symmetries = self.symmetries
         
         for i in range(self.rows):
             for j in range(self.cols):
@@ -201,6 +408,66 @@ class GameState:
         
         return new_state
     
+    def copy_from(self, other: 'GameState'):
+        """Overwrite this state in place with another state of the same size.
+        
+        Unlike clone(), no Cell objects are allocated, so a preallocated
+        state can be reused as a search buffer.
+        """
+        self.our_species = other.our_species
+        self.opponent_species = other.opponent_species
+        self.home_position = other.home_position
+        self._human_fields = other._human_fields
+        self._humans_dirty = other._humans_dirty
+        self.symmetries = other.symmetries
+        self._moves_base = {}
+        
+        for row, other_row in zip(self.board, other.board):
+            for cell, other_cell in zip(row, other_row):
+                cell.humans = other_cell.humans
+                cell.vampires = other_cell.vampires
+                cell.werewolves = other_cell.werewolves
+    
+    def to_dict(self) -> Dict:
+        """Serialize to a JSON-compatible dict (non-empty cells only).
+        
+        Cells are [x, y, humans, vampires, werewolves] in internal
+        coordinates (x=row, y=col). Map symmetries other than the identity
+        are kept under "symmetries".
+        """
+        data = {
+            "rows": self.rows,
+            "cols": self.cols,
+            "our_species": int(self.our_species) if self.our_species is not None else None,
+            "opponent_species": int(self.opponent_species) if self.opponent_species is not None else None,
+            "home_position": list(self.home_position) if self.home_position is not None else None,
+            "cells": [[cell.x, cell.y, cell.humans, cell.vampires, cell.werewolves]
+                      for row in self.board for cell in row
+                      if cell.humans or cell.vampires or cell.werewolves],
+        }
+        if self.symmetries != (IDENTITY,):
+            data["symmetries"] = list(self.symmetries)
+        return data
+    
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'GameState':
+        """Rebuild a state serialized with to_dict()."""
+        state = cls(data["rows"], data["cols"])
+        if data.get("our_species") is not None:
+            state.our_species = Species(data["our_species"])
+        if data.get("opponent_species") is not None:
+            state.opponent_species = Species(data["opponent_species"])
+        if data.get("home_position") is not None:
+            state.home_position = tuple(data["home_position"])
+        if data.get("symmetries"):
+            state.symmetries = tuple(data["symmetries"])
+        for x, y, humans, vampires, werewolves in data["cells"]:
+            cell = state.board[x][y]
+            cell.humans = humans
+            cell.vampires = vampires
+            cell.werewolves = werewolves
+        return state
+    
     def __repr__(self) -> str:
         our_total = self.get_total_count(self.our_species) if self.our_species else 0
         opp_total = self.get_total_count(self.opponent_species) if self.opponent_species else 0
@@ -208,3 +475,7 @@ class GameState:
                 f"our_species={self.our_species}, "
                 f"total_ours={our_total}, "
                 f"total_opponent={opp_total})")
+
+
+# Direction offset -> index into GameState.DIRECTIONS, used by Move.pack
+_DIRECTION_INDEX = {offset: index for index, offset in enumerate(GameState.DIRECTIONS)}
@@ -0,0 +1,173 @@
+"""Game maps in the XML format of the Go server (server/twilight-master/maps)."""
+import random
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import xml.etree.ElementTree as ET
+
+from game_state import Species
+
+# Repository maps/ directory
+MAPS_DIR = Path(__file__).resolve().parent.parent / "maps"
+
+# XML element name for each species
+SPECIES_TAGS = {
+    Species.HUMAN: "Humans",
+    Species.VAMPIRE: "Vampires",
+    Species.WEREWOLF: "Werewolves",
+}
+
+
+class GameMap:
+    """
+    Starting position of a game.
+
+    Coordinates follow the protocol: x is the column, y the row. Each
+    occupied cell maps to [humans, vampires, werewolves], indexed by Species.
+    """
+
+    def __init__(self, rows: int, cols: int, name: str = ""):
+        self.rows = rows
+        self.cols = cols
+        self.name = name
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+
+    def add(self, species: Species, x: int, y: int, count: int):
+        """Put count creatures of a species on cell (x, y)."""
+        if not (0 <= x < self.cols and 0 <= y < self.rows):
+            raise ValueError(f"Cell ({x}, {y}) is outside a {self.rows}x{self.cols} map")
+        self.cells.setdefault((x, y), [0, 0, 0])[species] += count
+
+    def groups(self, species: Species) -> List[Tuple[int, int, int]]:
+        """Get the (x, y, count) groups of a species, sorted like the server's cell index."""
+        return sorted(((x, y, counts[species]) for (x, y), counts in self.cells.items() if counts[species]),
+                      key=lambda group: (group[0], group[1]))
+
+    def to_xml(self) -> str:
+        """Serialize in the server's map format."""
+        lines = ['<?xml version="1.0" encoding="utf-8" ?>',
+                 f'<Map Rows="{self.rows}" Columns="{self.cols}">']
+        for species in (Species.HUMAN, Species.WEREWOLF, Species.VAMPIRE):
+            for x, y, count in self.groups(species):
+                lines.append(f'  <{SPECIES_TAGS[species]} X="{x}" Y="{y}" Count="{count}"/>')
+        lines.append("</Map>")
+        return "\n".join(lines) + "\n"
+
+    def __repr__(self) -> str:
+        return f"GameMap({self.name!r}, rows={self.rows}, cols={self.cols}, cells={len(self.cells)})"
+
+
+def parse_map(data: bytes, name: str = "") -> GameMap:
+    """Parse a map from its XML bytes."""
+    root = ET.fromstring(data)
+    game_map = GameMap(int(root.get("Rows")), int(root.get("Columns")), name)
+    for species, tag in SPECIES_TAGS.items():
+        for node in root.iter(tag):
+            game_map.add(species, int(node.get("X")), int(node.get("Y")), int(node.get("Count")))
+    return game_map
+
+
+def load_map(path) -> GameMap:
+    """
+    Load a map file.
+
+    Args:
+        path: Path to an XML map, or the name of a file in maps/
+    """
+    path = Path(path)
+    if not path.exists() and (MAPS_DIR / path).exists():
+        path = MAPS_DIR / path
+    return parse_map(path.read_bytes(), path.stem)
+
+
+def list_maps(directory=MAPS_DIR) -> List[Path]:
+    """Get the XML map files of a directory."""
+    return sorted(Path(directory).glob("*.xml"))
+
+
+def _symmetric_cell(x: int, y: int, rows: int, cols: int, symmetry: str) -> Tuple[int, int]:
+    """Mirror cell (x=column, y=row) as map_generator.go does."""
+    if symmetry == "diagonal":
+        return y, x
+    if symmetry == "center":
+        return cols - 1 - x, rows - 1 - y
+    return x, rows - 1 - y
+
+
+def generate_map(rows: int, cols: int, humans: int, monsters: int, seed: Optional[int] = None,
+                 name: str = "") -> GameMap:
+    """
+    Generate a random symmetric map, like the Go server's map_generator.go.
+    
+    Human groups come in mirrored pairs of 5 to monsters + 4 humans; each
+    side starts with one group of monsters on mirrored cells. Square maps
+    use an axial, central or diagonal symmetry, others the axial one.
+    
+    Args:
+        rows, cols: Map size
+        humans: Number of human groups (rounded down to an even number)
+        monsters: Size of each starting group
+        seed: Random seed (None for a random map)
+    """
+    rng = random.Random(seed)
+    symmetry = rng.choice(("axial", "center", "diagonal")) if rows == cols else "axial"
+    game_map = GameMap(rows, cols, name or f"generated-{rows}x{cols}-{seed}")
+    place_groups(game_map, rng, humans // 2, lambda: 5 + rng.randrange(monsters), ([monsters], [monsters]),
+                 symmetry)
+    return game_map
+
+
+def place_groups(game_map: GameMap, rng: random.Random, humans: int, human_size: Callable[[], int],
+                 armies: Sequence[Sequence[int]], symmetry: Optional[str] = None):
+    """
+    Scatter human groups and both armies on random free cells of a map.
+    
+    Args:
+        game_map: Map to fill
+        rng: Random generator
+        humans: Number of human groups (of mirrored pairs with a symmetry)
+        human_size: Draws the size of a human group
+        armies: Group sizes of the werewolves and of the vampires
+        symmetry: None, or a symmetry of _symmetric_cell: mirrored human
+            pairs share their size and the vampires' groups mirror the
+            werewolves' (armies[1] is then ignored)
+    
+    Raises:
+        ValueError: The groups do not fit on the map
+    """
+    rows, cols = game_map.rows, game_map.cols
+    cells = [(x, y) for x in range(cols) for y in range(rows)]
+    rng.shuffle(cells)
+    free = set(cells)
+    
+    def mirror(cell):
+        return _symmetric_cell(*cell, rows, cols, symmetry) if symmetry else cell
+    
+    placed = 0
+    for cell in cells:
+        if placed >= humans:
+            break
+        if cell not in free or mirror(cell) not in free:
+            continue
+        count = human_size()
+        for x, y in {cell, mirror(cell)}:
+            game_map.add(Species.HUMAN, x, y, count)
+            free.discard((x, y))
+        placed += 1
+    if placed < humans:
+        raise ValueError(f"{humans} human groups do not fit on a {rows}x{cols} map")
+
+    # Monster groups never share a cell, nor start on their own mirror
+    starts = (cell for cell in cells if cell in free
+              and (not symmetry or mirror(cell) != cell and mirror(cell) in free))
+    groups = [(Species.WEREWOLF, size) for size in armies[0]]
+    if not symmetry:
+        groups += [(Species.VAMPIRE, size) for size in armies[1]]
+    for species, size in groups:
+        cell = next(starts, None)
+        if cell is None:
+            raise ValueError(f"{len(groups)} monster groups do not fit on a {rows}x{cols} map")
+        game_map.add(species, *cell, size)
+        free.discard(cell)
+        if symmetry:
+            game_map.add(Species.VAMPIRE, *mirror(cell), size)
+            free.discard(mirror(cell))
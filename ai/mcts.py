@@ -0,0 +1,290 @@
+"""Monte Carlo Tree Search (UCT) with progressive widening and fast rollouts."""
+from typing import Callable, List, Optional, Tuple
+import math
+import random
+import time
+from game_state import GameState, Move, Species
+from move_generator import generate_all_moves, apply_move_to_state, simulate_battle, order_moves
+from compact_board import CompactBoard
+
+
+class MCTSNode:
+    """A node of the search tree."""
+
+    __slots__ = ('state', 'move', 'parent', 'children', 'untried',
+                 'visits', 'value', 'maximizing', 'depth')
+
+    def __init__(self, state: GameState, move: Optional[List[Move]],
+                 parent: Optional['MCTSNode'], maximizing: bool, depth: int):
+        self.state = state
+        self.move = move
+        self.parent = parent
+        self.children: List['MCTSNode'] = []
+        self.untried: Optional[List[List[Move]]] = None  # Generated on first visit
+        self.visits = 0
+        self.value = 0.0  # Sum of rewards, always from our perspective
+        self.maximizing = maximizing  # True if we are to move in this node
+        self.depth = depth
+
+
+class MCTSSearch:
+    """UCT search with progressive widening and compact-board rollouts."""
+
+    def __init__(self, max_depth: int = 4, time_limit: float = 1.8,
+                 exploration: float = 1.4, widening_c: float = 2.0,
+                 widening_alpha: float = 0.5, rollout_depth: int = 10,
+                 seed: Optional[int] = None,
+                 battle_fn: Optional[Callable[[int, int, bool], Tuple[int, int]]] = None):
+        """
+        Initialize MCTS search.
+
+        Args:
+            max_depth: Maximum depth of the tree (in plies)
+            time_limit: Time limit in seconds (default 1.8s to stay under 2s)
+            exploration: UCT exploration constant
+            widening_c: Progressive widening coefficient
+            widening_alpha: Progressive widening exponent (children <= c * visits^alpha)
+            rollout_depth: Number of plies simulated by each rollout
+            seed: Optional seed for the rollout random generator
+            battle_fn: Battle resolver used by rollouts, with the signature of
+                simulate_battle (e.g. batch_battle.BattleSampler)
+        """
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.widening_c = widening_c
+        self.widening_alpha = widening_alpha
+        self.rollout_depth = rollout_depth
+        self.rng = random.Random(seed)
+        self.battle_fn = battle_fn if battle_fn is not None else simulate_battle
+        self.start_time = 0.0
+        self.playouts = 0
+        self.tree_size = 0
+        self.max_tree_depth = 0
+        self.stats = {}
+        self._scratch: Optional[CompactBoard] = None
+
+    def search(self, state: GameState) -> List[Move]:
+        """
+        Search for the best move using UCT until the deadline.
+
+        Args:
+            state: Current game state
+
+        Returns:
+            Best move combination found (most visited root child)
+        """
+        self.start_time = time.time()
+        self.playouts = 0
+        self.tree_size = 1
+        self.max_tree_depth = 0
+        # Early returns below report no search, not the previous turn's
+        self.stats = {}
+
+        if state.our_species is None or state.opponent_species is None:
+            return []
+
+        root = MCTSNode(state, None, None, True, 0)
+        root.untried = self._ordered_moves(state, for_opponent=False)
+        if not root.untried or root.untried == [[]]:
+            return []
+        if len(root.untried) == 1:
+            return root.untried[0]
+
+        if (self._scratch is None or self._scratch.rows != state.rows
+                or self._scratch.cols != state.cols):
+            self._scratch = CompactBoard(state.rows, state.cols)
+
+        while not self.out_of_time():
+            node = self._select(root)
+            reward = self._evaluate_leaf(node)
+            self._backpropagate(node, reward)
+            self.playouts += 1
+
+        elapsed = max(time.time() - self.start_time, 1e-9)
+        self.stats = {
+            "playouts": self.playouts,
+            "playouts_per_sec": self.playouts / elapsed,
+            "tree_size": self.tree_size,
+            "tree_depth": self.max_tree_depth,
+            "time": elapsed,
+        }
+
+        if not root.children:
+            return root.untried[0]
+        best = max(root.children, key=lambda child: child.visits)
+        return best.move
+
+    def _select(self, node: MCTSNode) -> MCTSNode:
+        """Descend the tree with UCT, expanding one node under progressive widening."""
+        while True:
+            if node.depth >= self.max_depth or node.state.is_terminal():
+                return node
+
+            if node.untried is None:
+                node.untried = self._ordered_moves(node.state, for_opponent=not node.maximizing)
+
+            allowed = max(1, int(self.widening_c * (node.visits ** self.widening_alpha)))
+            if node.untried and len(node.children) < allowed:
+                return self._expand(node)
+
+            if not node.children:
+                return node
+
+            node = self._best_child(node)
+
+    def _expand(self, node: MCTSNode) -> MCTSNode:
+        """Add the highest-prior untried move as a new child."""
+        move_combo = node.untried.pop(0)
+        child_state = apply_move_to_state(node.state, move_combo, for_opponent=not node.maximizing)
+        child = MCTSNode(child_state, move_combo, node, not node.maximizing, node.depth + 1)
+        node.children.append(child)
+        self.tree_size += 1
+        if child.depth > self.max_tree_depth:
+            self.max_tree_depth = child.depth
+        return child
+
+    def _best_child(self, node: MCTSNode) -> MCTSNode:
+        """Pick the child maximizing UCT for the player to move in node."""
+        log_visits = math.log(node.visits + 1)
+        best_score = float('-inf')
+        best = node.children[0]
+        for child in node.children:
+            if child.visits == 0:
+                return child
+            mean = child.value / child.visits
+            if not node.maximizing:
+                mean = 1.0 - mean
+            score = mean + self.exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best_score = score
+                best = child
+        return best
+
+    def _backpropagate(self, node: Optional[MCTSNode], reward: float):
+        """Propagate a rollout reward up to the root."""
+        while node is not None:
+            node.visits += 1
+            node.value += reward
+            node = node.parent
+
+    def _evaluate_leaf(self, node: MCTSNode) -> float:
+        """Run one rollout from a leaf on the scratch compact board."""
+        board = self._scratch
+        board.load_state(node.state)
+        our_species = node.state.our_species
+        opponent_species = node.state.opponent_species
+        to_move = our_species if node.maximizing else opponent_species
+        return self.rollout(board, our_species, opponent_species, to_move)
+
+    def rollout(self, board: CompactBoard, our_species: Species,
+                opponent_species: Species, to_move: Species) -> float:
+        """
+        Play a fast random game on a compact board, modifying it in place.
+
+        The policy takes a safe conversion or kill when one is adjacent and
+        otherwise moves a random group to a random non-suicidal neighbour.
+        Uncertain battles are resolved with battle_fn.
+
+        Args:
+            board: Board to play on (overwritten)
+            our_species: Species we play
+            opponent_species: Species the opponent plays
+            to_move: Species moving first
+
+        Returns:
+            Reward in [0, 1] from our perspective
+        """
+        counts = board.counts
+        humans = counts[Species.HUMAN]
+        neighbors = board.neighbors
+        rng = self.rng
+        battle = self.battle_fn
+        species, enemy_species = to_move, (opponent_species if to_move == our_species else our_species)
+
+        for _ in range(self.rollout_depth):
+            own = counts[species]
+            enemy = counts[enemy_species]
+            groups = [idx for idx, count in enumerate(own) if count]
+            if not groups:
+                break
+
+            source = groups[rng.randrange(len(groups))]
+            amount = own[source]
+
+            # Greedy pick of a safe capture, otherwise a random safe step
+            target = -1
+            best_gain = 0
+            safe = []
+            for idx in neighbors[source]:
+                e = enemy[idx]
+                h = humans[idx]
+                if e:
+                    if amount >= e * 1.5 and e > best_gain:
+                        best_gain, target = e, idx
+                    elif e < amount * 1.5:
+                        safe.append(idx)
+                elif h:
+                    if amount >= h and h > best_gain:
+                        best_gain, target = h, idx
+                else:
+                    safe.append(idx)
+            if target < 0:
+                if not safe:
+                    species, enemy_species = enemy_species, species
+                    continue
+                target = safe[rng.randrange(len(safe))]
+
+            own[source] = 0
+            e = enemy[target]
+            h = humans[target]
+            if e:
+                if amount >= e * 1.5:
+                    enemy[target] = 0
+                    own[target] += amount
+                elif e < amount * 1.5:
+                    own[target], enemy[target] = battle(amount, e, False)
+            elif h:
+                if amount >= h:
+                    humans[target] = 0
+                    own[target] += amount + h
+                else:
+                    own[target], humans[target] = battle(amount, h, True)
+            else:
+                own[target] += amount
+
+            if not any(enemy):
+                break
+            species, enemy_species = enemy_species, species
+
+        ours = sum(counts[our_species])
+        theirs = sum(counts[opponent_species])
+        if ours == 0:
+            return 0.0
+        if theirs == 0:
+            return 1.0
+        return ours / (ours + theirs)
+
+    def _ordered_moves(self, state: GameState, for_opponent: bool) -> List[List[Move]]:
+        """Generate move combinations ordered capture-first."""
+        return order_moves(state, generate_all_moves(state, for_opponent=for_opponent), for_opponent)
+
+    def out_of_time(self) -> bool:
+        """Check if we've exceeded time limit."""
+        return (time.time() - self.start_time) >= self.time_limit
+
+
+def find_best_move(state: GameState, max_depth: int = 4, time_limit: float = 1.8) -> List[Move]:
+    """
+    Find the best move using Monte Carlo Tree Search.
+
+    Args:
+        state: Current game state
+        max_depth: Maximum tree depth
+        time_limit: Time limit in seconds
+
+    Returns:
+        Best move combination
+    """
+    searcher = MCTSSearch(max_depth=max_depth, time_limit=time_limit)
+    return searcher.search(state)
@@ -0,0 +1,163 @@
+"""Object pooling and garbage-collector control for allocation-light search."""
+from typing import List, Optional
+from contextlib import contextmanager
+import gc
+import sys
+import time
+from game_state import GameState, Move
+
+
+class StatePool:
+    """
+    Preallocated per-ply search buffers.
+
+    Each ply of the search writes its child positions into the same
+    GameState (via apply_move_to_state(..., out=...)) and its move
+    combinations into the same list, so the search stops allocating
+    rows x cols Cell objects per node. Siblings can share a buffer because
+    a child is fully searched before the next sibling is generated.
+    """
+
+    def __init__(self, rows: int, cols: int, plies: int):
+        self.rows = rows
+        self.cols = cols
+        self.states: List[GameState] = []
+        self.move_lists: List[List[List[Move]]] = []
+        self.ensure(plies)
+
+    def ensure(self, plies: int):
+        """Grow the pool so that plies 0..plies are available."""
+        while len(self.states) <= plies:
+            self.states.append(GameState(self.rows, self.cols))
+            self.move_lists.append([])
+
+    def fits(self, state: GameState) -> bool:
+        """Check whether the pool's buffers match the board size of a state."""
+        return self.rows == state.rows and self.cols == state.cols
+
+    def state(self, ply: int) -> GameState:
+        """Get the state buffer for a ply."""
+        return self.states[ply]
+
+    def moves(self, ply: int) -> List[List[Move]]:
+        """Get the move-list buffer for a ply."""
+        return self.move_lists[ply]
+
+
+class GCMonitor:
+    """
+    Measure garbage-collector pauses through gc.callbacks.
+
+    Pauses are accumulated until reset(), so the caller can read the GC time
+    spent during one turn.
+    """
+
+    def __init__(self):
+        self.collections = 0
+        self.pause_time = 0.0
+        self.max_pause = 0.0
+        self._started: Optional[float] = None
+        self._installed = False
+
+    def install(self):
+        """Start listening to collections."""
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        """Stop listening to collections."""
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def reset(self):
+        """Clear the accumulated pause statistics."""
+        self.collections = 0
+        self.pause_time = 0.0
+        self.max_pause = 0.0
+
+    def snapshot(self) -> dict:
+        """Get the accumulated statistics."""
+        return {
+            "gc_collections": self.collections,
+            "gc_pause": self.pause_time,
+            "gc_max_pause": self.max_pause,
+        }
+
+    def _callback(self, phase: str, info: dict):
+        if phase == "start":
+            self._started = time.perf_counter()
+        elif self._started is not None:
+            pause = time.perf_counter() - self._started
+            self._started = None
+            self.collections += 1
+            self.pause_time += pause
+            if pause > self.max_pause:
+                self.max_pause = pause
+
+
+class AllocationCounter:
+    """
+    Cheap allocation probe around a search.
+
+    Reports the growth of allocated memory blocks and of the GC generation-0
+    counter (tracked container allocations not yet freed), which is what
+    triggers automatic collections. The generation-0 figure is only
+    reported when automatic collection is disabled, since a collection
+    resets the counter.
+    """
+
+    def __init__(self):
+        self._blocks = 0
+        self._gen0 = 0
+
+    def start(self):
+        """Record the starting counters."""
+        self._blocks = sys.getallocatedblocks()
+        self._gen0 = gc.get_count()[0]
+
+    def stop(self, nodes: int) -> dict:
+        """Get per-node allocation figures since start()."""
+        blocks = sys.getallocatedblocks() - self._blocks
+        gen0 = gc.get_count()[0] - self._gen0
+        nodes = max(nodes, 1)
+        report = {"alloc_blocks_per_node": blocks / nodes}
+        if not gc.isenabled():
+            report["gc_tracked_per_node"] = gen0 / nodes
+        return report
+
+
+@contextmanager
+def gc_paused():
+    """Disable automatic garbage collection inside a block."""
+    was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if was_enabled:
+            gc.enable()
+
+
+def freeze_heap():
+    """
+    Collect once and move every surviving object to the permanent generation.
+
+    Call after map setup: long-lived objects (modules, the game state, move
+    tables) are then never scanned again by later collections.
+    """
+    gc.collect()
+    gc.freeze()
+
+
+def collect_between_turns() -> float:
+    """
+    Run a full collection while waiting for the opponent.
+
+    Returns:
+        Time spent collecting, in seconds
+    """
+    start = time.perf_counter()
+    gc.collect()
+    return time.perf_counter() - start
@@ -0,0 +1,185 @@
+"""
+Live player telemetry in the Prometheus text format.
+
+PlayerMetrics is updated once per turn, after the search, so the search
+itself is untouched. MetricsServer serves it on GET /metrics from a daemon
+thread (stdlib http.server).
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the move latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 1.5, 1.8, 2.0, 5.0)
+PREFIX = "vvw"
+# Search caches reported from the turn stats: name -> (stats key, entry -> (hits, misses))
+CACHE_STATS = {
+    "move_cache": ("move_cache", lambda entry: (entry["reused"] + entry["shared"], entry["generated"])),
+    "endgame_memo": ("endgame", lambda entry: (entry.get("memo_hits", 0), entry["positions"])),
+    "planner": ("planner", lambda entry: (int(entry["cached"]), int(not entry["cached"]))),
+}
+
+
+class PlayerMetrics:
+    """Thread-safe turn counters and their Prometheus rendering."""
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.turns = 0
+        self.last_depth = 0
+        self.depth_sum = 0
+        self.last_nodes_per_sec = 0.0
+        self.nodes = 0
+        self.search_time = 0.0
+        # Non-cumulative counts per bucket; the last slot is +Inf
+        self.latency_counts = [0] * (len(buckets) + 1)
+        self.latency_sum = 0.0
+        self.fallbacks = 0
+        self.exceptions = 0
+        # name -> callable returning (hits, misses)
+        self.caches: Dict[str, Callable[[], Tuple[int, int]]] = {}
+        # name -> [hits, misses] summed over the turns' stats (see CACHE_STATS)
+        self.cache_counts: Dict[str, List[int]] = {}
+
+    def observe_turn(self, stats: dict, latency: float):
+        """
+        Record a searched turn.
+
+        Args:
+            stats: The searcher's stats (alpha-beta depth/nodes/time, or MCTS
+                tree_depth/playouts); the search caches' lookups are read
+                from their entries (CACHE_STATS)
+            latency: Seconds spent computing the move
+        """
+        caches = [(name, *counts(stats[key])) for name, (key, counts) in CACHE_STATS.items() if stats.get(key)]
+        depth = stats.get("depth", stats.get("tree_depth")) or 0
+        nodes = stats.get("nodes", stats.get("playouts")) or 0
+        nodes_per_sec = stats.get("nodes_per_sec", stats.get("playouts_per_sec")) or 0.0
+        bucket = len(self.buckets)
+        for index, bound in enumerate(self.buckets):
+            if latency <= bound:
+                bucket = index
+                break
+        with self._lock:
+            self.turns += 1
+            self.last_depth = depth
+            self.depth_sum += depth
+            self.last_nodes_per_sec = nodes_per_sec
+            self.nodes += nodes
+            self.search_time += stats.get("time", latency)
+            self.latency_counts[bucket] += 1
+            self.latency_sum += latency
+            for name, hits, misses in caches:
+                counts = self.cache_counts.setdefault(name, [0, 0])
+                counts[0] += hits
+                counts[1] += misses
+
+    def count_fallback(self):
+        with self._lock:
+            self.fallbacks += 1
+
+    def count_exception(self):
+        with self._lock:
+            self.exceptions += 1
+
+    def add_cache(self, name: str, stats: Callable[[], Tuple[int, int]]):
+        """Report a cache whose (hits, misses) are returned by stats()."""
+        self.caches[name] = stats
+
+    def render(self) -> str:
+        """Format all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            turns = self.turns
+            values = [
+                ("turns_total", "counter", "Turns searched", turns),
+                ("search_depth_last", "gauge", "Depth reached by the last search", self.last_depth),
+                ("search_depth_avg", "gauge", "Average depth reached",
+                 self.depth_sum / turns if turns else 0.0),
+                ("nodes_per_second_last", "gauge", "Search speed of the last turn", self.last_nodes_per_sec),
+                ("nodes_per_second_avg", "gauge", "Nodes over search time, all turns",
+                 self.nodes / self.search_time if self.search_time else 0.0),
+                ("fallback_moves_total", "counter", "Fallback moves sent", self.fallbacks),
+                ("exceptions_total", "counter", "Exceptions while computing a move", self.exceptions),
+            ]
+            latency_counts = list(self.latency_counts)
+            latency_sum = self.latency_sum
+            rows = [(cache, hits, misses) for cache, (hits, misses) in self.cache_counts.items()]
+
+        lines: List[str] = []
+        for name, kind, help_text, value in values:
+            lines += [f"# HELP {PREFIX}_{name} {help_text}", f"# TYPE {PREFIX}_{name} {kind}",
+                      f"{PREFIX}_{name} {_number(value)}"]
+
+        name = f"{PREFIX}_move_latency_seconds"
+        lines += [f"# HELP {name} Time to compute a move", f"# TYPE {name} histogram"]
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), latency_counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else _number(bound)
+            lines.append(f'{name}_bucket{{le="{le}"}} {cumulative}')
+        lines += [f"{name}_sum {_number(latency_sum)}", f"{name}_count {cumulative}"]
+
+        for cache, stats in self.caches.items():
+            rows.append((cache, *stats()))
+        if rows:
+            rows.sort()
+            for suffix, kind, help_text, index in (("hits_total", "counter", "Cache hits", 1),
+                                                   ("misses_total", "counter", "Cache misses", 2)):
+                lines += [f"# HELP {PREFIX}_cache_{suffix} {help_text}", f"# TYPE {PREFIX}_cache_{suffix} {kind}"]
+                lines += [f'{PREFIX}_cache_{suffix}{{cache="{row[0]}"}} {row[index]}' for row in rows]
+            lines += [f"# HELP {PREFIX}_cache_hit_ratio Hits over lookups",
+                      f"# TYPE {PREFIX}_cache_hit_ratio gauge"]
+            lines += [f'{PREFIX}_cache_hit_ratio{{cache="{cache}"}} '
+                      f'{_number(hits / (hits + misses) if hits + misses else 0.0)}'
+                      for cache, hits, misses in rows]
+        return "\n".join(lines) + "\n"
+
+
+def _number(value) -> str:
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+class MetricsServer:
+    """
+    HTTP endpoint serving PlayerMetrics on a daemon thread.
+
+    Args:
+        metrics: Metrics to serve
+        host: Bind address (local only by default)
+        port: Port, 0 for any free port (see .port)
+    """
+
+    def __init__(self, metrics: PlayerMetrics, host: str = "127.0.0.1", port: int = 9100):
+        self.metrics = metrics
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?")[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = metrics.render().encode()
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass
+
+        self.httpd = HTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsServer":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self.httpd.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.httpd.server_close()
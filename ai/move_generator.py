@@ -1,7 +1,22 @@
 """Move generation and battle simulation for Vampires VS Werewolves."""
-from typing import List, Tuple, Set
+from typing import Dict, List, Optional, Tuple, Set
+from array import array
+import math
 import random
-from game_state import GameState, Move, Species
+from game_state import GameState, Move, Species, MOVE_FROM_SHIFT, MOVE_DIRECTION_SHIFT, MOVE_COUNT_MASK
+from compact_board import neighbor_table
+
+# Source cells whose move list generate_all_moves reused from an ancestor
+# node, found in the neighbourhood cache or generated, since the process started
+MOVE_CACHE_STATS = {"reused": 0, "shared": 0, "generated": 0}
+# Move lists by (rows, cols, cell index, count, humans of the neighbours),
+# all a cell's moves depend on; cleared when full
+CELL_MOVES_SIZE = 1 << 14
+_cell_moves: Dict[tuple, List[Move]] = {}
+# Removal rules of prune_moves, in the order they are checked
+PRUNE_RULES = ("sure_loss", "pointless_split", "duplicate")
+# Exact rules applied by default; pointless_split is a heuristic and opt-in
+DEFAULT_PRUNE_RULES = ("sure_loss", "duplicate")
 
 
 def calculate_battle_probability(attackers: int, defenders: int) -> float:
@@ -28,7 +43,8 @@ def calculate_battle_probability(attackers: int, defenders: int) -> float:
         return 0.5 + (attackers - defenders) / (2.0 * defenders)
 
 
-def simulate_battle(attackers: int, defenders: int, is_human: bool = False) -> Tuple[int, int]:
+def simulate_battle(attackers: int, defenders: int, is_human: bool = False,
+                    rng: Optional[random.Random] = None) -> Tuple[int, int]:
     """
     Simulate a battle and return survivors.
     
@@ -36,24 +52,26 @@ def simulate_battle(attackers: int, defenders: int, is_human: bool = False) -> T
         attackers: Number of attacking creatures
         defenders: Number of defending creatures
         is_human: Whether defenders are humans (can be converted)
+        rng: Random generator (default: the random module's)
         
     Returns:
         Tuple of (surviving_attackers, surviving_defenders)
     """
     win_prob = calculate_battle_probability(attackers, defenders)
+    draw = random.random if rng is None else rng.random
     
-    if random.random() < win_prob:
+    if draw() < win_prob:
         # Attackers win
-        surviving_attackers = sum(1 for _ in range(attackers) if random.random() < win_prob)
+        surviving_attackers = sum(1 for _ in range(attackers) if draw() < win_prob)
         if is_human:
             # Convert surviving humans
-            converted_humans = sum(1 for _ in range(defenders) if random.random() < win_prob)
+            converted_humans = sum(1 for _ in range(defenders) if draw() < win_prob)
             return surviving_attackers + converted_humans, 0
         else:
             return surviving_attackers, 0
     else:
         # Defenders win
-        surviving_defenders = sum(1 for _ in range(defenders) if random.random() < (1 - win_prob))
+        surviving_defenders = sum(1 for _ in range(defenders) if draw() < (1 - win_prob))
         return 0, surviving_defenders
 
 
@@ -96,7 +114,39 @@ def get_battle_expected_value(attackers: int, defenders: int, is_human: bool = F
     return expected_attackers, expected_defenders
 
 
-def generate_all_moves(state: GameState, for_opponent: bool = False) -> List[List[Move]]:
+def resolve_arrival(amount: int, own: int, enemy: int, humans: int) -> Tuple[int, int, int]:
+    """
+    Resolve creatures arriving on a cell.
+    
+    Guaranteed outcomes are exact, random battles use the expected value.
+    
+    Args:
+        amount: Arriving creatures
+        own, enemy, humans: Cell contents before the arrival (own species first)
+    
+    Returns:
+        Tuple of (own, enemy, humans) after the arrival
+    """
+    if enemy > 0:
+        if amount >= enemy * 1.5:
+            # Guaranteed kill
+            return own + amount, 0, humans
+        if enemy >= amount * 1.5:
+            # Guaranteed loss - attackers die
+            return own, enemy, humans
+        expected_win, expected_lose = get_battle_expected_value(amount, enemy, False)
+        return own + int(expected_win), int(expected_lose), humans
+    if humans > 0:
+        if amount >= humans:
+            # Guaranteed conversion
+            return own + amount + humans, enemy, 0
+        expected_win, expected_humans = get_battle_expected_value(amount, humans, True)
+        return own + int(expected_win), enemy, int(expected_humans)
+    return own + amount, enemy, humans
+
+
+def generate_all_moves(state: GameState, for_opponent: bool = False,
+                       out: Optional[List[List[Move]]] = None, cache: bool = True) -> List[List[Move]]:
     """
     Generate all legal move combinations.
     
@@ -111,6 +161,11 @@ def generate_all_moves(state: GameState, for_opponent: bool = False) -> List[Lis
     Args:
         state: Current game state
         for_opponent: If True, generate moves for opponent
+        out: Optional list reused as the result buffer (cleared first)
+        cache: Reuse the move list of every source cell that kept its count
+            and 3x3 neighbourhood since the nearest ancestor state that
+            generated moves for the side (see apply_moves_in_place), and
+            look the other cells up by count and neighbouring humans
         
     Returns:
         List of move combinations (each combination is a list of moves)
@@ -124,19 +179,42 @@ def generate_all_moves(state: GameState, for_opponent: bool = False) -> List[Lis
     if not groups:
         return []
     
-    all_move_combos = []
+    all_move_combos = out if out is not None else []
+    all_move_combos.clear()
     
-    # For each group, generate possible splits and moves
-    for x, y, count in groups:
-        # Generate moves from this single group
-        single_group_moves = generate_moves_from_cell(state, x, y, count)
-        if single_group_moves:
-            all_move_combos.extend([[move] for move in single_group_moves])
+    if cache:
+        # Cells unchanged since the table was built keep their move list
+        table, dirty = state._moves_base.get(species, (None, None))
+        cols = state.cols
+        own = {}
+        reused = 0
+        for x, y, count in groups:
+            idx = x * cols + y
+            entry = table.get(idx) if table is not None and idx not in dirty else None
+            if entry is not None and entry[0] == count:
+                reused += 1
+            else:
+                entry = (count, _moves_from_cell(state, x, y, idx, count))
+            own[idx] = entry
+            all_move_combos.extend([[move] for move in entry[1]])
+        base = dict(state._moves_base)
+        base[species] = (own, frozenset())
+        state._moves_base = base
+        MOVE_CACHE_STATS["reused"] += reused
+    else:
+        # For each group, generate possible splits and moves
+        for x, y, count in groups:
+            # Generate moves from this single group
+            single_group_moves = generate_moves_from_cell(state, x, y, count)
+            if single_group_moves:
+                all_move_combos.extend([[move] for move in single_group_moves])
     
     # TODO: Add multi-group move combinations (for now, single moves per turn)
     # This is a simplification to keep the branching factor manageable
     
-    return all_move_combos if all_move_combos else [[]]
+    if not all_move_combos:
+        all_move_combos.append([])
+    return all_move_combos
 
 
 def generate_moves_from_cell(state: GameState, x: int, y: int, count: int, debug: bool = False) -> List[Move]:
@@ -152,13 +230,83 @@ def generate_moves_from_cell(state: GameState, x: int, y: int, count: int, debug
     Returns:
         List of possible moves from this cell
     """
-    moves = []
+    moves = [Move(x, y, target_x, target_y, amount)
+             for target_x, target_y, _, amount in _iter_moves_from_cell(state, x, y, count, debug)]
     
+    if debug:
+        print(f"  Total moves generated: {len(moves)}")
+    
+    return moves
+
+
+def clear_move_cache():
+    """Forget the move lists of the neighbourhood-keyed cell move cache."""
+    _cell_moves.clear()
+
+
+def _moves_from_cell(state: GameState, x: int, y: int, idx: int, count: int) -> List[Move]:
+    """generate_moves_from_cell() through the neighbourhood-keyed cell move cache."""
+    board = state.board
+    cols = state.cols
+    key = (state.rows, cols, idx, count,
+           tuple(board[n // cols][n % cols].humans for n in neighbor_table(state.rows, cols)[idx]))
+    moves = _cell_moves.get(key)
+    if moves is not None:
+        MOVE_CACHE_STATS["shared"] += 1
+        return moves
+    if len(_cell_moves) >= CELL_MOVES_SIZE:
+        _cell_moves.clear()
+    MOVE_CACHE_STATS["generated"] += 1
+    moves = _cell_moves[key] = generate_moves_from_cell(state, x, y, count)
+    return moves
+
+
+def generate_packed_moves(state: GameState, for_opponent: bool = False,
+                          out: Optional[array] = None) -> array:
+    """
+    Generate all single moves as packed integers (see Move.pack).
+    
+    Same moves as generate_all_moves, without creating Move objects.
+    
+    Args:
+        state: Current game state
+        for_opponent: If True, generate moves for opponent
+        out: Optional array('I') reused as the result buffer (cleared first)
+    
+    Returns:
+        array('I') of packed moves
+    
+    Raises:
+        ValueError: A group is too large for the packed count field
+    """
+    moves = out if out is not None else array('I')
+    del moves[:]
+    species = state.opponent_species if for_opponent else state.our_species
+    if species is None:
+        return moves
+    
+    cols = state.cols
+    groups = state.get_opponent_groups() if for_opponent else state.get_our_groups()
+    for x, y, count in groups:
+        if count > MOVE_COUNT_MASK:
+            raise ValueError(f"Cannot pack moves of a group of {count} units (at most {MOVE_COUNT_MASK})")
+        source = (x * cols + y) << MOVE_FROM_SHIFT
+        for _, _, direction, amount in _iter_moves_from_cell(state, x, y, count):
+            moves.append(source | direction << MOVE_DIRECTION_SHIFT | amount)
+    return moves
+
+
+def _iter_moves_from_cell(state: GameState, x: int, y: int, count: int, debug: bool = False):
+    """
+    Yield (target_x, target_y, direction, amount) for every move from a cell.
+    
+    Shared by the Move-based and packed generators.
+    """
     if debug:
         print(f"\n=== Generating moves from cell ({x},{y}) with {count} units ===")
     
     # Try all 8 directions
-    for dx, dy in GameState.DIRECTIONS:
+    for direction, (dx, dy) in enumerate(GameState.DIRECTIONS):
         target_x = x + dx
         target_y = y + dy
         
@@ -196,15 +344,194 @@ def generate_moves_from_cell(state: GameState, x: int, y: int, count: int, debug
                     elif debug:
                         print(f"    ALLOWED: {amount} units vs {target_cell.humans} humans (win prob {win_prob:.2%})")
                 
-                moves.append(Move(x, y, target_x, target_y, amount))
+                yield target_x, target_y, direction, amount
+
+
+def move_priority(state: GameState, move_combo: List[Move], for_opponent: bool = False,
+                  fields=None) -> float:
+    """
+    Cheap capture-first priority of a move combination, used for ordering.
     
-    if debug:
-        print(f"  Total moves generated: {len(moves)}")
+    Sure kills and conversions score highest, attacks that can backfire
+    score lowest, and among quiet moves those stepping towards a sure
+    conversion come first, then larger moves.
     
+    Args:
+        state: Current game state
+        move_combo: Move combination to score
+        for_opponent: If True, moves are for opponent
+        fields: Human distance fields of the state (state.human_distance_fields())
+    
+    Returns:
+        Priority (higher should be searched first)
+    """
+    enemy_species = state.our_species if for_opponent else state.opponent_species
+    score = 0.0
+    for move in move_combo:
+        target = state.board[move.x_to][move.y_to]
+        enemy = target.get_count(enemy_species) if enemy_species is not None else 0
+        if enemy:
+            score += enemy * 2 if move.count >= enemy * 1.5 else -enemy
+        elif target.humans:
+            score += target.humans * 1.5
+        elif fields is not None:
+            steps = fields.steps_to_conversion(move.x_from, move.y_from, move.count)
+            if steps is not None:
+                score += 0.5 * (steps - fields.steps_to_conversion(move.x_to, move.y_to, move.count))
+        score += move.count * 0.01
+    return score
+
+
+def order_moves(state: GameState, moves: List[List[Move]], for_opponent: bool = False) -> List[List[Move]]:
+    """Sort move combinations in place by move_priority (best first) and return them."""
+    fields = state.human_distance_fields()
+    moves.sort(key=lambda move_combo: move_priority(state, move_combo, for_opponent, fields), reverse=True)
     return moves
 
 
-def apply_move_to_state(state: GameState, moves: List[Move], for_opponent: bool = False) -> GameState:
+def is_quiet_move(state: GameState, move_combo: List[Move], for_opponent: bool = False) -> bool:
+    """Check whether a move combination only repositions (no battle or conversion)."""
+    enemy_species = state.our_species if for_opponent else state.opponent_species
+    for move in move_combo:
+        target = state.board[move.x_to][move.y_to]
+        if target.humans or (enemy_species is not None and target.get_count(enemy_species)):
+            return False
+    return True
+
+
+def prune_moves(state: GameState, moves: List[List[Move]], for_opponent: bool = False,
+                counts: Optional[Dict[str, int]] = None,
+                rules: Tuple[str, ...] = DEFAULT_PRUNE_RULES) -> List[List[Move]]:
+    """
+    Remove the move combinations that are dominated or lead to a position
+    an earlier combination already leads to.
+    
+    Rules, in order (PRUNE_RULES):
+        sure_loss        A move attacks an enemy group of at least 1.5x its
+                         size: the attackers die and nothing else changes
+        pointless_split  Part of a group moves to an empty cell although it
+                         can neither convert a human group nor kill an enemy
+                         group on its own (a heuristic: the fragment may
+                         still be useful later, e.g. merged with another)
+        duplicate        Same resulting position as a kept combination.
+                         generate_all_moves only produces single moves,
+                         which never collide, so this only fires on
+                         multi-move combinations from other generators
+    
+    Args:
+        state: Current game state
+        moves: Move combinations of the side to move
+        for_opponent: If True, moves are the opponent's
+        counts: Optional dict incremented with the removals of each rule
+        rules: Rules applied (default DEFAULT_PRUNE_RULES)
+    
+    Returns:
+        The kept combinations (a new list), or moves itself when nothing
+        would be kept
+    """
+    species = state.opponent_species if for_opponent else state.our_species
+    enemy = state.our_species if for_opponent else state.opponent_species
+    if species is None or enemy is None:
+        return moves
+    board = state.board
+    sure_loss = "sure_loss" in rules
+    splits = "pointless_split" in rules
+    duplicates = "duplicate" in rules
+    # Smallest fragment that converts or kills something on its own (lazy)
+    useful = None
+    kept = []
+    seen = set()
+    removed = dict.fromkeys(PRUNE_RULES, 0)
+    for combo in moves:
+        rule = None
+        for move in combo:
+            target = board[move.x_to][move.y_to]
+            enemy_count = target.get_count(enemy)
+            if enemy_count:
+                if sure_loss and enemy_count >= move.count * 1.5:
+                    rule = "sure_loss"
+                    break
+            elif splits and not target.humans and not target.get_count(species):
+                if move.count < board[move.x_from][move.y_from].get_count(species):
+                    if useful is None:
+                        useful = _smallest_useful_fragment(state, enemy)
+                    if move.count < useful:
+                        rule = "pointless_split"
+                        break
+        if rule is None:
+            if not duplicates:
+                kept.append(combo)
+                continue
+            if len(combo) == 1:
+                # The source always changes; a battle target may not. move,
+                # target and enemy_count are still those of the only move.
+                changed = True
+                if enemy_count or target.humans:
+                    before = (target.get_count(species), enemy_count, target.humans)
+                    changed = resolve_arrival(move.count, *before) != before
+                key = (move.x_from, move.y_from, move.count, (move.x_to, move.y_to) if changed else None)
+            else:
+                key = _outcome_key(state, combo, species, enemy)
+            if key in seen:
+                rule = "duplicate"
+            else:
+                seen.add(key)
+                kept.append(combo)
+                continue
+        removed[rule] += 1
+    if not kept:
+        return moves
+    if counts is not None:
+        for rule, removals in removed.items():
+            if removals:
+                counts[rule] = counts.get(rule, 0) + removals
+    return kept
+
+
+def _smallest_useful_fragment(state: GameState, enemy: Species) -> int:
+    """Smallest group converting some human group or killing some enemy group for sure."""
+    useful = float('inf')
+    for row in state.board:
+        for cell in row:
+            if not (cell.humans or cell.vampires or cell.werewolves):
+                continue
+            if cell.humans and cell.humans < useful:
+                useful = cell.humans
+            enemy_count = cell.get_count(enemy)
+            if enemy_count and math.ceil(enemy_count * 1.5) < useful:
+                useful = math.ceil(enemy_count * 1.5)
+    return useful
+
+
+def _outcome_key(state: GameState, combo: List[Move], species: Species, enemy: Species) -> tuple:
+    """
+    Contents of the cells a combination changes, as apply_moves_in_place
+    leaves them: equal keys mean equal positions for the same state.
+    """
+    if ({(move.x_from, move.y_from) for move in combo}
+            & {(move.x_to, move.y_to) for move in combo}):
+        # Invalid combination: the position is unchanged
+        return ()
+    cells: Dict[Tuple[int, int], Tuple[int, int, int]] = {}
+    
+    def contents(x: int, y: int) -> Tuple[int, int, int]:
+        known = cells.get((x, y))
+        if known is None:
+            cell = state.board[x][y]
+            known = (cell.get_count(species), cell.get_count(enemy), cell.humans)
+        return known
+    
+    for move in combo:
+        own, enemy_count, humans = contents(move.x_from, move.y_from)
+        if own < move.count:
+            continue
+        cells[(move.x_from, move.y_from)] = (own - move.count, enemy_count, humans)
+        cells[(move.x_to, move.y_to)] = resolve_arrival(move.count, *contents(move.x_to, move.y_to))
+    return tuple(sorted(cells.items()))
+
+
+def apply_move_to_state(state: GameState, moves: List[Move], for_opponent: bool = False,
+                        out: Optional[GameState] = None) -> GameState:
     """
     Apply a move combination to create a new game state.
     
@@ -212,15 +539,40 @@ def apply_move_to_state(state: GameState, moves: List[Move], for_opponent: bool
         state: Current game state
         moves: List of moves to apply
         for_opponent: If True, moves are for opponent
+        out: Optional preallocated state (same size) to write the result into
+            instead of cloning
         
     Returns:
         New game state after applying moves
     """
-    new_state = state.clone()
+    if out is not None:
+        out.copy_from(state)
+        new_state = out
+    else:
+        new_state = state.clone()
+    # Move lists of the parent stay valid outside the cells the moves change
+    new_state._moves_base = state._moves_base
+    apply_moves_in_place(new_state, moves, for_opponent)
+    return new_state
+
+
+def apply_moves_in_place(new_state: GameState, moves: List[Move], for_opponent: bool = False):
+    """
+    Apply a move combination to a state, modifying it.
+    
+    The sources, targets and their neighbours are marked as changed for
+    the state's cached move lists, and a battle on humans marks its human
+    distance fields stale.
+    
+    Args:
+        new_state: State to update (already a copy of the position)
+        moves: List of moves to apply
+        for_opponent: If True, moves are for opponent
+    """
     species = new_state.opponent_species if for_opponent else new_state.our_species
     
     if species is None:
-        return new_state
+        return
     
     # Track sources and targets to validate rules
     sources: Set[Tuple[int, int]] = set()
@@ -234,7 +586,7 @@ def apply_move_to_state(state: GameState, moves: List[Move], for_opponent: bool
     # Rule 5: A cell cannot be both source and target
     if sources & targets:
         # Invalid move combination
-        return new_state
+        return
     
     # Second pass: apply moves
     for move in moves:
@@ -255,35 +607,21 @@ def apply_move_to_state(state: GameState, moves: List[Move], for_opponent: bool
         enemy_count = target_cell.get_count(enemy_species) if enemy_species else 0
         human_count = target_cell.humans
         
-        if enemy_count > 0:
-            # Battle with enemy
-            if move.count >= enemy_count * 1.5:
-                # Guaranteed kill
-                target_cell.set_count(enemy_species, 0)
-                target_cell.set_count(species, target_count + move.count)
-            elif enemy_count >= move.count * 1.5:
-                # Guaranteed loss - attackers die
-                pass  # Attackers don't survive
-            else:
-                # Random battle - use expected value
-                expected_win, expected_lose = get_battle_expected_value(move.count, enemy_count, False)
-                target_cell.set_count(species, target_count + int(expected_win))
-                target_cell.set_count(enemy_species, int(expected_lose))
-        
-        elif human_count > 0:
-            # Battle/conversion with humans
-            if move.count >= human_count:
-                # Guaranteed conversion
-                target_cell.humans = 0
-                target_cell.set_count(species, target_count + move.count + human_count)
-            else:
-                # Random battle
-                expected_win, expected_humans = get_battle_expected_value(move.count, human_count, True)
-                target_cell.set_count(species, target_count + int(expected_win))
-                target_cell.humans = int(expected_humans)
-        
-        else:
-            # Empty cell or friendly cell
-            target_cell.set_count(species, target_count + move.count)
-    
-    return new_state
+        own, enemy, humans = resolve_arrival(move.count, target_count, enemy_count, human_count)
+        target_cell.set_count(species, own)
+        if enemy_species:
+            target_cell.set_count(enemy_species, enemy)
+        if human_count:
+            target_cell.humans = humans
+            new_state._humans_dirty = True
+
+    if new_state._moves_base:
+        neighbors = neighbor_table(new_state.rows, new_state.cols)
+        cols = new_state.cols
+        changed = set()
+        for move in moves:
+            for idx in (move.x_from * cols + move.y_from, move.x_to * cols + move.y_to):
+                changed.add(idx)
+                changed.update(neighbors[idx])
+        new_state._moves_base = {owner: (table, dirty | changed)
+                                 for owner, (table, dirty) in new_state._moves_base.items()}
@@ -0,0 +1,210 @@
+"""
+Opening book: deep searches of the first plies of each map, computed offline.
+
+Positions are keyed by a 64-bit hash of the board in canonical orientation
+(GameState.canonical_transform over the map's symmetries), with creatures
+counted as the mover's and the other side's: mirrored positions and the
+mirrored openings of the two sides share one entry, and moves are stored
+in canonical orientation and mapped back on lookup. The tree built
+from each map's opening follows the book move plus the next best
+alternatives of the side to move (it may be the opponent), for a number of
+plies.
+
+File layout (little-endian):
+    header  "VVWB", version (B), entries (I)
+    entry   key (Q), searched depth (B), move count (B), packed moves (I each,
+            canonical orientation, Move.pack with the canonical column count)
+
+Usage:
+    python3 ai/opening_book.py --output books/openings.vvb --plies 4 --time-limit 20
+"""
+import hashlib
+import os
+import struct
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from game_state import GameState, Move, MOVE_COUNT_MASK, TRANSPOSE, inverse_transform
+from alphabeta import AlphaBetaSearch
+from move_generator import generate_all_moves, order_moves, apply_move_to_state
+from maps import list_maps, load_map
+from referee import Referee
+
+MAGIC = b"VVWB"
+VERSION = 2
+HEADER = struct.Struct("<4sBI")
+ENTRY = struct.Struct("<QBB")
+PACKED_MOVE = struct.Struct("<I")
+# Book shipped with the repository
+DEFAULT_BOOK = Path(__file__).resolve().parent.parent / "books" / "openings.vvb"
+
+
+def position_key(state: GameState, transform: int = 0) -> int:
+    """64-bit hash of the board size and occupied cells (ours / theirs), after a transform."""
+    rows, cols = (state.cols, state.rows) if transform & TRANSPOSE else (state.rows, state.cols)
+    digest = hashlib.blake2b(f"{rows}x{cols}".encode(), digest_size=8)
+    for x, y, humans, ours, theirs in state.relative_layout(transform):
+        digest.update(f"{x},{y}:{humans},{ours},{theirs};".encode())
+    return int.from_bytes(digest.digest(), "little")
+
+
+def canonical_key(state: GameState) -> Tuple[int, int]:
+    """(position_key in canonical orientation, transform to that orientation)."""
+    transform = state.canonical_transform()
+    return position_key(state, transform), transform
+
+
+class OpeningBook:
+    """In-memory book: position key -> (searched depth, packed moves)."""
+
+    def __init__(self, entries: Optional[Dict[int, Tuple[int, List[int]]]] = None):
+        self.entries: Dict[int, Tuple[int, List[int]]] = entries if entries is not None else {}
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def load(cls, path) -> "OpeningBook":
+        data = Path(path).read_bytes()
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} opening book")
+        entries = {}
+        offset = HEADER.size
+        for _ in range(count):
+            key, depth, moves = ENTRY.unpack_from(data, offset)
+            offset += ENTRY.size
+            codes = [code for code, in PACKED_MOVE.iter_unpack(data[offset:offset + moves * PACKED_MOVE.size])]
+            offset += moves * PACKED_MOVE.size
+            entries[key] = (depth, codes)
+        return cls(entries)
+
+    def save(self, path):
+        parts = [HEADER.pack(MAGIC, VERSION, len(self.entries))]
+        for key in sorted(self.entries):
+            depth, codes = self.entries[key]
+            parts.append(ENTRY.pack(key, min(depth, 255), len(codes)))
+            parts.extend(PACKED_MOVE.pack(code) for code in codes)
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        Path(path).write_bytes(b"".join(parts))
+
+    def add(self, state: GameState, depth: int, moves: List[Move]):
+        """Store the move of a position (skipped when a move is too large to pack)."""
+        if any(move.count > MOVE_COUNT_MASK for move in moves):
+            return
+        key, transform = canonical_key(state)
+        cols = state.rows if transform & TRANSPOSE else state.cols
+        self.entries[key] = (depth, [move.transformed(transform, state.rows, state.cols).pack(cols)
+                                     for move in moves])
+
+    def lookup(self, state: GameState) -> Optional[Tuple[List[Move], int]]:
+        """
+        Get the book move of a position.
+
+        Returns:
+            (moves, searched depth), or None when the position is not in the
+            book or the stored move does not fit the board
+        """
+        key, transform = canonical_key(state)
+        entry = self.entries.get(key)
+        if entry is not None:
+            depth, codes = entry
+            rows, cols = (state.cols, state.rows) if transform & TRANSPOSE else (state.rows, state.cols)
+            back = inverse_transform(transform)
+            moves = [Move.from_packed(code, cols).transformed(back, rows, cols) for code in codes]
+            if all(0 <= move.x_to < state.rows and 0 <= move.y_to < state.cols
+                   and state.board[move.x_from][move.y_from].get_count(state.our_species) >= move.count
+                   for move in moves):
+                self.hits += 1
+                return moves, depth
+        self.misses += 1
+        return None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+
+def opening_state(game_map, side: int = 0) -> GameState:
+    """Position after the setup messages, for player side (0 = werewolves, who move first)."""
+    state = GameState()
+    referee = Referee(game_map)
+    messages = dict((message[0], message[1]) for message in referee.setup_messages(side))
+    state.initialize_from_messages(messages["set"], [], list(messages["hme"]), messages["map"])
+    return state
+
+
+def swap_sides(state: GameState) -> GameState:
+    """The same board seen by the other player."""
+    swapped = state.clone()
+    swapped.our_species, swapped.opponent_species = state.opponent_species, state.our_species
+    return swapped
+
+
+def _search_job(job: Tuple[dict, int, float, int]) -> Tuple[int, List[Move], List[List[Move]]]:
+    """Search one position (worker process): (depth, best move, alternative moves)."""
+    state_dict, max_depth, time_limit, alternatives = job
+    state = GameState.from_dict(state_dict)
+    searcher = AlphaBetaSearch(max_depth=max_depth, time_limit=time_limit)
+    best = searcher.search(state)
+    others = [combo for combo in order_moves(state, generate_all_moves(state), False) if combo != best]
+    return searcher.completed_depth, best, others[:alternatives]
+
+
+def build_book(maps: List[Path], plies: int = 4, replies: int = 2, max_depth: int = 8,
+               time_limit: float = 20.0, workers: Optional[int] = None, progress: bool = True) -> OpeningBook:
+    """
+    Search the opening tree of every map.
+
+    Args:
+        maps: Map files
+        plies: Number of plies (single-side turns) booked from the opening
+        replies: Moves followed at each position: the best one plus
+            replies - 1 alternatives in move-ordering order
+        max_depth: Depth cap of each search
+        time_limit: Search time per position
+        workers: Worker processes (default: all cores)
+    """
+    book = OpeningBook()
+    frontier = [opening_state(load_map(path)) for path in maps]
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for ply in range(plies):
+            unique = {}
+            for state in frontier:
+                unique.setdefault(canonical_key(state)[0], state)
+            states = [state for key, state in unique.items() if key not in book.entries]
+            jobs = [(state.to_dict(), max_depth, time_limit, replies - 1) for state in states]
+            frontier = []
+            for state, (depth, best, others) in zip(states, pool.map(_search_job, jobs)):
+                book.add(state, depth, best)
+                if ply + 1 < plies:
+                    for moves in [best] + others:
+                        frontier.append(swap_sides(apply_move_to_state(state, moves)))
+            if progress:
+                print(f"Ply {ply + 1}/{plies}: {len(states)} positions searched, "
+                      f"{len(book)} entries, {time.perf_counter() - start:.0f}s")
+    return book
+
+
+def main():
+    parser = ArgumentParser(description="Build an opening book for the maps in maps/")
+    parser.add_argument("maps", nargs="*", help="Map files (default: all of maps/)")
+    parser.add_argument("--output", default=str(DEFAULT_BOOK))
+    parser.add_argument("--plies", type=int, default=4, help="Plies booked from each opening")
+    parser.add_argument("--replies", type=int, default=2, help="Moves followed per position")
+    parser.add_argument("--depth", type=int, default=8, help="Depth cap of each search")
+    parser.add_argument("--time-limit", type=float, default=20.0, help="Search time per position")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    maps = [Path(path) for path in args.maps] or list_maps()
+    book = build_book(maps, args.plies, args.replies, args.depth, args.time_limit, args.workers)
+    book.save(args.output)
+    print(f"Wrote {len(book)} positions ({os.path.getsize(args.output)} bytes) to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+"""
+Two-level planning for large maps.
+
+The coarse level splits the board into square regions and plans macro
+objectives for each side: send the groups of a region towards a human
+cluster (the humans of one region) they can convert, or towards an enemy
+group they can kill outright (1.5x). Plans are scored by the creatures at
+stake over the Chebyshev distance and cached on a coarse summary of the
+board (per-region totals), so they survive turns where no group crosses a
+region border and no battle happens.
+
+The fine level is the usual alpha-beta: at our plies, MacroPlans.restrict()
+keeps only the moves that step towards the target of one of our top plans
+from the plan's region (or a neighbouring one), plus every move into humans
+or enemies so tactics are never pruned. The opponent's replies are searched
+in full. Planning is opt-in (AlphaBetaSearch(planner=True), --planner).
+"""
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from game_state import GameState, Move
+
+# With the planner on, boards of at least this many cells are planned (20x20 and up)
+PLANNER_MIN_CELLS = 400
+# Plans kept per side
+TOP_PLANS = 3
+# Score factor of an objective an enemy that kills the group is as close to
+RISKY_TARGET_FACTOR = 0.5
+# Coarse summaries remembered by Planner
+MAX_CACHED = 64
+
+
+def region_size(rows: int, cols: int) -> int:
+    """Side of the square regions of a board (about 8 regions along the long side)."""
+    return max(3, max(rows, cols) // 8)
+
+
+class MacroPlan:
+    """Objective of the groups of one region."""
+
+    __slots__ = ("region", "target", "kind", "score")
+
+    def __init__(self, region: Tuple[int, int], target: Tuple[int, int], kind: str, score: float):
+        self.region = region
+        self.target = target
+        self.kind = kind
+        self.score = score
+
+    def to_dict(self) -> dict:
+        return {"region": list(self.region), "target": list(self.target), "kind": self.kind,
+                "score": round(self.score, 3)}
+
+    def __repr__(self) -> str:
+        return f"MacroPlan({self.region}→{self.target} {self.kind} {self.score:.2f})"
+
+
+class MacroPlans:
+    """Top plans of both sides for one position, from our point of view."""
+
+    def __init__(self, size: int, ours: List[MacroPlan], theirs: List[MacroPlan]):
+        self.size = size
+        self.ours = ours
+        self.theirs = theirs
+
+    def restrict(self, state: GameState, moves: List[List[Move]], for_opponent: bool = False) -> List[List[Move]]:
+        """
+        Keep the move combinations consistent with the side's plans.
+
+        Returns:
+            The kept combinations (a new list), or moves itself when the
+            side has no plan or no combination would be kept
+        """
+        plans = self.theirs if for_opponent else self.ours
+        if not plans:
+            return moves
+        enemy = state.our_species if for_opponent else state.opponent_species
+        size = self.size
+        kept = []
+        for combo in moves:
+            for move in combo:
+                target = state.board[move.x_to][move.y_to]
+                if target.humans or target.get_count(enemy):
+                    continue
+                rx, ry = move.x_from // size, move.y_from // size
+                for plan in plans:
+                    if abs(plan.region[0] - rx) <= 1 and abs(plan.region[1] - ry) <= 1:
+                        tx, ty = plan.target
+                        if (max(abs(move.x_to - tx), abs(move.y_to - ty))
+                                < max(abs(move.x_from - tx), abs(move.y_from - ty))):
+                            break
+                else:
+                    break
+            else:
+                kept.append(combo)
+        return kept if kept else moves
+
+    def to_dict(self) -> dict:
+        return {"region_size": self.size, "ours": [plan.to_dict() for plan in self.ours],
+                "theirs": [plan.to_dict() for plan in self.theirs]}
+
+
+def coarse_summary(state: GameState, size: int) -> tuple:
+    """Per-region (humans, vampires, werewolves) totals of the occupied regions."""
+    totals: Dict[Tuple[int, int], List[int]] = {}
+    for x, row in enumerate(state.board):
+        for y, cell in enumerate(row):
+            if cell.humans or cell.vampires or cell.werewolves:
+                region = totals.setdefault((x // size, y // size), [0, 0, 0])
+                region[0] += cell.humans
+                region[1] += cell.vampires
+                region[2] += cell.werewolves
+    return tuple(sorted((region, tuple(counts)) for region, counts in totals.items()))
+
+
+def plan_side(groups: List[Tuple[int, int, int]], enemies: List[Tuple[int, int, int]],
+              clusters: Dict[Tuple[int, int], List[Tuple[int, int, int]]], size: int,
+              top: int = TOP_PLANS) -> List[MacroPlan]:
+    """
+    Score the macro objectives of one side and keep the best per region and target.
+
+    Args:
+        groups: The side's (x, y, count) groups
+        enemies: The other side's groups
+        clusters: Human groups by region
+        size: Region size
+        top: Plans kept
+    """
+    best: Dict[Tuple[Tuple[int, int], Tuple[int, int]], MacroPlan] = {}
+
+    def offer(region, target, kind, score):
+        known = best.get((region, target))
+        if known is None or score > known.score:
+            best[(region, target)] = MacroPlan(region, target, kind, score)
+
+    for x, y, count in groups:
+        region = (x // size, y // size)
+        killers = [(ex, ey) for ex, ey, enemy_count in enemies if enemy_count >= 1.5 * count]
+        for humans in clusters.values():
+            convertible = [(max(abs(hx - x), abs(hy - y)), hx, hy) for hx, hy, h in humans if h <= count]
+            if not convertible:
+                continue
+            distance, hx, hy = min(convertible)
+            score = sum(h for _, _, h in humans if h <= count) / (1 + distance)
+            if any(max(abs(hx - ex), abs(hy - ey)) <= distance for ex, ey in killers):
+                score *= RISKY_TARGET_FACTOR
+            offer(region, (hx, hy), "humans", score)
+        for ex, ey, enemy_count in enemies:
+            if count >= 1.5 * enemy_count:
+                offer(region, (ex, ey), "attack", 2.0 * enemy_count / (1 + max(abs(ex - x), abs(ey - y))))
+    return sorted(best.values(), key=lambda plan: -plan.score)[:top]
+
+
+class Planner:
+    """
+    Coarse planner with plans cached on the coarse summary of the board.
+
+    Attributes:
+        hits, misses: Cache lookups that did / did not find plans
+        last_time: Seconds spent by the last plans() call
+    """
+
+    def __init__(self, top: int = TOP_PLANS, max_cached: int = MAX_CACHED):
+        self.top = top
+        self.max_cached = max_cached
+        self.cache: "OrderedDict[tuple, MacroPlans]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.last_time = 0.0
+        self.last_cached = False
+
+    def plans(self, state: GameState) -> Optional[MacroPlans]:
+        """Get the plans of a position (None without species)."""
+        if state.our_species is None or state.opponent_species is None:
+            return None
+        start = time.perf_counter()
+        size = region_size(state.rows, state.cols)
+        key = (state.rows, state.cols, int(state.our_species), coarse_summary(state, size))
+        plans = self.cache.get(key)
+        self.last_cached = plans is not None
+        if plans is not None:
+            self.hits += 1
+            self.cache.move_to_end(key)
+        else:
+            self.misses += 1
+            clusters: Dict[Tuple[int, int], List[Tuple[int, int, int]]] = {}
+            for x, row in enumerate(state.board):
+                for y, cell in enumerate(row):
+                    if cell.humans:
+                        clusters.setdefault((x // size, y // size), []).append((x, y, cell.humans))
+            ours, theirs = state.get_our_groups(), state.get_opponent_groups()
+            plans = MacroPlans(size, plan_side(ours, theirs, clusters, size, self.top),
+                               plan_side(theirs, ours, clusters, size, self.top))
+            self.cache[key] = plans
+            if len(self.cache) > self.max_cached:
+                self.cache.popitem(last=False)
+        self.last_time = time.perf_counter() - start
+        return plans
@@ -0,0 +1,239 @@
+"""
+Map preprocessing run between the MAP message and the first UPD.
+
+analyze_map() derives static tables from the starting position:
+    neighbors        8-neighbourhood of every cell (compact_board.neighbor_table)
+    human_distances  Chebyshev distance from every cell to every human group
+    clusters         human groups within CLUSTER_RADIUS of each other, merged
+    flow             for every cell, the neighbour to step to towards the most
+                     attractive cluster (population over distance), or -1
+
+Cells are flat indices idx = x * cols + y (x=row, y=col), as in
+compact_board. Work stops at a hard time budget; given a cache directory, a
+complete analysis is pickled under the map's hash so the next game on the
+same map loads it instead of recomputing. AIPlayer's fallback move follows
+the flow field.
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from array import array
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from game_state import GameState
+from compact_board import neighbor_table
+
+CACHE_VERSION = 1
+DEFAULT_CACHE_DIR = Path(os.environ.get("VVW_CACHE_DIR", Path.home() / ".cache" / "vampires-werewolves")) / "maps"
+# Human groups at most this far apart form one cluster
+CLUSTER_RADIUS = 2
+STAGES = ("neighbors", "distances", "clusters", "flow")
+
+
+class MapAnalysis:
+    """Static tables of one starting position."""
+
+    def __init__(self, rows: int, cols: int, key: str):
+        self.rows = rows
+        self.cols = cols
+        self.key = key
+        # Initial human groups as (x, y, count)
+        self.humans: List[Tuple[int, int, int]] = []
+        self.neighbors: Optional[Tuple[Tuple[int, ...], ...]] = None
+        self.human_distances: List[array] = []
+        # Each cluster: {"groups": [human group indices], "total": n, "center": (x, y)}
+        self.clusters: List[dict] = []
+        self.flow: Optional[array] = None
+        # Stages finished within the budget
+        self.completed: List[str] = []
+        self.build_time = 0.0
+        self.from_cache = False
+
+    @property
+    def complete(self) -> bool:
+        return len(self.completed) == len(STAGES)
+
+    def distance(self, group: int, x: int, y: int) -> int:
+        """Chebyshev distance from cell (x, y) to initial human group index."""
+        return self.human_distances[group][x * self.cols + y]
+
+    def next_step(self, x: int, y: int) -> Optional[Tuple[int, int]]:
+        """Flow-field step from (x, y) towards the best human cluster, or None."""
+        if self.flow is None:
+            return None
+        target = self.flow[x * self.cols + y]
+        return None if target < 0 else divmod(target, self.cols)
+
+    def __repr__(self) -> str:
+        return (f"MapAnalysis({self.rows}x{self.cols}, humans={len(self.humans)}, "
+                f"clusters={len(self.clusters)}, stages={self.completed}, "
+                f"{'cached' if self.from_cache else f'{self.build_time * 1000:.1f}ms'})")
+
+
+class _OutOfTime(Exception):
+    pass
+
+
+def map_key(state: GameState) -> str:
+    """Hash of the board size and every occupied cell of a starting position."""
+    digest = hashlib.sha1(f"v{CACHE_VERSION}:{state.rows}x{state.cols}".encode())
+    for row in state.board:
+        for cell in row:
+            if cell.humans or cell.vampires or cell.werewolves:
+                digest.update(f"{cell.x},{cell.y}:{cell.humans},{cell.vampires},{cell.werewolves};".encode())
+    return digest.hexdigest()
+
+
+def analyze_map(state: GameState, budget: float = 0.1) -> MapAnalysis:
+    """
+    Build the tables of a starting position within a time budget.
+
+    Args:
+        state: Position after the MAP message
+        budget: Seconds available; stages not finished in time are left empty
+
+    Returns:
+        The analysis, with .completed listing the finished stages
+    """
+    start = time.perf_counter()
+    deadline = start + budget
+    analysis = MapAnalysis(state.rows, state.cols, map_key(state))
+    analysis.humans = [(cell.x, cell.y, cell.humans) for row in state.board for cell in row if cell.humans]
+    try:
+        for stage in STAGES:
+            _STAGE_FUNCTIONS[stage](analysis, deadline)
+            analysis.completed.append(stage)
+            _check(deadline)
+    except _OutOfTime:
+        pass
+    analysis.build_time = time.perf_counter() - start
+    return analysis
+
+
+def _check(deadline: float):
+    if time.perf_counter() > deadline:
+        raise _OutOfTime()
+
+
+def _neighbors(analysis: MapAnalysis, deadline: float):
+    analysis.neighbors = neighbor_table(analysis.rows, analysis.cols)
+
+
+def _distances(analysis: MapAnalysis, deadline: float):
+    rows, cols = analysis.rows, analysis.cols
+    distances = []
+    for hx, hy, _ in analysis.humans:
+        _check(deadline)
+        column_distance = [abs(y - hy) for y in range(cols)]
+        table = array("H")
+        for x in range(rows):
+            dx = abs(x - hx)
+            table.extend([dx if dx > dy else dy for dy in column_distance])
+        distances.append(table)
+    analysis.human_distances = distances
+
+
+def _clusters(analysis: MapAnalysis, deadline: float):
+    humans = analysis.humans
+    parent = list(range(len(humans)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, (x1, y1, _) in enumerate(humans):
+        _check(deadline)
+        for j in range(i + 1, len(humans)):
+            x2, y2, _ = humans[j]
+            if max(abs(x1 - x2), abs(y1 - y2)) <= CLUSTER_RADIUS:
+                parent[find(j)] = find(i)
+
+    members = {}
+    for i in range(len(humans)):
+        members.setdefault(find(i), []).append(i)
+    clusters = []
+    for groups in members.values():
+        total = sum(humans[i][2] for i in groups)
+        center = (round(sum(humans[i][0] * humans[i][2] for i in groups) / total),
+                  round(sum(humans[i][1] * humans[i][2] for i in groups) / total))
+        clusters.append({"groups": groups, "total": total, "center": center})
+    clusters.sort(key=lambda cluster: -cluster["total"])
+    analysis.clusters = clusters
+
+
+def _flow(analysis: MapAnalysis, deadline: float):
+    cols = analysis.cols
+    size = analysis.rows * cols
+    flow = array("i", [-1]) * size
+    if analysis.clusters:
+        # Distance to a cluster = distance to its nearest group
+        cluster_distances = []
+        for cluster in analysis.clusters:
+            _check(deadline)
+            tables = [analysis.human_distances[i] for i in cluster["groups"]]
+            cluster_distances.append(array("H", map(min, *tables)) if len(tables) > 1 else tables[0])
+        totals = [cluster["total"] for cluster in analysis.clusters]
+        neighbors = analysis.neighbors
+        for cell in range(size):
+            if cell % cols == 0:
+                _check(deadline)
+            # Most attractive cluster from this cell, then the neighbour closest to it
+            best = max(range(len(totals)), key=lambda c: totals[c] / (1 + cluster_distances[c][cell]))
+            distances = cluster_distances[best]
+            if distances[cell] == 0:
+                continue
+            flow[cell] = min(neighbors[cell], key=distances.__getitem__)
+    analysis.flow = flow
+
+
+_STAGE_FUNCTIONS = {
+    "neighbors": _neighbors,
+    "distances": _distances,
+    "clusters": _clusters,
+    "flow": _flow,
+}
+
+
+def load_or_analyze(state: GameState, budget: float = 0.1, cache_dir=None) -> MapAnalysis:
+    """
+    Get the analysis of a starting position from the disk cache, or build it.
+
+    Only complete analyses are cached. A missing or unreadable cache is
+    silently rebuilt; a read-only cache directory only disables saving.
+
+    Args:
+        state: Position after the MAP message
+        budget: Time budget for building (loading is not limited)
+        cache_dir: Cache directory (e.g. DEFAULT_CACHE_DIR), None to disable
+            the cache
+    """
+    start = time.perf_counter()
+    key = map_key(state)
+    path = Path(cache_dir) / f"{key}.pickle" if cache_dir is not None else None
+    if path is not None and path.exists():
+        try:
+            with open(path, "rb") as f:
+                analysis = pickle.load(f)
+            if isinstance(analysis, MapAnalysis) and analysis.key == key:
+                analysis.from_cache = True
+                analysis.build_time = time.perf_counter() - start
+                return analysis
+        except Exception:
+            pass
+
+    analysis = analyze_map(state, max(0.0, budget - (time.perf_counter() - start)))
+    if path is not None and analysis.complete:
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump(analysis, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+    return analysis
@@ -0,0 +1,298 @@
+"""
+Binary game records: a compact log written by AIPlayer and an mmap reader.
+
+File layout (little-endian):
+    header   "VVWR", version (B), keyframe interval (B)
+    records  type (B), payload length (I), payload
+    trailer  INDEX record, then its offset (Q) and "VVWI" (written on close)
+
+Payloads keep the protocol's byte layout: SET/HME are two bytes, HUM is
+(x, y) pairs, MAP/UPD/KEY are (x, y, humans, vampires, werewolves) cells.
+A MOVE record holds search stats (depth B, nodes I, search time f, move
+time f) followed by the (x_from, y_from, count, x_to, y_to) moves. Every
+keyframe interval turns a KEY record stores the full board, so any turn is
+rebuilt from the nearest keyframe plus a few UPDs. A file without trailer
+(e.g. the player crashed) is indexed by scanning record headers only.
+"""
+import mmap
+import struct
+from argparse import ArgumentParser
+from typing import Iterator, List, Optional, Tuple
+
+from game_state import GameState
+
+MAGIC = b"VVWR"
+TRAILER_MAGIC = b"VVWI"
+VERSION = 1
+KEYFRAME_INTERVAL = 10
+
+HEADER = struct.Struct("<4sBB")
+RECORD = struct.Struct("<BI")
+MOVE_STATS = struct.Struct("<BIff")
+TRAILER = struct.Struct("<Q4s")
+INDEX_TURN = struct.Struct("<QQQ")
+
+# Record types
+SET, HUM, HME, MAP, UPD, KEY, MOVE, INDEX = range(1, 9)
+MESSAGE_TYPES = {"set": SET, "hum": HUM, "hme": HME, "map": MAP, "upd": UPD}
+
+
+def _cells_payload(cells) -> bytes:
+    return b"".join(bytes(cell) for cell in cells)
+
+
+class GameRecorder:
+    """Append-only writer of a game record."""
+
+    def __init__(self, path, keyframe_interval: int = KEYFRAME_INTERVAL):
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, VERSION, keyframe_interval))
+        self.turn = 0
+        # Per turn: [UPD offset, KEY offset, MOVE offset] (0 when absent)
+        self._index: List[List[int]] = []
+
+    def _write(self, record_type: int, payload: bytes) -> int:
+        offset = self._file.tell()
+        self._file.write(RECORD.pack(record_type, len(payload)))
+        self._file.write(payload)
+        return offset
+
+    def record_message(self, message: list, state: Optional[GameState] = None):
+        """
+        Log a server message.
+
+        Args:
+            message: Message as returned by ClientSocket.get_message
+            state: Game state after the message was applied; used for keyframes
+        """
+        if not message or message[0] not in MESSAGE_TYPES:
+            return
+        tag, data = message
+        payload = bytes(data) if tag in ("set", "hme") else _cells_payload(data)
+        offset = self._write(MESSAGE_TYPES[tag], payload)
+
+        if tag == "upd":
+            self.turn += 1
+            entry = [offset, 0, 0]
+            if state is not None and self.turn % self.keyframe_interval == 0:
+                entry[1] = self._write(KEY, _cells_payload(board_cells(state)))
+            self._index.append(entry)
+
+    def record_move(self, moves: List[Tuple[int, int, int, int, int]], stats: dict):
+        """Log the move chosen for the current turn with its search stats."""
+        payload = MOVE_STATS.pack(min(int(stats.get("depth", stats.get("tree_depth", 0))), 255),
+                                  int(stats.get("nodes", stats.get("playouts", 0))),
+                                  float(stats.get("time", 0.0)), float(stats.get("move_time", 0.0)))
+        offset = self._write(MOVE, payload + _cells_payload(moves))
+        if self._index:
+            self._index[-1][2] = offset
+        # One flush per turn keeps the record usable if the process dies
+        self._file.flush()
+
+    def close(self):
+        """Write the turn index and trailer, then close the file."""
+        if self._file.closed:
+            return
+        payload = b"".join(INDEX_TURN.pack(*entry) for entry in self._index)
+        offset = self._write(INDEX, payload)
+        self._file.write(TRAILER.pack(offset, TRAILER_MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def board_cells(state: GameState) -> List[Tuple[int, int, int, int, int]]:
+    """Non-empty cells in protocol order (x=column, y=row)."""
+    cells = []
+    for row in state.board:
+        for cell in row:
+            if cell.humans or cell.vampires or cell.werewolves:
+                cells.append((cell.y, cell.x, cell.humans, cell.vampires, cell.werewolves))
+    return cells
+
+
+class GameRecord:
+    """
+    Memory-mapped reader of a game record.
+
+    Turns are numbered like play_game: turn 1 is the first UPD. state(turn)
+    is the position the player searched on that turn.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.keyframe_interval = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} game record")
+        self.rows = self.cols = 0
+        self.home: List[int] = [0, 0]
+        self.humans: List[List[int]] = []
+        self.initial_cells: List[tuple] = []
+        self._turns: List[List[int]] = []
+        self.indexed = self._read_trailer()
+        self._read_setup()
+        if not self.indexed:
+            self._scan()
+
+    def _payload(self, offset: int) -> Tuple[int, memoryview]:
+        record_type, length = RECORD.unpack_from(self._map, offset)
+        start = offset + RECORD.size
+        return record_type, memoryview(self._map)[start:start + length]
+
+    def _read_trailer(self) -> bool:
+        size = len(self._map)
+        if size < HEADER.size + TRAILER.size:
+            return False
+        offset, magic = TRAILER.unpack_from(self._map, size - TRAILER.size)
+        if magic != TRAILER_MAGIC:
+            return False
+        record_type, payload = self._payload(offset)
+        if record_type != INDEX:
+            return False
+        self._turns = [list(entry) for entry in INDEX_TURN.iter_unpack(payload)]
+        return True
+
+    def _records(self) -> Iterator[Tuple[int, int, int]]:
+        """(offset, type, length) of every complete record, without reading payloads."""
+        offset = HEADER.size
+        size = len(self._map)
+        while offset + RECORD.size <= size:
+            record_type, length = RECORD.unpack_from(self._map, offset)
+            if offset + RECORD.size + length > size:
+                break  # Truncated record
+            yield offset, record_type, length
+            offset += RECORD.size + length
+
+    def _read_setup(self):
+        for offset, record_type, _ in self._records():
+            if record_type == UPD:
+                break
+            _, payload = self._payload(offset)
+            if record_type == SET:
+                self.rows, self.cols = payload
+            elif record_type == HME:
+                self.home = list(payload)
+            elif record_type == HUM:
+                self.humans = [list(cell) for cell in struct.iter_unpack("2B", payload)]
+            elif record_type == MAP:
+                self.initial_cells = list(struct.iter_unpack("5B", payload))
+
+    def _scan(self):
+        for offset, record_type, _ in self._records():
+            if record_type == UPD:
+                self._turns.append([offset, 0, 0])
+            elif record_type == KEY and self._turns:
+                self._turns[-1][1] = offset
+            elif record_type == MOVE and self._turns:
+                self._turns[-1][2] = offset
+
+    def __len__(self) -> int:
+        """Number of turns recorded."""
+        return len(self._turns)
+
+    def initial_state(self) -> GameState:
+        """Position after the MAP message."""
+        state = GameState(self.rows, self.cols)
+        state.initialize_from_messages((self.rows, self.cols), self.humans, self.home, self.initial_cells)
+        return state
+
+    def _cells(self, offset: int) -> List[tuple]:
+        _, payload = self._payload(offset)
+        return list(struct.iter_unpack("5B", payload))
+
+    def state(self, turn: int) -> GameState:
+        """
+        Rebuild the position searched on a turn (0 for the initial position).
+
+        Starts from the nearest keyframe at or before the turn, so at most
+        keyframe_interval - 1 UPDs are applied.
+        """
+        if not 0 <= turn <= len(self._turns):
+            raise IndexError(f"Turn {turn} not in record (1..{len(self._turns)})")
+        state = self.initial_state()
+        start = 0
+        for key_turn in range(turn, 0, -1):
+            key_offset = self._turns[key_turn - 1][1]
+            if key_offset:
+                for row in state.board:
+                    for cell in row:
+                        cell.humans = cell.vampires = cell.werewolves = 0
+                state.update_from_upd(self._cells(key_offset))
+                start = key_turn
+                break
+        for index in range(start, turn):
+            state.update_from_upd(self._cells(self._turns[index][0]))
+        return state
+
+    def move(self, turn: int) -> Optional[Tuple[List[tuple], dict]]:
+        """The move sent on a turn and its search stats, or None if none was recorded."""
+        offset = self._turns[turn - 1][2]
+        if not offset:
+            return None
+        _, payload = self._payload(offset)
+        depth, nodes, search_time, move_time = MOVE_STATS.unpack_from(payload)
+        moves = list(struct.iter_unpack("5B", payload[MOVE_STATS.size:]))
+        return moves, {"depth": depth, "nodes": nodes, "time": search_time, "move_time": move_time}
+
+    def positions(self, start: int = 1, stop: Optional[int] = None
+                  ) -> Iterator[Tuple[int, GameState, Optional[Tuple[List[tuple], dict]]]]:
+        """
+        Stream (turn, state, move) for turns start..stop.
+
+        The same GameState is updated in place between turns; clone it to
+        keep a position.
+        """
+        stop = len(self._turns) if stop is None else min(stop, len(self._turns))
+        if start > stop:
+            return
+        state = self.state(start)
+        for turn in range(start, stop + 1):
+            if turn > start:
+                state.update_from_upd(self._cells(self._turns[turn - 1][0]))
+            yield turn, state, self.move(turn)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = ArgumentParser(description="Inspect a game record")
+    parser.add_argument("record", help="Record file written by ai_player.py --record")
+    parser.add_argument("--turn", type=int, default=None, help="Print the position of a turn")
+    args = parser.parse_args()
+
+    with GameRecord(args.record) as record:
+        print(f"{args.record}: {record.rows}x{record.cols}, {len(record)} turns"
+              f"{'' if record.indexed else ' (no index, scanned)'}")
+        if args.turn is not None:
+            state = record.state(args.turn)
+            print(state)
+            for x, y, h, v, w in board_cells(state):
+                print(f"  ({x}, {y}): H={h} V={v} W={w}")
+            print(f"Move: {record.move(args.turn)}")
+            return
+        for turn in range(1, len(record) + 1):
+            move = record.move(turn)
+            if move:
+                moves, stats = move
+                print(f"Turn {turn}: depth={stats['depth']} nodes={stats['nodes']} "
+                      f"time={stats['move_time']:.3f}s moves={moves}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+Headless referee: plays games in-process (or over TCP) without the Go server.
+
+Rules follow server/twilight-master:
+- the first player is the werewolves and moves first; a game is a first
+  round plus 50 more (MAX_ROUNDS rounds of one move per player)
+- moves go to one of the 8 neighbouring cells, only with the player's own
+  creatures and never more than the cell holds
+- moves with the same target are merged into one arrival; units arriving
+  in a cell that was a source this turn are destroyed
+- more units than humans convert them all, at least 1.5x as many
+  units as enemies kill them all; any other fight is random
+  (simulate_battle by default)
+- a player with no creatures left loses; at the turn limit the larger army
+  wins
+"""
+import os
+import time
+import random
+import socket
+import struct
+import contextlib
+from argparse import ArgumentParser
+from typing import Callable, Dict, List, Optional, Tuple
+
+from game_state import Species
+from maps import GameMap, load_map
+from move_generator import simulate_battle
+
+# The Go server plays a first round and then 50 more
+MAX_ROUNDS = 51
+
+# Player 0 (first to connect) plays the werewolves, player 1 the vampires
+PLAYER_SPECIES = (Species.WEREWOLF, Species.VAMPIRE)
+
+# MOV tuple: (x_from, y_from, count, x_to, y_to), x being the column
+MoveTuple = Tuple[int, int, int, int, int]
+
+
+class IllegalMove(Exception):
+    """A MOV that breaks the rules; the whole turn is rejected."""
+    pass
+
+
+class Referee:
+    """Game rules and bookkeeping for one game."""
+
+    def __init__(self, game_map: GameMap, max_rounds: int = MAX_ROUNDS,
+                 battle_fn: Optional[Callable[[int, int, bool], Tuple[int, int]]] = None):
+        """
+        Args:
+            game_map: Starting position
+            max_rounds: Rounds before the game is decided on unit counts
+            battle_fn: Random battle resolver with the signature of
+                simulate_battle (e.g. batch_battle.BattleSampler)
+        """
+        self.rows = game_map.rows
+        self.cols = game_map.cols
+        self.map_name = game_map.name
+        self.cells: Dict[Tuple[int, int], List[int]] = {cell: list(counts)
+                                                        for cell, counts in game_map.cells.items()}
+        self.max_rounds = max_rounds
+        self.battle_fn = battle_fn if battle_fn is not None else simulate_battle
+        self.turn = 0
+        self.illegal_moves = [0, 0]
+        self.battles = 0
+        # What each player was last told, to send only changed cells in UPD
+        self._seen: List[Dict[Tuple[int, int], Tuple[int, int, int]]] = [{}, {}]
+
+    @property
+    def to_move(self) -> int:
+        """Id of the player whose turn it is."""
+        return self.turn % 2
+
+    def total(self, species: Species) -> int:
+        """Number of creatures of a species on the board."""
+        return sum(counts[species] for counts in self.cells.values())
+
+    def is_over(self) -> bool:
+        if self.turn >= 2 * self.max_rounds:
+            return True
+        return any(self.total(species) == 0 for species in PLAYER_SPECIES)
+
+    def winner(self) -> Optional[int]:
+        """Id of the winning player, or None for a draw (or a game in progress)."""
+        wolves, vampires = (self.total(species) for species in PLAYER_SPECIES)
+        if wolves == vampires:
+            return None
+        return 0 if wolves > vampires else 1
+
+    def setup_messages(self, player: int) -> List[list]:
+        """SET, HUM, HME and MAP messages for a player, as ClientSocket returns them."""
+        humans = sorted(cell for cell, counts in self.cells.items() if counts[Species.HUMAN])
+        home = min(cell for cell, counts in self.cells.items() if counts[PLAYER_SPECIES[player]])
+        return [
+            ["set", [self.rows, self.cols]],
+            ["hum", [[x, y] for x, y in humans]],
+            ["hme", list(home)],
+            ["map", self._snapshot_for(player, full=True)],
+        ]
+
+    def update_message(self, player: int) -> list:
+        """UPD with the cells that changed since the player's last message."""
+        return ["upd", self._snapshot_for(player)]
+
+    def _snapshot_for(self, player: int, full: bool = False) -> List[Tuple[int, int, int, int, int]]:
+        current = {cell: tuple(counts) for cell, counts in self.cells.items()}
+        seen = self._seen[player]
+        changed = current.keys() if full else {cell for cell in current.keys() | seen.keys()
+                                               if current.get(cell) != seen.get(cell)}
+        self._seen[player] = current
+        return [(x, y) + current.get((x, y), (0, 0, 0)) for x, y in sorted(changed)]
+
+    def validate(self, player: int, moves: List[MoveTuple]):
+        """
+        Check a MOV against the rules.
+
+        Raises:
+            IllegalMove: describing the first broken rule
+        """
+        species = PLAYER_SPECIES[player]
+        leaving: Dict[Tuple[int, int], int] = {}
+        for x_from, y_from, count, x_to, y_to in moves:
+            for x, y in ((x_from, y_from), (x_to, y_to)):
+                if not (0 <= x < self.cols and 0 <= y < self.rows):
+                    raise IllegalMove(f"Cell ({x}, {y}) is outside the grid")
+            if max(abs(x_to - x_from), abs(y_to - y_from)) != 1:
+                raise IllegalMove(f"({x_from}, {y_from}) -> ({x_to}, {y_to}) is not a neighbour")
+            if count < 1:
+                raise IllegalMove(f"Move of {count} units")
+            leaving[(x_from, y_from)] = leaving.get((x_from, y_from), 0) + count
+        for cell, count in leaving.items():
+            available = self.cells.get(cell, (0, 0, 0))[species]
+            if available < count:
+                raise IllegalMove(f"Moving {count} units from {cell} which holds {available}")
+
+    def apply(self, player: int, moves: List[MoveTuple]) -> bool:
+        """
+        Play a player's turn.
+
+        Illegal moves reject the whole turn (the player passes).
+
+        Returns:
+            True if the moves were legal
+        """
+        if player != self.to_move:
+            raise ValueError(f"It is player {self.to_move}'s turn")
+        self.turn += 1
+        try:
+            self.validate(player, moves)
+        except IllegalMove:
+            self.illegal_moves[player] += 1
+            return False
+
+        species = PLAYER_SPECIES[player]
+        enemy = PLAYER_SPECIES[1 - player]
+        arriving: Dict[Tuple[int, int], int] = {}
+        sources = set()
+        for x_from, y_from, count, x_to, y_to in moves:
+            source = self.cells[(x_from, y_from)]
+            source[species] -= count
+            sources.add((x_from, y_from))
+            arriving[(x_to, y_to)] = arriving.get((x_to, y_to), 0) + count
+
+        for target, count in arriving.items():
+            if target in sources:
+                # Source-and-target rule: these units are lost
+                continue
+            cell = self.cells.setdefault(target, [0, 0, 0])
+            if cell[Species.HUMAN]:
+                self._fight(cell, species, Species.HUMAN, count)
+            elif cell[enemy]:
+                self._fight(cell, species, enemy, count)
+            else:
+                cell[species] += count
+
+        self.cells = {cell: counts for cell, counts in self.cells.items() if any(counts)}
+        return True
+
+    def _fight(self, cell: List[int], species: Species, defender: Species, attackers: int):
+        """Resolve a battle in place; the winner holds the cell."""
+        defenders = cell[defender]
+        is_human = defender == Species.HUMAN
+        if is_human and attackers > defenders:
+            survivors, remaining = attackers + defenders, 0
+        elif not is_human and attackers >= 1.5 * defenders:
+            survivors, remaining = attackers, 0
+        else:
+            self.battles += 1
+            survivors, remaining = self.battle_fn(attackers, defenders, is_human)
+        cell[defender] = remaining
+        cell[species] = survivors if not remaining else 0
+
+    def result(self) -> dict:
+        winner = self.winner()
+        return {
+            "map": self.map_name,
+            "winner": winner,
+            "winner_species": PLAYER_SPECIES[winner].name.lower() if winner is not None else None,
+            "rounds": (self.turn + 1) // 2,
+            "werewolves": self.total(Species.WEREWOLF),
+            "vampires": self.total(Species.VAMPIRE),
+            "humans": self.total(Species.HUMAN),
+            "illegal_moves": list(self.illegal_moves),
+            "random_battles": self.battles,
+        }
+
+
+def play_game(players, game_map: GameMap, max_rounds: int = MAX_ROUNDS,
+              battle_fn: Optional[Callable[[int, int, bool], Tuple[int, int]]] = None,
+              seed: Optional[int] = None, quiet: bool = True) -> dict:
+    """
+    Play one game between two AIPlayer-like objects in-process.
+
+    Args:
+        players: (werewolves player, vampires player), each with
+            update_from_message, compute_move, record_move_sent and end_turn
+        game_map: Starting position
+        max_rounds: Rounds before the game is decided on unit counts
+        battle_fn: Random battle resolver (default simulate_battle)
+        seed: Seed for the global random module used by simulate_battle
+        quiet: Silence the players' console output
+
+    Returns:
+        Referee.result() plus, per player, "move_times" (seconds) and
+        "search_stats" (depth and nodes/sec of each search, from the
+        player's last_turn_stats when it has them)
+    """
+    if seed is not None:
+        random.seed(seed)
+    referee = Referee(game_map, max_rounds=max_rounds, battle_fn=battle_fn)
+    move_times: List[List[float]] = [[], []]
+    search_stats: List[List[dict]] = [[], []]
+    with _silenced(quiet):
+        for player_id, player in enumerate(players):
+            for message in referee.setup_messages(player_id):
+                player.update_from_message(message)
+
+        while not referee.is_over():
+            player_id = referee.to_move
+            player = players[player_id]
+            player.update_from_message(referee.update_message(player_id))
+            start = time.perf_counter()
+            try:
+                _, moves = player.compute_move()
+            except Exception as e:
+                print(f"Player {player_id} failed to move: {e}")
+                moves = []
+            else:
+                player.record_move_sent(moves, time.perf_counter())
+            move_times[player_id].append(time.perf_counter() - start)
+            search_stats[player_id].append(_search_summary(getattr(player, "last_turn_stats", {})))
+            referee.apply(player_id, moves)
+            player.end_turn()
+
+    result = referee.result()
+    result["move_times"] = move_times
+    result["search_stats"] = search_stats
+    return result
+
+
+def _search_summary(stats: dict) -> dict:
+    """Depth and speed of one search; MCTS reports tree depth and playouts instead."""
+    return {
+        "depth": stats.get("depth", stats.get("tree_depth")),
+        "nodes_per_sec": stats.get("nodes_per_sec", stats.get("playouts_per_sec")),
+    }
+
+
+@contextlib.contextmanager
+def _silenced(quiet: bool):
+    if not quiet:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _read_exactly(conn: socket.socket, length: int) -> bytes:
+    data = b""
+    while len(data) < length:
+        chunk = conn.recv(length - len(data))
+        if not chunk:
+            raise ConnectionError("Player disconnected")
+        data += chunk
+    return data
+
+
+def _encode(message: list) -> bytes:
+    """Encode a referee message in the server's wire format."""
+    tag, data = message
+    if tag in ("set", "hme"):
+        return tag.upper().encode() + bytes(data)
+    if tag == "hum":
+        return b"HUM" + bytes([len(data)]) + bytes(v for cell in data for v in cell)
+    return tag.upper().encode() + bytes([len(data)]) + b"".join(struct.pack("5B", *cell) for cell in data)
+
+
+def _read_mov(conn: socket.socket, buffer: bytearray) -> List[MoveTuple]:
+    """
+    Read one MOV.
+    
+    Bytes received before a socket.timeout stay in buffer, so the next call
+    finishes the same MOV instead of parsing its middle as a new one.
+    """
+    while len(buffer) < 4 or len(buffer) < 4 + 5 * buffer[3]:
+        length = 4 if len(buffer) < 4 else 4 + 5 * buffer[3]
+        chunk = conn.recv(length - len(buffer))
+        if not chunk:
+            raise ConnectionError("Player disconnected")
+        buffer += chunk
+        if len(buffer) >= 3 and buffer[:3] != b"MOV":
+            raise ConnectionError(f"Expected MOV, got {bytes(buffer[:3])!r}")
+    moves = list(struct.iter_unpack("5B", buffer[4:]))
+    buffer.clear()
+    return moves
+
+
+def serve(game_map: GameMap, host: str = "localhost", port: int = 5555,
+          max_rounds: int = MAX_ROUNDS, move_timeout: float = 2.0, seed: Optional[int] = None,
+          on_listen: Optional[Callable[[int], None]] = None) -> dict:
+    """
+    Referee one game over TCP, speaking the Go server's protocol.
+
+    The first client to connect plays the werewolves. A client that does
+    not answer within move_timeout passes its turn; its late MOV is read
+    and discarded before its next UPD. A client whose late MOV has still
+    not arrived by then is dropped: it passes every remaining turn
+    (result["dropped"]).
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        on_listen: Called with the bound port once clients can connect
+    """
+    if seed is not None:
+        random.seed(seed)
+    referee = Referee(game_map, max_rounds=max_rounds)
+    with socket.create_server((host, port)) as listener:
+        port = listener.getsockname()[1]
+        print(f"Referee listening on {host}:{port} ({game_map.name})")
+        if on_listen is not None:
+            on_listen(port)
+        conns = []
+        for player_id in range(2):
+            conn, _ = listener.accept()
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            header = _read_exactly(conn, 4)
+            name = _read_exactly(conn, header[3]).decode(errors="replace")
+            print(f"Player {player_id} ({PLAYER_SPECIES[player_id].name.lower()}): {name}")
+            conn.sendall(b"".join(_encode(message) for message in referee.setup_messages(player_id)))
+            conns.append(conn)
+
+        # Partly received MOV of each player, and whether a MOV is owed from a timed-out turn
+        buffers = [bytearray(), bytearray()]
+        late = [False, False]
+        dropped = []
+        try:
+            while not referee.is_over():
+                player_id = referee.to_move
+                conn = conns[player_id]
+                if player_id in dropped:
+                    referee.apply(player_id, [])
+                    continue
+                conn.settimeout(move_timeout)
+                if late[player_id]:
+                    try:
+                        _read_mov(conn, buffers[player_id])
+                        late[player_id] = False
+                    except socket.timeout:
+                        print(f"Player {player_id} still has not answered, dropping it")
+                        dropped.append(player_id)
+                        referee.apply(player_id, [])
+                        continue
+                conn.sendall(_encode(referee.update_message(player_id)))
+                try:
+                    moves = _read_mov(conn, buffers[player_id])
+                except socket.timeout:
+                    print(f"Player {player_id} timed out")
+                    late[player_id] = True
+                    moves = []
+                referee.apply(player_id, moves)
+        finally:
+            for conn in conns:
+                with contextlib.suppress(OSError):
+                    conn.sendall(b"END" + b"BYE")
+                conn.close()
+    return dict(referee.result(), dropped=dropped)
+
+
+def main():
+    parser = ArgumentParser(description="Headless Vampires VS Werewolves referee")
+    parser.add_argument("map", nargs="?", default="thetrap.xml", help="Map file (path or name in maps/)")
+    parser.add_argument("--games", type=int, default=1, help="Number of in-process games")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--time-limit", type=float, default=0.1, help="Search time per move")
+    parser.add_argument("--rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--tcp", action="store_true", help="Referee one game over TCP instead")
+    parser.add_argument("--port", type=int, default=5555)
+    args = parser.parse_args()
+
+    game_map = load_map(args.map)
+    if args.tcp:
+        print(serve(game_map, port=args.port, max_rounds=args.rounds, seed=args.seed))
+        return
+
+    from ai_player import AIPlayer
+    start = time.perf_counter()
+    for game in range(args.games):
+        players = [AIPlayer(name=f"AI{i}", max_depth=args.depth, time_limit=args.time_limit) for i in range(2)]
+        seed = None if args.seed is None else args.seed + game
+        try:
+            result = play_game(players, game_map, max_rounds=args.rounds, seed=seed)
+        finally:
+            for player in players:
+                player.close()
+        print(f"Game {game + 1}: winner={result['winner_species']} rounds={result['rounds']} "
+              f"W={result['werewolves']} V={result['vampires']} H={result['humans']}")
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games in {elapsed:.1f}s ({3600 * args.games / elapsed:.0f} games/hour)")
+
+
+if __name__ == "__main__":
+    main()
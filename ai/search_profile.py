@@ -0,0 +1,184 @@
+"""
+Per-phase instrumentation of AlphaBetaSearch.
+
+A SearchProfiler replaces the search's hot-path hooks (move generation,
+ordering, cloning, move application, evaluation, time checks and the
+recursive node call) with timed and counted versions. A search built
+without a profiler calls the plain functions, so disabled profiling costs
+one attribute test per cutoff.
+
+Each search produces one JSON-compatible record:
+    phases      {phase: {"time": seconds, "calls": n}} for PHASES
+    plies       {ply: {"nodes", "movegen_calls", "moves", "applies",
+                 "evals", "cutoffs": {move index: n}}}, ply 0 being the root
+    iterations  [{"depth", "value", "nodes", "time"}] per completed depth
+    timeouts    number of iterations abandoned on the time limit
+"""
+import math
+import time
+from typing import Callable, Dict, List
+
+from game_state import GameState
+from move_generator import apply_moves_in_place
+
+PHASES = ("movegen", "order", "clone", "apply", "eval", "time_check")
+PLY_COUNTERS = ("nodes", "movegen_calls", "moves", "applies", "evals")
+
+
+class SearchProfiler:
+    """Cumulative phase timers and per-ply counters for one search at a time."""
+
+    def __init__(self, clock: Callable[[], float] = time.perf_counter):
+        self.clock = clock
+        self.phase_time = dict.fromkeys(PHASES, 0.0)
+        self.phase_calls = dict.fromkeys(PHASES, 0)
+        self.plies: Dict[int, Dict[str, int]] = {}
+        self.cutoffs: Dict[int, Dict[int, int]] = {}
+        self.iterations: List[dict] = []
+        self.timeouts = 0
+        # Ply of the node being searched (0 at the root)
+        self.ply = 0
+
+    def reset(self):
+        """Clear all counters before a new search."""
+        for phase in PHASES:
+            self.phase_time[phase] = 0.0
+            self.phase_calls[phase] = 0
+        self.plies.clear()
+        self.cutoffs.clear()
+        self.iterations.clear()
+        self.timeouts = 0
+        self.ply = 0
+
+    def _counters(self, ply: int) -> Dict[str, int]:
+        counters = self.plies.get(ply)
+        if counters is None:
+            counters = self.plies[ply] = dict.fromkeys(PLY_COUNTERS, 0)
+        return counters
+
+    def cutoff(self, ply: int, index: int):
+        """Count a beta/alpha cutoff after the move at index (0 = first searched)."""
+        by_index = self.cutoffs.setdefault(ply, {})
+        by_index[index] = by_index.get(index, 0) + 1
+
+    def iteration(self, depth: int, value: float, nodes: int, elapsed: float):
+        """Record a completed iterative-deepening depth."""
+        # Infinite (decided) values are not valid JSON
+        value = value if math.isfinite(value) else None
+        self.iterations.append({"depth": depth, "value": value, "nodes": nodes, "time": elapsed})
+
+    def timeout(self):
+        """Count an iteration abandoned on the time limit."""
+        self.timeouts += 1
+
+    def instrument(self, search):
+        """
+        Install timed versions of the search's hooks.
+
+        Args:
+            search: AlphaBetaSearch whose _generate_moves, _order_moves,
+                _apply_move, _evaluate, out_of_time and alpha_beta are wrapped
+                (_evaluate calls the search's current _leaf_evaluate)
+        """
+        clock = self.clock
+        phase_time = self.phase_time
+        phase_calls = self.phase_calls
+        counters = self._counters
+        generate = search._generate_moves
+        order = search._order_moves
+        out_of_time = search.out_of_time
+        node = search.alpha_beta
+
+        def generate_moves(state: GameState, for_opponent: bool = False, out=None):
+            start = clock()
+            moves = generate(state, for_opponent=for_opponent, out=out)
+            phase_time["movegen"] += clock() - start
+            phase_calls["movegen"] += 1
+            ply_counters = counters(self.ply)
+            ply_counters["movegen_calls"] += 1
+            ply_counters["moves"] += len(moves)
+            return moves
+
+        def order_moves(state: GameState, moves, for_opponent: bool = False):
+            start = clock()
+            result = order(state, moves, for_opponent)
+            phase_time["order"] += clock() - start
+            phase_calls["order"] += 1
+            return result
+
+        def apply_move(state: GameState, moves, for_opponent: bool = False, out=None):
+            # Same as apply_move_to_state, with the copy timed separately
+            start = clock()
+            if out is not None:
+                out.copy_from(state)
+                new_state = out
+            else:
+                new_state = state.clone()
+            new_state._moves_base = state._moves_base
+            copied = clock()
+            apply_moves_in_place(new_state, moves, for_opponent)
+            phase_time["clone"] += copied - start
+            phase_time["apply"] += clock() - copied
+            phase_calls["clone"] += 1
+            phase_calls["apply"] += 1
+            counters(self.ply)["applies"] += 1
+            return new_state
+
+        def timed_evaluate(state: GameState) -> float:
+            start = clock()
+            value = search._leaf_evaluate(state)
+            phase_time["eval"] += clock() - start
+            phase_calls["eval"] += 1
+            counters(self.ply)["evals"] += 1
+            return value
+
+        def timed_out_of_time() -> bool:
+            start = clock()
+            result = out_of_time()
+            phase_time["time_check"] += clock() - start
+            phase_calls["time_check"] += 1
+            return result
+
+        def alpha_beta(state, depth, alpha, beta, maximizing, ply=1):
+            parent = self.ply
+            self.ply = ply
+            counters(ply)["nodes"] += 1
+            try:
+                return node(state, depth, alpha, beta, maximizing, ply)
+            finally:
+                self.ply = parent
+
+        search._generate_moves = generate_moves
+        search._order_moves = order_moves
+        search._apply_move = apply_move
+        search._evaluate = timed_evaluate
+        search.out_of_time = timed_out_of_time
+        search.alpha_beta = alpha_beta
+
+    def record(self, stats: dict) -> dict:
+        """
+        Build the JSON record of the last search.
+
+        Args:
+            stats: The search's stats (depth, nodes, time, nodes_per_sec)
+        """
+        total = stats.get("time", 0.0)
+        phases = {phase: {"time": self.phase_time[phase], "calls": self.phase_calls[phase]}
+                  for phase in PHASES}
+        plies = {}
+        for ply in sorted(self.plies):
+            entry = dict(self.plies[ply])
+            entry["cutoffs"] = {str(index): count for index, count in sorted(self.cutoffs.get(ply, {}).items())}
+            plies[str(ply)] = entry
+        return {
+            "depth": stats.get("depth", 0),
+            "nodes": stats.get("nodes", 0),
+            "time": total,
+            "nodes_per_sec": stats.get("nodes_per_sec", 0.0),
+            "phases": phases,
+            # Search bookkeeping and profiler overhead
+            "other_time": max(0.0, total - sum(self.phase_time.values())),
+            "plies": plies,
+            "iterations": list(self.iterations),
+            "timeouts": self.timeouts,
+        }
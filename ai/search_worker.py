@@ -0,0 +1,305 @@
+"""
+Persistent search worker fed through shared memory.
+
+A SearchWorker forks one long-lived process at game setup. The process
+builds its search engine once and keeps it for the whole game (pooled
+buffers, planner and endgame caches survive between turns). Each turn the
+parent writes the cells that changed since the last dispatch into a
+multiprocessing.shared_memory segment holding the compact board, fills a
+small control block and wakes the worker with a semaphore; the worker
+patches its own GameState, searches, and writes the best move (packed, see
+Move.pack) and its stats back into the same segment. Nothing is pickled per
+turn, so a dispatch costs tens of microseconds instead of the milliseconds
+of sending a GameState to a process pool.
+
+Segment layout (little-endian):
+    request   REQUEST: sequence, command, species, symmetries, changed
+              cells, search budget, perf_counter() time of the dispatch
+    response  RESPONSE: sequence, status, result moves, stats length,
+              perf_counter() times the worker woke up and finished
+    board     humans, vampires and werewolves of every cell (uint16 each,
+              flat index x * cols + y, as in CompactBoard)
+    changed   flat indices of the cells changed by this dispatch (uint32)
+    moves     packed result moves (uint32)
+    stats     JSON of the engine's stats (STATS_BYTES); when a result move
+              is too large to pack (count above MOVE_COUNT_MASK) the moves
+              are sent there instead, as tuples under "moves"
+
+Usage:
+    with SearchWorker(state.rows, state.cols, AlphaBetaSearch, max_depth=4, time_limit=1.8) as worker:
+        moves = worker.search(state)
+"""
+import json
+import multiprocessing
+import struct
+import time
+from multiprocessing import shared_memory
+from typing import Callable, List, Optional
+
+from game_state import GameState, Move, Species, MOVE_COUNT_MASK, TRANSFORMS
+
+# Commands of the request block
+PING = 1
+SEARCH = 2
+STOP = 3
+
+# Status of the response block
+OK = 0
+FAILED = 1
+
+REQUEST = struct.Struct("<IBBBBIHdd")
+RESPONSE = struct.Struct("<IBIIdd")
+# Room for the JSON stats of one search
+STATS_BYTES = 1 << 16
+# Seconds result() waits beyond the search's time limit
+RESULT_MARGIN = 1.0
+
+
+class SegmentLayout:
+    """Offsets of the areas of a worker segment for one board size."""
+
+    def __init__(self, rows: int, cols: int):
+        cells = rows * cols
+        self.rows = rows
+        self.cols = cols
+        self.cells = cells
+        self.response = REQUEST.size
+        # uint16 and uint32 areas start on 4-byte boundaries
+        self.board = -(-(self.response + RESPONSE.size) // 4) * 4
+        self.changed = self.board + -(-3 * 2 * cells // 4) * 4
+        self.moves = self.changed + 4 * cells
+        self.stats = self.moves + 4 * cells
+        self.size = self.stats + STATS_BYTES
+
+    def views(self, buffer: memoryview):
+        """(humans, vampires, werewolves, changed, moves) typed views of a segment."""
+        cells = self.cells
+        board = buffer[self.board:self.board + 6 * cells].cast("H")
+        return (board[:cells], board[cells:2 * cells], board[2 * cells:],
+                buffer[self.changed:self.changed + 4 * cells].cast("I"),
+                buffer[self.moves:self.moves + 4 * cells].cast("I"))
+
+
+def _serve(segment: shared_memory.SharedMemory, rows: int, cols: int, requests, responses,
+           engine: Callable, options: dict):
+    """Worker process loop: wait for a request, answer it in the segment, repeat until STOP."""
+    layout = SegmentLayout(rows, cols)
+    buffer = segment.buf
+    humans, vampires, werewolves, changed, packed = layout.views(buffer)
+    searcher = engine(**options)
+    state = GameState(rows, cols)
+    while True:
+        requests.acquire()
+        received = time.perf_counter()
+        sequence, command, ours, theirs, symmetries, count, max_depth, time_limit, _ = \
+            REQUEST.unpack_from(buffer, 0)
+        if command == STOP:
+            break
+        status, moves, stats = OK, [], b""
+        if command == SEARCH:
+            try:
+                for idx in changed[:count]:
+                    cell = state.board[idx // cols][idx % cols]
+                    cell.humans, cell.vampires, cell.werewolves = humans[idx], vampires[idx], werewolves[idx]
+                state.invalidate_moves()
+                state.our_species, state.opponent_species = Species(ours), Species(theirs)
+                state.symmetries = tuple(t for t in TRANSFORMS if symmetries >> t & 1)
+                searcher.max_depth, searcher.time_limit = max_depth, time_limit
+                moves = searcher.search(state)
+                result = dict(searcher.stats)
+                if all(move.count <= MOVE_COUNT_MASK for move in moves):
+                    for index, move in enumerate(moves):
+                        packed[index] = move.pack(cols)
+                else:
+                    result = {"moves": [[move.x_from, move.y_from, move.x_to, move.y_to, move.count]
+                                        for move in moves], **result}
+                    moves = []
+                stats = json.dumps(result, default=str).encode()
+                if len(stats) > STATS_BYTES:
+                    stats = json.dumps({key: result[key] for key in ("moves", "depth", "nodes", "time")
+                                        if key in result}).encode()
+            except Exception as error:
+                status, moves, stats = FAILED, [], json.dumps({"error": repr(error)}).encode()
+        buffer[layout.stats:layout.stats + len(stats)] = stats
+        RESPONSE.pack_into(buffer, layout.response, sequence, status, len(moves), len(stats),
+                           received, time.perf_counter())
+        responses.release()
+    for view in (humans, vampires, werewolves, changed, packed):
+        view.release()
+
+
+class SearchWorker:
+    """
+    Search engine running in a persistent child process.
+
+    Attributes:
+        stats: Engine stats of the last search, with the dispatch latency
+            (dispatch to worker wake-up), return latency (worker done to
+            result read) and changed cells sent, in seconds and cells
+        last_latency: Round-trip seconds of the last ping()
+    """
+
+    def __init__(self, rows: int, cols: int, engine: Callable, max_depth: int = 4,
+                 time_limit: float = 1.8, **options):
+        """
+        Create the shared segment and start the worker.
+
+        Args:
+            rows, cols: Board size (fixed for the worker's lifetime)
+            engine: Search engine class (AlphaBetaSearch, MCTSSearch), built
+                once in the worker as engine(max_depth, time_limit, **options)
+            max_depth, time_limit: Default search budget
+            options: Other engine options
+        """
+        self.layout = SegmentLayout(rows, cols)
+        self.rows = rows
+        self.cols = cols
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self._time_limit = time_limit
+        self.segment = shared_memory.SharedMemory(create=True, size=self.layout.size)
+        self._humans, self._vampires, self._werewolves, self._changed, self._moves = \
+            self.layout.views(self.segment.buf)
+        # fork shares the segment's mapping; elsewhere the worker reattaches it by name
+        methods = multiprocessing.get_all_start_methods()
+        context = multiprocessing.get_context("fork" if "fork" in methods else None)
+        self._requests = context.Semaphore(0)
+        self._responses = context.Semaphore(0)
+        options = dict(options, max_depth=max_depth, time_limit=time_limit)
+        self.process = context.Process(target=_serve, daemon=True,
+                                       args=(self.segment, rows, cols, self._requests, self._responses,
+                                             engine, options))
+        self.process.start()
+        self._sequence = 0
+        self._pending: Optional[float] = None
+        self.stats: dict = {}
+        self.last_latency = 0.0
+
+    def _dispatch(self, command: int, state: Optional[GameState] = None, changed: int = 0,
+                  max_depth: int = 0, time_limit: float = 0.0):
+        if self._pending is not None:
+            raise RuntimeError("Search worker is busy: collect the previous result first")
+        if not self.process.is_alive():
+            raise RuntimeError("Search worker is not running")
+        self._sequence += 1
+        ours = theirs = symmetries = 0
+        if state is not None:
+            ours, theirs = int(state.our_species), int(state.opponent_species)
+            symmetries = sum(1 << t for t in state.symmetries)
+        sent = time.perf_counter()
+        REQUEST.pack_into(self.segment.buf, 0, self._sequence, command, ours, theirs, symmetries,
+                          changed, max_depth, time_limit, sent)
+        self._pending = sent
+        self._requests.release()
+
+    def _wait(self, timeout: Optional[float]) -> tuple:
+        if self._pending is None:
+            raise RuntimeError("No request dispatched to the search worker")
+        if not self._responses.acquire(timeout=timeout):
+            raise TimeoutError(f"Search worker did not answer within {timeout:.3f}s")
+        read = time.perf_counter()
+        self._pending = None
+        response = RESPONSE.unpack_from(self.segment.buf, self.layout.response)
+        if response[0] != self._sequence:
+            raise RuntimeError(f"Search worker answered request {response[0]}, expected {self._sequence}")
+        return response, read
+
+    def ping(self, timeout: float = 1.0) -> float:
+        """Round trip of an empty request through the segment, in seconds."""
+        start = time.perf_counter()
+        self._dispatch(PING)
+        self._wait(timeout)
+        self.last_latency = time.perf_counter() - start
+        return self.last_latency
+
+    def submit(self, state: GameState, max_depth: Optional[int] = None, time_limit: Optional[float] = None):
+        """
+        Send a position to the worker and start its search.
+
+        Only the cells that differ from the last position sent are written.
+        """
+        if (state.rows, state.cols) != (self.rows, self.cols):
+            raise ValueError(f"Worker board is {self.rows}x{self.cols}, state is {state.rows}x{state.cols}")
+        if self._pending is not None:
+            raise RuntimeError("Search worker is busy: collect the previous result first")
+        humans, vampires, werewolves, changed = self._humans, self._vampires, self._werewolves, self._changed
+        count = 0
+        idx = 0
+        for row in state.board:
+            for cell in row:
+                if (cell.humans != humans[idx] or cell.vampires != vampires[idx]
+                        or cell.werewolves != werewolves[idx]):
+                    humans[idx], vampires[idx], werewolves[idx] = cell.humans, cell.vampires, cell.werewolves
+                    changed[count] = idx
+                    count += 1
+                idx += 1
+        self._time_limit = self.time_limit if time_limit is None else time_limit
+        self._dispatch(SEARCH, state, count, self.max_depth if max_depth is None else max_depth,
+                       self._time_limit)
+
+    def result(self, timeout: Optional[float] = None, deadline: Optional[float] = None) -> List[Move]:
+        """
+        Wait for the search started by submit().
+
+        Args:
+            timeout: Seconds to wait (default: the search's time limit plus
+                RESULT_MARGIN)
+            deadline: perf_counter() time after which not to wait, e.g. the
+                end of the turn (bounds the timeout)
+
+        Raises:
+            TimeoutError: The worker did not answer in time (it is then
+                still busy; close() it)
+            RuntimeError: The search raised in the worker
+        """
+        sent = self._pending
+        changed = REQUEST.unpack_from(self.segment.buf, 0)[5]
+        if timeout is None:
+            timeout = self._time_limit + RESULT_MARGIN
+        if deadline is not None:
+            timeout = min(timeout, max(0.0, deadline - time.perf_counter()))
+        (_, status, moves, stats_size, received, finished), read = self._wait(timeout)
+        stats_start = self.layout.stats
+        stats = json.loads(bytes(self.segment.buf[stats_start:stats_start + stats_size]) or b"{}")
+        if status != OK:
+            raise RuntimeError(f"Search failed in the worker: {stats.get('error')}")
+        unpacked = stats.pop("moves", None)
+        self.stats = dict(stats, dispatch_latency=received - sent, return_latency=read - finished,
+                          changed_cells=changed)
+        if unpacked is not None:
+            return [Move(*move) for move in unpacked]
+        return [Move.from_packed(code, self.cols) for code in self._moves[:moves]]
+
+    def search(self, state: GameState, deadline: Optional[float] = None) -> List[Move]:
+        """Search a position in the worker (submit() then result(deadline=deadline))."""
+        self.submit(state)
+        return self.result(deadline=deadline)
+
+    def close(self):
+        """Stop the worker and free the segment."""
+        if self.segment is None:
+            return
+        if self.process.is_alive():
+            if self._pending is None:
+                self._sequence += 1
+                REQUEST.pack_into(self.segment.buf, 0, self._sequence, STOP, 0, 0, 0, 0, 0, 0.0,
+                                  time.perf_counter())
+                self._requests.release()
+                self.process.join(1.0)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join()
+        for view in (self._humans, self._vampires, self._werewolves, self._changed, self._moves):
+            view.release()
+        self.segment.close()
+        self.segment.unlink()
+        self.segment = None
+
+    def __enter__(self) -> 'SearchWorker':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __repr__(self) -> str:
+        return f"SearchWorker({self.rows}x{self.cols}, pid={self.process.pid}, alive={self.process.is_alive()})"
@@ -0,0 +1,217 @@
+"""
+Slow-turn capture: profile every search, keep the evidence only for slow ones.
+
+Each turn runs under a profiler. When the search takes longer than the
+threshold, a capture directory is written with the position (state.json,
+loadable with GameState.from_dict) and the profile, and only the newest
+captures are kept. replay() re-runs a captured position through
+find_best_move under cProfile.
+
+Profilers:
+    sample    a background thread samples the search thread's stack every
+              few milliseconds (low overhead); saved as collapsed stacks
+              (stacks.folded, one "frame;frame;... count" line per stack)
+    cprofile  cProfile, exact but slower; saved as profile.prof for pstats
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import shutil
+import sys
+import threading
+import time
+from argparse import ArgumentParser
+from collections import Counter
+from typing import Callable, List, Optional, Tuple
+
+from game_state import GameState, Move
+from alphabeta import find_best_move
+
+PROFILERS = ("sample", "cprofile")
+# Default threshold as a multiple of the search time limit: the search
+# itself stops at the limit, so only turns that overrun it are kept
+THRESHOLD_FACTOR = 1.05
+STATE_FILE = "state.json"
+
+
+class StackSampler:
+    """Periodic stack sampler of one thread."""
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._thread_id = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, thread_id: Optional[int] = None):
+        """Start sampling a thread (the calling thread by default)."""
+        self.samples.clear()
+        self._thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def dump(self, path: str):
+        """Write the samples in collapsed-stack format (flamegraph.pl, speedscope)."""
+        with open(path, "w") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class SlowTurnCapture:
+    """
+    Profile searches and keep the slow ones.
+
+    Args:
+        directory: Where capture directories are written
+        threshold: Search time in seconds above which a turn is kept
+        keep: Number of captures kept; older ones are deleted
+        profiler: "sample" or "cprofile"
+        interval: Sampling period of the "sample" profiler
+    """
+
+    def __init__(self, directory: str, threshold: float = 1.5, keep: int = 20,
+                 profiler: str = "sample", interval: float = 0.005):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler!r} (expected one of {PROFILERS})")
+        self.directory = directory
+        self.threshold = threshold
+        self.keep = keep
+        self.profiler = profiler
+        self.interval = interval
+        self.captured: List[str] = []
+        self.last_elapsed = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def run(self, search: Callable[[GameState], List[Move]], state: GameState,
+            info: Optional[dict] = None) -> List[Move]:
+        """
+        Run search(state) under the profiler; capture the turn if it was slow.
+
+        Args:
+            search: The search to run (e.g. AlphaBetaSearch.search)
+            state: Position searched; must not be modified by the search
+            info: Extra JSON-compatible data saved with a capture (turn,
+                search settings, stats...)
+        """
+        if self.profiler == "cprofile":
+            profiler = cProfile.Profile()
+            profiler.enable()
+        else:
+            profiler = StackSampler(self.interval)
+            profiler.start()
+        start = time.perf_counter()
+        try:
+            result = search(state)
+        finally:
+            self.last_elapsed = time.perf_counter() - start
+            if self.profiler == "cprofile":
+                profiler.disable()
+            else:
+                profiler.stop()
+        if self.last_elapsed >= self.threshold:
+            self.save(state, profiler, dict(info or {}, elapsed=self.last_elapsed, threshold=self.threshold))
+        return result
+
+    def save(self, state: GameState, profiler, info: dict) -> str:
+        """Write a capture directory and rotate old ones."""
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-turn{info.get('turn', 0):03d}"
+        path = os.path.join(self.directory, name)
+        suffix = 1
+        while os.path.exists(path):
+            suffix += 1
+            path = os.path.join(self.directory, f"{name}-{suffix}")
+        os.makedirs(path)
+        with open(os.path.join(path, STATE_FILE), "w") as f:
+            json.dump(dict(info, state=state.to_dict()), f, indent=1, default=str)
+        if isinstance(profiler, cProfile.Profile):
+            profiler.dump_stats(os.path.join(path, "profile.prof"))
+        else:
+            profiler.dump(os.path.join(path, "stacks.folded"))
+        self.captured.append(path)
+        self._rotate()
+        return path
+
+    def _rotate(self):
+        captures = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                    if os.path.exists(os.path.join(self.directory, name, STATE_FILE))]
+        captures.sort(key=os.path.getmtime)
+        for path in captures[:max(0, len(captures) - self.keep)]:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def load_capture(path: str) -> Tuple[GameState, dict]:
+    """Load the position and info of a capture directory."""
+    with open(os.path.join(path, STATE_FILE)) as f:
+        info = json.load(f)
+    return GameState.from_dict(info.pop("state")), info
+
+
+def replay(path: str, max_depth: Optional[int] = None, time_limit: Optional[float] = None,
+           top: int = 25, out=None) -> Tuple[List[Move], float]:
+    """
+    Re-run a captured position through find_best_move under cProfile.
+
+    Args:
+        path: Capture directory
+        max_depth: Search depth (default: the captured search's)
+        time_limit: Time limit (default: the captured search's)
+        top: Number of pstats lines printed (0 to print nothing)
+        out: Stream for the report (default stdout)
+
+    Returns:
+        (best move, search time)
+    """
+    state, info = load_capture(path)
+    max_depth = max_depth if max_depth is not None else info.get("max_depth", 4)
+    time_limit = time_limit if time_limit is not None else info.get("time_limit", 1.8)
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    profiler.enable()
+    try:
+        moves = find_best_move(state, max_depth=max_depth, time_limit=time_limit)
+    finally:
+        profiler.disable()
+    elapsed = time.perf_counter() - start
+    if top:
+        out = out or sys.stdout
+        out.write(f"{path}: captured {info.get('elapsed', 0.0):.3f}s, replayed {elapsed:.3f}s "
+                  f"(depth {max_depth}, limit {time_limit}s), move {[move.to_tuple() for move in moves]}\n")
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(top)
+        out.write(report.getvalue())
+    return moves, elapsed
+
+
+def main():
+    parser = ArgumentParser(description="Re-run a slow-turn capture under cProfile")
+    parser.add_argument("capture", help="Capture directory written by ai_player.py --slow-turn-dir")
+    parser.add_argument("--depth", type=int, default=None, help="Search depth (default: as captured)")
+    parser.add_argument("--time-limit", type=float, default=None, help="Time limit (default: as captured)")
+    parser.add_argument("--top", type=int, default=25, help="Profile lines to print")
+    args = parser.parse_args()
+    replay(args.capture, args.depth, args.time_limit, args.top)
+
+
+if __name__ == "__main__":
+    main()
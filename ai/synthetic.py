@@ -0,0 +1,166 @@
+"""
+Seeded synthetic maps and positions for stress tests and scaling benchmarks.
+
+synthetic_map() builds a starting position of any size: human groups
+scattered at a given density, and each side's army split into a number of
+groups following a split pattern. random_playout() plays random legal turns
+through the referee to sample mid-game positions, and generate_state()
+combines both into a GameState for either side. Maps serialize to the Go
+server's XML format with GameMap.to_xml().
+
+Usage:
+    python3 ai/synthetic.py --rows 40 --cols 40 --groups 4 --split random --playout 10 --seed 1 > map.xml
+"""
+import random
+from argparse import ArgumentParser
+from functools import partial
+from typing import List, Optional, Tuple
+
+from game_state import GameState, Species
+from maps import GameMap, place_groups
+from move_generator import simulate_battle
+from referee import PLAYER_SPECIES, Referee
+from opening_book import opening_state
+
+# How an army is divided between its groups
+SPLIT_PATTERNS = ("even", "random", "skewed")
+
+
+def split_counts(total: int, groups: int, pattern: str, rng: random.Random) -> List[int]:
+    """
+    Divide total creatures into groups non-empty groups.
+
+    Patterns:
+        even    sizes differ by at most one
+        random  uniformly random composition
+        skewed  half of the army in the first group, the rest even
+    """
+    if not 1 <= groups <= total:
+        raise ValueError(f"Cannot split {total} creatures into {groups} groups")
+    if pattern == "even":
+        return [total // groups + (i < total % groups) for i in range(groups)]
+    if pattern == "random":
+        cuts = sorted(rng.sample(range(1, total), groups - 1))
+        return [b - a for a, b in zip([0] + cuts, cuts + [total])]
+    if pattern == "skewed":
+        if groups == 1:
+            return [total]
+        first = max(total // 2, 1)
+        rest = total - first
+        if rest < groups - 1:
+            first, rest = total - (groups - 1), groups - 1
+        return [first] + split_counts(rest, groups - 1, "even", rng)
+    raise ValueError(f"Unknown split pattern {pattern!r} (expected one of {SPLIT_PATTERNS})")
+
+
+def synthetic_map(rows: int, cols: int, human_density: float = 0.05, groups: int = 1,
+                  opponent_groups: Optional[int] = None, army: int = 12, split: str = "even",
+                  max_humans: int = 6, seed: Optional[int] = None) -> GameMap:
+    """
+    Generate a starting position.
+
+    Args:
+        rows, cols: Board size
+        human_density: Share of the cells holding a human group
+        groups: Werewolf (player 0) groups
+        opponent_groups: Vampire (player 1) groups (default: groups)
+        army: Creatures of each side
+        split: Split pattern of the armies (SPLIT_PATTERNS)
+        max_humans: Human groups hold 1 to max_humans humans
+        seed: Random seed
+    """
+    rng = random.Random(seed)
+    opponent_groups = groups if opponent_groups is None else opponent_groups
+    counts = [split_counts(army, groups, split, rng), split_counts(army, opponent_groups, split, rng)]
+    human_groups = round(human_density * rows * cols)
+    if human_groups + groups + opponent_groups > rows * cols:
+        raise ValueError(f"{human_groups} human and {groups + opponent_groups} monster groups "
+                         f"do not fit on a {rows}x{cols} board")
+
+    game_map = GameMap(rows, cols, f"synthetic-{rows}x{cols}-{seed}")
+    place_groups(game_map, rng, human_groups, lambda: rng.randint(1, max_humans), counts)
+    return game_map
+
+
+def _random_turn(referee: Referee, rng: random.Random) -> List[Tuple[int, int, int, int, int]]:
+    """One random legal move of the player to move: a random part of a random group."""
+    species = PLAYER_SPECIES[referee.to_move]
+    groups = sorted((cell, counts[species]) for cell, counts in referee.cells.items() if counts[species])
+    (x, y), count = rng.choice(groups)
+    targets = [(x + dx, y + dy) for dx, dy in GameState.DIRECTIONS
+               if 0 <= x + dx < referee.cols and 0 <= y + dy < referee.rows]
+    x_to, y_to = rng.choice(targets)
+    return [(x, y, rng.randint(1, count), x_to, y_to)]
+
+
+def random_playout(game_map: GameMap, plies: int, seed: Optional[int] = None) -> Tuple[GameMap, int]:
+    """
+    Play random turns from a starting position.
+
+    Random battles are resolved with the seeded generator, so a seed always
+    gives the same position. The playout stops early, before the turn that
+    would wipe out a side.
+
+    Returns:
+        (position reached as a map, id of the player to move)
+    """
+    rng = random.Random(seed)
+    referee = Referee(game_map, battle_fn=partial(simulate_battle, rng=rng))
+    for _ in range(plies):
+        if referee.turn >= 2 * referee.max_rounds:
+            break
+        cells = {cell: list(counts) for cell, counts in referee.cells.items()}
+        referee.apply(referee.to_move, _random_turn(referee, rng))
+        if referee.is_over():
+            # Keep the last position where both sides are alive
+            referee.cells = cells
+            referee.turn -= 1
+            break
+    position = GameMap(game_map.rows, game_map.cols, f"{game_map.name}-ply{referee.turn}")
+    for (x, y), counts in sorted(referee.cells.items()):
+        for species in Species:
+            if counts[species]:
+                position.add(species, x, y, counts[species])
+    return position, referee.to_move
+
+
+def generate_state(rows: int, cols: int, playout: int = 0, side: Optional[int] = None,
+                   seed: Optional[int] = None, **options) -> GameState:
+    """
+    Generate a position as seen by one player.
+
+    Args:
+        rows, cols: Board size
+        playout: Random plies played from the start (mid-game sampling)
+        side: Player whose view is returned (default: the player to move)
+        seed: Random seed of both the map and the playout
+        options: synthetic_map() options (human_density, groups, split, ...)
+    """
+    game_map = synthetic_map(rows, cols, seed=seed, **options)
+    to_move = 0
+    if playout:
+        game_map, to_move = random_playout(game_map, playout, seed)
+    return opening_state(game_map, to_move if side is None else side)
+
+
+def main():
+    parser = ArgumentParser(description="Write a synthetic map (server XML format) to stdout")
+    parser.add_argument("--rows", type=int, default=20)
+    parser.add_argument("--cols", type=int, default=20)
+    parser.add_argument("--human-density", type=float, default=0.05)
+    parser.add_argument("--groups", type=int, default=1, help="Groups per side")
+    parser.add_argument("--army", type=int, default=12, help="Creatures per side")
+    parser.add_argument("--split", choices=SPLIT_PATTERNS, default="even")
+    parser.add_argument("--playout", type=int, default=0, help="Random plies played from the start")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    game_map = synthetic_map(args.rows, args.cols, args.human_density, args.groups, army=args.army,
+                             split=args.split, seed=args.seed)
+    if args.playout:
+        game_map, _ = random_playout(game_map, args.playout, args.seed)
+    print(game_map.to_xml(), end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Parallel self-play tournaments between named engine configurations.
+
+Games are played in-process by the headless referee, spread over a process
+pool. The report gives win/draw/loss, Elo with 95% confidence intervals and
+per-move search depth, nodes/sec and move latency percentiles.
+
+Usage:
+    python3 ai/tournament.py --engine d2:depth=2,time_limit=0.05 \\
+        --engine d3:depth=3,time_limit=0.05 --games 20 --json report.json --csv report.csv
+"""
+import csv
+import json
+import math
+import os
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import combinations
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from ai_player import AIPlayer
+from maps import list_maps, load_map
+from referee import MAX_ROUNDS, play_game
+
+# z value of a two-sided 95% confidence interval
+Z_95 = 1.96
+
+
+class EngineConfig:
+    """A named player configuration."""
+
+    # Options accepted in "name:key=value,..." specs, with their types
+    OPTIONS = {"engine": str, "depth": int, "time_limit": float, "evaluation": str, "pooled": bool,
+               "planner": bool, "prune_splits": bool}
+
+    def __init__(self, name: str, engine: str = "alphabeta", depth: int = 4,
+                 time_limit: float = 1.8, evaluation: str = "default", pooled: bool = False,
+                 planner: bool = False, prune_splits: bool = False):
+        self.name = name
+        self.engine = engine
+        self.depth = depth
+        self.time_limit = time_limit
+        self.evaluation = evaluation
+        self.pooled = pooled
+        self.planner = planner
+        self.prune_splits = prune_splits
+
+    @classmethod
+    def parse(cls, spec: str) -> "EngineConfig":
+        """
+        Parse a "name:key=value,..." spec, e.g. "fast:depth=2,time_limit=0.05".
+
+        Raises:
+            ValueError: on unknown options or malformed values
+        """
+        name, _, options = spec.partition(":")
+        kwargs = {}
+        for option in filter(None, options.split(",")):
+            key, _, value = option.partition("=")
+            key = key.strip().replace("-", "_")
+            if key not in cls.OPTIONS:
+                raise ValueError(f"Unknown engine option {key!r} in {spec!r}")
+            if cls.OPTIONS[key] is bool:
+                kwargs[key] = value.strip().lower() in ("1", "true", "yes", "")
+            else:
+                kwargs[key] = cls.OPTIONS[key](value.strip())
+        return cls(name.strip(), **kwargs)
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "engine": self.engine, "depth": self.depth,
+                "time_limit": self.time_limit, "evaluation": self.evaluation, "pooled": self.pooled,
+                "planner": self.planner, "prune_splits": self.prune_splits}
+
+    def make_player(self) -> AIPlayer:
+        return AIPlayer(name=self.name, engine=self.engine, max_depth=self.depth,
+                        time_limit=self.time_limit, pooled=self.pooled, evaluation=self.evaluation,
+                        planner=self.planner, prune_splits=self.prune_splits)
+
+
+def schedule(configs: List[EngineConfig], maps: List[Path], games_per_pair: int,
+             max_rounds: int = MAX_ROUNDS, seed: int = 0) -> List[tuple]:
+    """
+    Round-robin jobs: every pair of configurations plays games_per_pair games
+    on every map, alternating who plays the werewolves (who move first).
+    """
+    jobs = []
+    for first, second in combinations(configs, 2):
+        for map_path in maps:
+            for game in range(games_per_pair):
+                wolves, vampires = (first, second) if game % 2 == 0 else (second, first)
+                jobs.append((len(jobs), str(map_path), wolves.to_dict(), vampires.to_dict(),
+                             seed + len(jobs), max_rounds))
+    return jobs
+
+
+def play_job(job: tuple) -> dict:
+    """Play one scheduled game (runs in a worker process)."""
+    index, map_path, wolves, vampires, seed, max_rounds = job
+    configs = [EngineConfig(**wolves), EngineConfig(**vampires)]
+    players = [config.make_player() for config in configs]
+    try:
+        result = play_game(players, load_map(map_path), max_rounds=max_rounds, seed=seed)
+    finally:
+        for player in players:
+            player.close()
+    result["game"] = index
+    result["players"] = [config.name for config in configs]
+    return result
+
+
+def run_tournament(configs: List[EngineConfig], maps: List[Path], games_per_pair: int,
+                   workers: Optional[int] = None, max_rounds: int = MAX_ROUNDS,
+                   seed: int = 0, progress: bool = True) -> List[dict]:
+    """
+    Play every scheduled game, in parallel when workers > 1.
+
+    Returns:
+        Game results (referee results plus "game" and "players"), in schedule order
+    """
+    jobs = schedule(configs, maps, games_per_pair, max_rounds, seed)
+    workers = workers or os.cpu_count() or 1
+    results = []
+    start = time.perf_counter()
+
+    def report(result):
+        results.append(result)
+        if progress:
+            names = result["players"]
+            winner = names[result["winner"]] if result["winner"] is not None else "draw"
+            print(f"[{len(results)}/{len(jobs)}] {names[0]} vs {names[1]} on {result['map']}: "
+                  f"{winner} ({result['rounds']} rounds, {time.perf_counter() - start:.1f}s)")
+
+    if workers == 1:
+        for job in jobs:
+            report(play_job(job))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in as_completed([pool.submit(play_job, job) for job in jobs]):
+                report(future.result())
+    return sorted(results, key=lambda result: result["game"])
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """Linear-interpolated percentile (q in [0, 100]), None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    low = math.floor(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def elo_from_score(score: float) -> float:
+    """Elo difference that gives an expected score."""
+    return 400 * math.log10(score / (1 - score))
+
+
+def elo_estimate(wins: int, draws: int, losses: int) -> dict:
+    """
+    Elo difference with a 95% confidence interval from a W/D/L record.
+
+    Uses the normal approximation on the mean score. A perfect or zero
+    score is clamped to half a game from the edge so the estimate stays
+    finite.
+    """
+    games = wins + draws + losses
+    if games == 0:
+        return {"elo": None, "ci_low": None, "ci_high": None}
+    score = (wins + 0.5 * draws) / games
+    variance = (wins * (1 - score) ** 2 + draws * (0.5 - score) ** 2 + losses * score ** 2) / games
+    margin = Z_95 * math.sqrt(variance / games)
+    edge = 0.5 / games
+
+    def clamp(value):
+        return min(max(value, edge), 1 - edge)
+
+    return {
+        "elo": elo_from_score(clamp(score)),
+        "ci_low": elo_from_score(clamp(score - margin)),
+        "ci_high": elo_from_score(clamp(score + margin)),
+    }
+
+
+def build_report(configs: List[EngineConfig], games: List[dict]) -> dict:
+    """Aggregate game results per engine and per pairing."""
+    records: Dict[str, Dict[str, list]] = {config.name: {"wdl": [0, 0, 0], "times": [], "depths": [], "speeds": []}
+                                           for config in configs}
+    pairs: Dict[Tuple[str, str], List[int]] = {}
+    for game in games:
+        names = game["players"]
+        for side, name in enumerate(names):
+            record = records[name]
+            outcome = 1 if game["winner"] is None else (0 if game["winner"] == side else 2)
+            record["wdl"][outcome] += 1
+            record["times"].extend(game["move_times"][side])
+            for stats in game["search_stats"][side]:
+                if stats["depth"] is not None:
+                    record["depths"].append(stats["depth"])
+                if stats["nodes_per_sec"] is not None:
+                    record["speeds"].append(stats["nodes_per_sec"])
+        key = tuple(sorted(names))
+        pair = pairs.setdefault(key, [0, 0, 0])
+        if game["winner"] is None:
+            pair[1] += 1
+        else:
+            pair[0 if names[game["winner"]] == key[0] else 2] += 1
+
+    engines = {}
+    for config in configs:
+        record = records[config.name]
+        wins, draws, losses = record["wdl"]
+        played = wins + draws + losses
+        depths, speeds, times = record["depths"], record["speeds"], record["times"]
+        engines[config.name] = {
+            "config": config.to_dict(),
+            "games": played,
+            "wins": wins,
+            "draws": draws,
+            "losses": losses,
+            "score": (wins + 0.5 * draws) / played if played else None,
+            "elo_vs_field": elo_estimate(wins, draws, losses),
+            "moves": len(times),
+            "depth_mean": sum(depths) / len(depths) if depths else None,
+            "depth_min": min(depths) if depths else None,
+            "depth_max": max(depths) if depths else None,
+            "nodes_per_sec_mean": sum(speeds) / len(speeds) if speeds else None,
+            "latency_ms": {name: (percentile(times, q) * 1000 if times else None)
+                           for name, q in (("p50", 50), ("p95", 95), ("p99", 99), ("max", 100))},
+        }
+
+    return {
+        "engines": engines,
+        "pairs": [{"a": a, "b": b, "a_wins": wins, "draws": draws, "b_wins": losses,
+                   "elo_a_minus_b": elo_estimate(wins, draws, losses)}
+                  for (a, b), (wins, draws, losses) in sorted(pairs.items())],
+        "games": [{key: game[key] for key in ("game", "map", "players", "winner", "rounds",
+                                              "werewolves", "vampires", "illegal_moves")}
+                  for game in games],
+    }
+
+
+def write_csv(report: dict, path):
+    """One row per engine with the headline figures."""
+    columns = ["name", "games", "wins", "draws", "losses", "score", "elo", "elo_ci_low", "elo_ci_high",
+               "depth_mean", "nodes_per_sec_mean", "latency_p50_ms", "latency_p95_ms", "latency_p99_ms"]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(columns)
+        for name, engine in report["engines"].items():
+            elo = engine["elo_vs_field"]
+            latency = engine["latency_ms"]
+            writer.writerow([name, engine["games"], engine["wins"], engine["draws"], engine["losses"],
+                             engine["score"], elo["elo"], elo["ci_low"], elo["ci_high"],
+                             engine["depth_mean"], engine["nodes_per_sec_mean"],
+                             latency["p50"], latency["p95"], latency["p99"]])
+
+
+def print_summary(report: dict):
+    def fmt(value, spec):
+        return format(value, spec) if value is not None else "-"
+
+    print(f"\n{'engine':<12} {'W':>4} {'D':>4} {'L':>4} {'Elo (95% CI)':>24} {'depth':>6} "
+          f"{'nodes/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, engine in report["engines"].items():
+        elo = engine["elo_vs_field"]
+        latency = engine["latency_ms"]
+        ci = f"{fmt(elo['elo'], '+.0f')} [{fmt(elo['ci_low'], '+.0f')}, {fmt(elo['ci_high'], '+.0f')}]"
+        print(f"{name:<12} {engine['wins']:>4} {engine['draws']:>4} {engine['losses']:>4} {ci:>24} "
+              f"{fmt(engine['depth_mean'], '.2f'):>6} {fmt(engine['nodes_per_sec_mean'], '.0f'):>9} "
+              f"{fmt(latency['p50'], '.1f'):>8} {fmt(latency['p95'], '.1f'):>8} {fmt(latency['p99'], '.1f'):>8}")
+
+
+def main():
+    parser = ArgumentParser(description="Parallel self-play tournament")
+    parser.add_argument("--engine", action="append", required=True, dest="engines",
+                        help='Engine configuration "name:key=value,...", keys: ' + ", ".join(EngineConfig.OPTIONS))
+    parser.add_argument("--maps", nargs="+", default=None, help="Map files (default: every map in maps/)")
+    parser.add_argument("--games", type=int, default=10, help="Games per pair of engines and map")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--rounds", type=int, default=MAX_ROUNDS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", default=None, help="Write the full report as JSON")
+    parser.add_argument("--csv", default=None, help="Write the per-engine summary as CSV")
+    args = parser.parse_args()
+
+    configs = [EngineConfig.parse(spec) for spec in args.engines]
+    if len(configs) < 2 or len({config.name for config in configs}) != len(configs):
+        parser.error("need at least two engine configurations with distinct names")
+    maps = [Path(path) for path in args.maps] if args.maps else list_maps()
+
+    start = time.perf_counter()
+    games = run_tournament(configs, maps, args.games, args.workers, args.rounds, args.seed)
+    report = build_report(configs, games)
+    report["elapsed"] = time.perf_counter() - start
+    print_summary(report)
+    print(f"\n{len(games)} games in {report['elapsed']:.1f}s")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(report, args.csv)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Measure the opening book: size, hit rate and search time saved per game.
+
+Plays each map against itself with both players using the book, then
+without it, and compares the time spent computing moves.
+
+Usage:
+    python3 benchmarks/bench_book.py --book books/openings.vvb --rounds 10 --time-limit 1.8
+"""
+import os
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from ai_player import AIPlayer
+from maps import list_maps, load_map
+from opening_book import DEFAULT_BOOK, OpeningBook
+from referee import play_game
+
+
+def self_play(game_map, rounds: int, time_limit: float, book_path, seed: int) -> dict:
+    players = [AIPlayer(name=f"p{side}", time_limit=time_limit, book_path=book_path) for side in range(2)]
+    try:
+        result = play_game(players, game_map, max_rounds=rounds, seed=seed)
+    finally:
+        for player in players:
+            player.close()
+    hits = sum(player.book.hits for player in players) if book_path else 0
+    return {
+        "turns": sum(len(times) for times in result["move_times"]),
+        "hits": hits,
+        "time": sum(sum(times) for times in result["move_times"]),
+        "winner": result["winner"],
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Opening book hit rate and time saved")
+    parser.add_argument("maps", nargs="*", help="Map files (default: all of maps/)")
+    parser.add_argument("--book", default=str(DEFAULT_BOOK))
+    parser.add_argument("--rounds", type=int, default=10, help="Rounds per game")
+    parser.add_argument("--time-limit", type=float, default=1.8, help="Search time per move")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    book = OpeningBook.load(args.book)
+    print(f"Book: {len(book)} positions, {os.path.getsize(args.book)} bytes")
+    print(f"{'map':<12} {'turns':>5} {'hits':>5} {'hit rate':>8} {'no book (s)':>11} {'book (s)':>9} "
+          f"{'saved (s)':>9}")
+    for path in [Path(path) for path in args.maps] or list_maps():
+        game_map = load_map(path)
+        with_book = self_play(game_map, args.rounds, args.time_limit, args.book, args.seed)
+        without = self_play(game_map, args.rounds, args.time_limit, None, args.seed)
+        # Games diverge after the book, so the saving is estimated as the
+        # hits times the average search time of the game without book
+        saved = with_book["hits"] * without["time"] / max(1, without["turns"])
+        print(f"{path.stem:<12} {with_book['turns']:>5} {with_book['hits']:>5} "
+              f"{with_book['hits'] / max(1, with_book['turns']):>8.0%} {without['time']:>11.2f} "
+              f"{with_book['time']:>9.2f} {saved:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Move generation with and without the per-cell move cache.
+
+Searches every position of the corpus (benchmarks/positions.json, sampled
+from the maps in maps/) to a fixed depth with the move cache off and on,
+profiling the search, and reports the move generation time per node, the
+share of source cells whose move list was reused (from an ancestor node or
+the neighbourhood cache) and the total search time.
+Both runs search the same tree, so their node counts must match.
+
+Usage:
+    python3 benchmarks/bench_move_cache.py --depth 4 --repeat 3
+"""
+import json
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from game_state import GameState
+from move_generator import clear_move_cache
+
+CORPUS = Path(__file__).parent / "positions.json"
+
+
+def measure(state_data: dict, move_cache: bool, depth: int, repeat: int) -> dict:
+    """Best of `repeat` profiled fixed-depth searches, each starting from an empty cache."""
+    best = None
+    for _ in range(repeat):
+        clear_move_cache()
+        searcher = AlphaBetaSearch(max_depth=depth, time_limit=600.0, profile=True, planner=False,
+                                   move_cache=move_cache)
+        searcher.search(GameState.from_dict(state_data))
+        stats = searcher.stats
+        run = {"nodes": stats["nodes"], "time": stats["time"],
+               "movegen": stats["profile"]["phases"]["movegen"]["time"],
+               "reuse": stats["move_cache"]["reuse_ratio"] if move_cache else 0.0}
+        if best is None or run["time"] < best["time"]:
+            best = run
+    return best
+
+
+def main():
+    parser = ArgumentParser(description="Per-cell move cache benchmark")
+    parser.add_argument("--depth", type=int, default=4, help="Fixed search depth")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per position (best kept)")
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS.read_text())
+    print(f"{'position':<28} {'nodes':>7} {'movegen us/node':>17} {'reused':>7} {'search s':>14}")
+    totals = {False: [0, 0.0, 0.0], True: [0, 0.0, 0.0]}
+    for entry in corpus:
+        off = measure(entry["state"], False, args.depth, args.repeat)
+        on = measure(entry["state"], True, args.depth, args.repeat)
+        if off["nodes"] != on["nodes"]:
+            raise SystemExit(f"{entry['name']}: {off['nodes']} nodes without the cache, {on['nodes']} with it")
+        for flag, run in ((False, off), (True, on)):
+            totals[flag][0] += run["nodes"]
+            totals[flag][1] += run["movegen"]
+            totals[flag][2] += run["time"]
+        nodes = max(on["nodes"], 1)
+        print(f"{entry['name']:<28} {on['nodes']:>7} {off['movegen'] / nodes * 1e6:>7.1f} -> {on['movegen'] / nodes * 1e6:<7.1f}"
+              f" {on['reuse']:>7.1%} {off['time']:>6.2f} -> {on['time']:.2f}")
+    (nodes, off_movegen, off_time), (_, on_movegen, on_time) = totals[False], totals[True]
+    print(f"{'total':<28} {nodes:>7} {off_movegen / nodes * 1e6:>7.1f} -> {on_movegen / nodes * 1e6:<7.1f}"
+          f" {'':>7} {off_time:>6.2f} -> {on_time:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Dominated and duplicate move elimination on the search corpus.
+
+For every position of benchmarks/positions.json, searches to a fixed depth
+with prune_moves off and on and reports the combinations removed by each
+rule (sure-loss attacks, pointless splits with --prune-splits, duplicate
+positions), the share
+of generated combinations removed, nodes, effective branching factor (as
+in bench_search.py) and search time.
+
+Usage:
+    python3 benchmarks/bench_move_pruning.py --depth 4
+"""
+import json
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from bench_search import effective_branching_factor
+from game_state import GameState
+from move_generator import PRUNE_RULES
+
+CORPUS = Path(__file__).parent / "positions.json"
+
+
+def search(state_data: dict, prune: bool, depth: int, prune_splits: bool = False) -> dict:
+    searcher = AlphaBetaSearch(max_depth=depth, time_limit=600.0, prune=prune, prune_splits=prune_splits)
+    searcher.search(GameState.from_dict(state_data))
+    stats = searcher.stats
+    return {"nodes": stats["nodes"], "time": stats["time"], "ebf": effective_branching_factor(stats["depth_nodes"]),
+            "pruning": stats.get("move_pruning")}
+
+
+def main():
+    parser = ArgumentParser(description="Move pruning benchmark")
+    parser.add_argument("--depth", type=int, default=4, help="Fixed search depth")
+    parser.add_argument("--prune-splits", action="store_true", help="Also apply the pointless_split rule")
+    args = parser.parse_args()
+
+    corpus = json.loads(CORPUS.read_text())
+    print(f"{'position':<26} {'sure loss':>9} {'split':>6} {'dup':>4} {'removed':>7} "
+          f"{'nodes':>15} {'ebf':>12} {'time s':>12}")
+    totals = {"off_nodes": 0, "on_nodes": 0, "off_time": 0.0, "on_time": 0.0, "generated": 0, "searched": 0}
+    totals.update(dict.fromkeys(PRUNE_RULES, 0))
+    for entry in corpus:
+        off = search(entry["state"], False, args.depth)
+        on = search(entry["state"], True, args.depth, args.prune_splits)
+        pruning = on["pruning"]
+        for key in ("generated", "searched") + PRUNE_RULES:
+            totals[key] += pruning[key]
+        totals["off_nodes"] += off["nodes"]
+        totals["on_nodes"] += on["nodes"]
+        totals["off_time"] += off["time"]
+        totals["on_time"] += on["time"]
+        print(f"{entry['name']:<26} {pruning['sure_loss']:>9} {pruning['pointless_split']:>6} "
+              f"{pruning['duplicate']:>4} {pruning['branching_reduction']:>7.1%} "
+              f"{off['nodes']:>7} -> {on['nodes']:<6} {off['ebf']:>5.1f} -> {on['ebf']:<4.1f} "
+              f"{off['time']:>5.2f} -> {on['time']:.2f}")
+    removed = 1 - totals["searched"] / totals["generated"] if totals["generated"] else 0.0
+    print(f"{'total':<26} {totals['sure_loss']:>9} {totals['pointless_split']:>6} {totals['duplicate']:>4} "
+          f"{removed:>7.1%} {totals['off_nodes']:>7} -> {totals['on_nodes']:<6} {'':>12} "
+          f"{totals['off_time']:>5.2f} -> {totals['on_time']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark of move generate-and-hash throughput.
+
+Compares the previous dict-backed Move, the slotted
+Move and packed-integer moves in array('I').
+
+Usage:
+    python3 benchmarks/bench_moves.py [--repeat 2000]
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from array import array
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Species, Move
+from move_generator import generate_all_moves, generate_moves_from_cell, generate_packed_moves
+
+
+class DictMove:
+    """The Move class as it was before __slots__ (instance __dict__)."""
+
+    def __init__(self, x_from, y_from, x_to, y_to, count):
+        self.x_from = x_from
+        self.y_from = y_from
+        self.x_to = x_to
+        self.y_to = y_to
+        self.count = count
+
+    def __eq__(self, other):
+        if not isinstance(other, DictMove):
+            return False
+        return (self.x_from == other.x_from and self.y_from == other.y_from and
+                self.x_to == other.x_to and self.y_to == other.y_to and
+                self.count == other.count)
+
+    def __hash__(self):
+        return hash((self.x_from, self.y_from, self.x_to, self.y_to, self.count))
+
+
+def make_position() -> GameState:
+    """Mid-game position with several groups of both species."""
+    state = GameState(15, 29)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    for x, y, count in [(14, 28, 10), (10, 20, 7), (5, 5, 12), (8, 14, 3)]:
+        state.board[x][y].vampires = count
+    for x, y, count in [(0, 0, 9), (4, 9, 6)]:
+        state.board[x][y].werewolves = count
+    for x, y, count in [(7, 15, 20), (3, 10, 4), (11, 18, 4), (9, 21, 2)]:
+        state.board[x][y].humans = count
+    return state
+
+
+def bench(label: str, repeat: int, fn) -> None:
+    """Time fn() repeat times and print moves/sec."""
+    fn()  # Warm up
+    start = time.perf_counter()
+    total = 0
+    for _ in range(repeat):
+        total += fn()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<22} {total / elapsed:12,.0f} moves/s  ({elapsed * 1e6 / repeat:7.1f} us/position)")
+
+
+def main():
+    parser = ArgumentParser(description="Move generate-and-hash microbenchmark")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    state = make_position()
+    groups = state.get_our_groups()
+
+    def slotted_moves():
+        return len({move for combo in generate_all_moves(state) for move in combo})
+
+    buffer = array('I')
+
+    def packed_moves():
+        return len(set(generate_packed_moves(state, out=buffer)))
+
+    # Pure create+hash cost, without the generator's board checks
+    coords = [(m.x_from, m.y_from, m.x_to, m.y_to, m.count)
+              for x, y, count in groups for m in generate_moves_from_cell(state, x, y, count)]
+    codes = array('I', [Move(*c).pack(state.cols) for c in coords])
+
+    def create_dict():
+        return len({DictMove(*c) for c in coords})
+
+    def create_slotted():
+        return len({Move(*c) for c in coords})
+
+    def create_packed():
+        return len(set(codes))
+
+    print(f"Position: {len(coords)} moves from {len(groups)} groups\n")
+    print("generate + hash")
+    bench("  Move objects", args.repeat, slotted_moves)
+    bench("  packed array('I')", args.repeat, packed_moves)
+    print("\ncreate + hash only")
+    bench("  dict-backed Move", args.repeat, create_dict)
+    bench("  slotted Move", args.repeat, create_slotted)
+    bench("  packed int", args.repeat, create_packed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Alpha-beta with and without the coarse planner on large generated maps.
+
+For each size, generates maps with maps.generate_map (the Go server's
+generator), then searches the opening and a few self-play turns of each
+with the planner off and on, reporting depth reached, nodes, nodes/sec,
+root moves and planner cache hits.
+
+Usage:
+    python3 benchmarks/bench_planner.py --sizes 20 50 100 --maps 2 --turns 4 --time-limit 1.8
+"""
+import sys
+import time
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from maps import generate_map
+from move_generator import generate_all_moves, apply_move_to_state
+from opening_book import opening_state, swap_sides
+
+
+def positions(size: int, maps: int, turns: int):
+    """Opening of each generated map, then the positions of `turns` planned self-play plies."""
+    for seed in range(maps):
+        game_map = generate_map(size, size, humans=max(4, size // 2), monsters=10, seed=seed)
+        state = opening_state(game_map)
+        player = AlphaBetaSearch(max_depth=1, time_limit=5.0)
+        for _ in range(turns):
+            yield state
+            moves = player.search(state)
+            state = swap_sides(apply_move_to_state(state, moves))
+
+
+def run(states, planner: bool, time_limit: float, max_depth: int) -> dict:
+    # One searcher per side, as in a game, so plans can be reused across turns
+    searchers = {}
+    totals = {"searches": 0, "depth": 0, "nodes": 0, "time": 0.0, "root_moves": 0, "cached": 0}
+    for state in states:
+        searcher = searchers.setdefault(state.our_species, AlphaBetaSearch(
+            max_depth=max_depth, time_limit=time_limit, planner=planner))
+        start = time.perf_counter()
+        searcher.search(state)
+        totals["time"] += time.perf_counter() - start
+        totals["searches"] += 1
+        totals["depth"] += searcher.stats["depth"]
+        totals["nodes"] += searcher.stats["nodes"]
+        plans = searcher.stats.get("planner")
+        root_moves = len(generate_all_moves(state))
+        if plans is not None:
+            totals["cached"] += plans["cached"]
+            root_moves = len(searcher._plans.restrict(state, generate_all_moves(state)))
+        totals["root_moves"] += root_moves
+    return totals
+
+
+def main():
+    parser = ArgumentParser(description="Coarse planner benchmark on generated maps")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 100], help="Square map sizes")
+    parser.add_argument("--maps", type=int, default=2, help="Generated maps per size")
+    parser.add_argument("--turns", type=int, default=4, help="Positions per map (opening + self-play)")
+    parser.add_argument("--time-limit", type=float, default=1.8, help="Search time per position")
+    parser.add_argument("--max-depth", type=int, default=8)
+    args = parser.parse_args()
+
+    print(f"{'size':>5} {'planner':>7} {'searches':>8} {'avg depth':>9} {'nodes':>7} {'nodes/s':>8} "
+          f"{'root moves':>10} {'cached':>6}")
+    for size in args.sizes:
+        states = list(positions(size, args.maps, args.turns))
+        for planner in (False, True):
+            totals = run(states, planner, args.time_limit, args.max_depth)
+            searches = totals["searches"]
+            print(f"{size:>5} {'on' if planner else 'off':>7} {searches:>8} {totals['depth'] / searches:>9.2f} "
+                  f"{totals['nodes'] / searches:>7.0f} {totals['nodes'] / totals['time']:>8.0f} "
+                  f"{totals['root_moves'] / searches:>10.1f} {totals['cached']:>6}")
+
+
+if __name__ == "__main__":
+    main()
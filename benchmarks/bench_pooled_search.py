@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Compare regular and pooled (allocation-light) alpha-beta search.
+
+Runs the same positions through both modes and reports nodes/sec,
+allocations per node and GC pauses per turn.
+
+Usage:
+    python3 benchmarks/bench_pooled_search.py [--turns 10] [--time-limit 0.5]
+"""
+import io
+import sys
+import contextlib
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Species
+from alphabeta import AlphaBetaSearch
+from memory import GCMonitor, collect_between_turns
+
+
+def make_position(turn: int) -> GameState:
+    """testmap2.xml-sized board with groups shifted a little every turn."""
+    state = GameState(15, 29)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    shift = turn % 5
+    state.board[14 - shift][28 - shift].vampires = 10
+    state.board[shift][shift].werewolves = 10
+    state.board[7][14].humans = 20
+    state.board[3][10].humans = 4
+    state.board[11][18].humans = 4
+    state.board[0][28].humans = 2
+    state.board[14][0].humans = 2
+    return state
+
+
+def run(pooled: bool, turns: int, time_limit: float, depth: int) -> dict:
+    """Play a sequence of searches and collect per-turn figures."""
+    searcher = AlphaBetaSearch(max_depth=depth, time_limit=time_limit, pooled=pooled)
+    monitor = GCMonitor()
+    monitor.install()
+    pauses, max_pauses, nodes_per_sec, blocks = [], [], [], []
+    try:
+        for turn in range(turns):
+            state = make_position(turn)
+            monitor.reset()
+            with contextlib.redirect_stdout(io.StringIO()):
+                searcher.search(state)
+            pauses.append(monitor.pause_time)
+            max_pauses.append(monitor.max_pause)
+            nodes_per_sec.append(searcher.stats["nodes_per_sec"])
+            blocks.append(searcher.stats["alloc_blocks_per_node"])
+            if pooled:
+                collect_between_turns()
+    finally:
+        monitor.uninstall()
+    return {
+        "nodes_per_sec": sum(nodes_per_sec) / turns,
+        "alloc_blocks_per_node": sum(blocks) / turns,
+        "gc_pause_per_turn_ms": 1000 * sum(pauses) / turns,
+        "gc_max_pause_ms": 1000 * max(max_pauses),
+    }
+
+
+def main():
+    parser = ArgumentParser(description="Pooled vs regular search benchmark")
+    parser.add_argument("--turns", type=int, default=10)
+    parser.add_argument("--time-limit", type=float, default=0.5)
+    parser.add_argument("--depth", type=int, default=4)
+    args = parser.parse_args()
+
+    for pooled in (False, True):
+        result = run(pooled, args.turns, args.time_limit, args.depth)
+        label = "pooled " if pooled else "regular"
+        print(f"{label}: {result['nodes_per_sec']:8.0f} nodes/s  "
+              f"{result['alloc_blocks_per_node']:6.2f} blocks/node  "
+              f"GC {result['gc_pause_per_turn_ms']:6.2f} ms/turn "
+              f"(max pause {result['gc_max_pause_ms']:.2f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Protocol I/O costs through a socketpair.
+
+Parsing: time for a synthetic 1000-cell MAP, comparing the previous
+byte-at-a-time reader with the buffered ClientSocket reader. The protocol's
+cell count is a single byte, so the 1000 cells are sent as consecutive MAP
+messages of at most 255 cells each.
+
+Sending: time from "move decided" to the MOV bytes being handed to the
+kernel, comparing bytes concatenation + send() with the reused buffer +
+sendall() of ClientSocket.send_mov.
+
+Usage:
+    python3 benchmarks/bench_protocol.py [--cells 1000] [--repeat 200] [--moves 8]
+"""
+import io
+import sys
+import time
+import socket
+import contextlib
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from client import ClientSocket, bytes_to_int
+
+
+class LegacyClient:
+    """MAP parsing and MOV sending of ClientSocket as they were before buffering."""
+
+    def __init__(self, sock: socket.socket):
+        self._socket = sock
+
+    def _get_command(self) -> str:
+        data = bytes()
+        while len(data) < 3:
+            data += self._socket.recv(3 - len(data))
+        return data.decode()
+
+    def _get_message(self, length: int) -> int:
+        data: bytes = bytes()
+        while len(data) < length:
+            data += self._socket.recv(1 - len(data))
+        return bytes_to_int(data)
+
+    def get_message(self):
+        self._get_command()
+        map = []
+        nb = self._get_message(1)
+        for i in range(nb):
+            map.append((self._get_message(1), self._get_message(1), self._get_message(1), self._get_message(1),
+                        self._get_message(1)))
+        return ["map", map]
+
+    def send_mov(self, nb_moves: int, moves):
+        message = bytes([nb_moves])
+        for move in moves:
+            for data in move:
+                message += bytes([data])
+
+        self._socket.send("MOV".encode() + message)
+
+
+def make_map_messages(cells: int) -> list:
+    """Encode a synthetic map with one species per cell as MAP messages."""
+    entries = []
+    for i in range(cells):
+        x, y = i % 250, i // 250
+        counts = [0, 0, 0]
+        counts[i % 3] = 1 + i % 200
+        entries.append(bytes([x, y] + counts))
+    messages = []
+    for start in range(0, cells, 255):
+        chunk = entries[start:start + 255]
+        messages.append(b"MAP" + bytes([len(chunk)]) + b"".join(chunk))
+    return messages
+
+
+def bench(label: str, reader, server: socket.socket, messages: list, repeat: int) -> None:
+    """Send the messages, time parsing them and print per-map figures."""
+    payload = b"".join(messages)
+    elapsed = 0.0
+    cells = 0
+    for _ in range(repeat):
+        server.sendall(payload)
+        start = time.perf_counter()
+        for _ in messages:
+            cells += len(reader.get_message()[1])
+        elapsed += time.perf_counter() - start
+    print(f"{label:<10} {elapsed * 1e3 / repeat:8.3f} ms/map  {cells / elapsed:12,.0f} cells/s")
+
+
+def bench_send(label: str, sender, server: socket.socket, moves: list, repeat: int) -> None:
+    """Time decided -> sent for repeated MOV messages, draining the other end."""
+    latencies = []
+    size = 4 + 5 * len(moves)
+    for _ in range(repeat):
+        decided_at = time.perf_counter()
+        sender.send_mov(len(moves), moves)
+        latencies.append(time.perf_counter() - decided_at)
+        received = 0
+        while received < size:
+            received += len(server.recv(size - received))
+    latencies.sort()
+    print(f"{label:<10} median {latencies[len(latencies) // 2] * 1e6:7.2f} us  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1e6:7.2f} us")
+
+
+def main():
+    parser = ArgumentParser(description="MAP parsing benchmark")
+    parser.add_argument("--cells", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--moves", type=int, default=8, help="Moves per MOV message")
+    args = parser.parse_args()
+
+    messages = make_map_messages(args.cells)
+    print(f"{args.cells} cells in {len(messages)} MAP messages, "
+          f"{sum(len(m) for m in messages)} bytes\n")
+
+    server, client = socket.socketpair()
+    bench("legacy", LegacyClient(client), server, messages, args.repeat)
+    server.close()
+    client.close()
+
+    server, client = socket.socketpair()
+    with contextlib.redirect_stdout(io.StringIO()):
+        reader = ClientSocket(sock=client)
+    bench("buffered", reader, server, messages, args.repeat)
+    server.close()
+    client.close()
+
+    moves = [(i, i + 1, 3, i + 1, i + 2) for i in range(args.moves)]
+    print(f"\nMOV with {args.moves} moves, decided -> sent")
+    server, client = socket.socketpair()
+    bench_send("legacy", LegacyClient(client), server, moves, args.repeat * 10)
+    server.close()
+    client.close()
+
+    server, client = socket.socketpair()
+    with contextlib.redirect_stdout(io.StringIO()):
+        sender = ClientSocket(sock=client)
+    bench_send("buffered", sender, server, moves, args.repeat * 10)
+    server.close()
+    client.close()
+
+
+if __name__ == "__main__":
+    main()
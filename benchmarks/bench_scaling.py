@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Search throughput and memory against board size and group count.
+
+Runs find_best_move on synthetic positions (ai/synthetic.py) for every
+combination of --sizes and --groups and reports nodes, nodes/sec, depth,
+the memory of the state itself and the peak memory of a search traced
+with tracemalloc (a separate run, since tracing slows the search down).
+--csv writes one row per position for plotting.
+
+Usage:
+    python3 benchmarks/bench_scaling.py --sizes 10 20 40 --groups 1 2 4 --positions 3 --playout 10 --csv scaling.csv
+"""
+import csv
+import sys
+import time
+import tracemalloc
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import find_best_move
+from synthetic import SPLIT_PATTERNS, generate_state
+
+FIELDS = ("size", "groups", "seed", "our_groups", "depth", "nodes", "time", "nodes_per_sec",
+          "state_kib", "search_peak_kib")
+
+
+def measure(size: int, groups: int, seed: int, args) -> dict:
+    tracemalloc.start()
+    state = generate_state(size, size, playout=args.playout, seed=seed, groups=groups, army=args.army,
+                           split=args.split, human_density=args.human_density)
+    state_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    stats = {}
+    start = time.perf_counter()
+    find_best_move(state, max_depth=args.max_depth, time_limit=args.time_limit, stats=stats)
+    elapsed = time.perf_counter() - start
+    row = {"size": size, "groups": groups, "seed": seed, "our_groups": len(state.get_our_groups()),
+           "depth": stats["depth"], "nodes": stats["nodes"], "time": round(elapsed, 4),
+           "nodes_per_sec": round(stats["nodes_per_sec"], 1), "state_kib": round(state_bytes / 1024, 1),
+           "search_peak_kib": None}
+    if args.memory:
+        tracemalloc.start()
+        find_best_move(state, max_depth=args.max_depth, time_limit=args.time_limit)
+        row["search_peak_kib"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        tracemalloc.stop()
+    return row
+
+
+def main():
+    parser = ArgumentParser(description="Search scaling on synthetic positions")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 20, 40], help="Square board sizes")
+    parser.add_argument("--groups", type=int, nargs="+", default=[1, 2, 4], help="Groups per side")
+    parser.add_argument("--positions", type=int, default=3, help="Positions (seeds) per combination")
+    parser.add_argument("--playout", type=int, default=10, help="Random plies before searching")
+    parser.add_argument("--army", type=int, default=24, help="Creatures per side")
+    parser.add_argument("--split", choices=SPLIT_PATTERNS, default="even")
+    parser.add_argument("--human-density", type=float, default=0.05)
+    parser.add_argument("--max-depth", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=1.8)
+    parser.add_argument("--no-memory", dest="memory", action="store_false",
+                        help="Skip the traced search run")
+    parser.add_argument("--csv", default=None, help="Write one row per position to a CSV file")
+    args = parser.parse_args()
+
+    rows = []
+    print(f"{'size':>5} {'groups':>6} {'depth':>5} {'nodes':>7} {'nodes/s':>8} {'state KiB':>9} {'peak KiB':>9}")
+    for size in args.sizes:
+        for groups in args.groups:
+            results = [measure(size, groups, seed, args) for seed in range(args.positions)]
+            rows.extend(results)
+            n = len(results)
+            peak = (f"{sum(r['search_peak_kib'] for r in results) / n:>9.0f}" if args.memory else f"{'-':>9}")
+            print(f"{size:>5} {groups:>6} {sum(r['depth'] for r in results) / n:>5.1f} "
+                  f"{sum(r['nodes'] for r in results) / n:>7.0f} "
+                  f"{sum(r['nodes'] for r in results) / sum(r['time'] for r in results):>8.0f} "
+                  f"{sum(r['state_kib'] for r in results) / n:>9.0f} {peak}")
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Fixed-position search benchmark with a throughput regression gate.
+
+Runs AlphaBetaSearch on every position of the corpus (benchmarks/positions.json)
+at a fixed depth and for a fixed time, and reports nodes, nodes/sec,
+time-to-depth, best move and effective branching factor (nodes of the last
+iteration / nodes of the one before).
+
+The corpus holds the opening of each map in maps/ from both sides and
+mid-game positions from seeded headless games on testmap2.xml.
+
+Usage:
+    python3 benchmarks/bench_search.py                      # run and print
+    python3 benchmarks/bench_search.py --check              # fail on >20% slowdown
+    python3 benchmarks/bench_search.py --update-baseline    # record this machine
+    python3 benchmarks/bench_search.py --make-corpus        # regenerate positions
+"""
+import io
+import os
+import sys
+import json
+import math
+import tempfile
+import contextlib
+from argparse import ArgumentParser
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState
+from alphabeta import AlphaBetaSearch
+from ai_player import AIPlayer
+from maps import list_maps, load_map
+from referee import Referee, play_game
+from recorder import GameRecord
+
+BENCH_DIR = Path(__file__).parent
+CORPUS = BENCH_DIR / "positions.json"
+BASELINE = BENCH_DIR / "search_baseline.json"
+
+# Mid-game positions: turns of the recorded player in seeded testmap2 games
+MIDGAME_TURNS = (8, 16, 24)
+MIDGAME_SEEDS = (1, 2)
+
+
+def build_corpus() -> List[dict]:
+    """Opening positions of every map plus mid-game positions from self-play."""
+    corpus = []
+    for map_path in list_maps():
+        referee = Referee(load_map(map_path))
+        for side in range(2):
+            player = AIPlayer()
+            for message in referee.setup_messages(side):
+                player.update_from_message(message)
+            player.close()
+            corpus.append({"name": f"{map_path.stem}-open-{player.game_state.our_species.name.lower()}",
+                           "source": map_path.name, "state": player.game_state.to_dict()})
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for seed in MIDGAME_SEEDS:
+            path = os.path.join(tmp, f"game{seed}.vvr")
+            players = [AIPlayer(max_depth=2, time_limit=0.05, record_path=path if side == seed % 2 else None)
+                       for side in range(2)]
+            play_game(players, load_map("testmap2.xml"), seed=seed)
+            for player in players:
+                player.close()
+            with GameRecord(path) as record:
+                for turn in MIDGAME_TURNS:
+                    if turn <= len(record):
+                        state = record.state(turn)
+                        corpus.append({"name": f"testmap2-s{seed}-t{turn}-{state.our_species.name.lower()}",
+                                       "source": f"testmap2.xml self-play seed {seed} turn {turn}",
+                                       "state": state.to_dict()})
+    return corpus
+
+
+def effective_branching_factor(depth_nodes: List[int]) -> float:
+    """Nodes of the last completed iteration over nodes of the previous one."""
+    if len(depth_nodes) < 2:
+        return float("nan")
+    last = depth_nodes[-1] - depth_nodes[-2]
+    previous = depth_nodes[-2] - (depth_nodes[-3] if len(depth_nodes) > 2 else 0)
+    return last / previous if previous else float("nan")
+
+
+def run_search(state: GameState, depth: int, time_limit: float) -> dict:
+    searcher = AlphaBetaSearch(max_depth=depth, time_limit=time_limit)
+    with contextlib.redirect_stdout(io.StringIO()):
+        best = searcher.search(state)
+    stats = searcher.stats
+    return {
+        "depth": stats["depth"],
+        "nodes": stats["nodes"],
+        "time": stats["time"],
+        "nodes_per_sec": stats["nodes_per_sec"],
+        "time_to_depth": stats["depth_times"],
+        "ebf": effective_branching_factor(stats["depth_nodes"]),
+        "best_move": [list(move.to_tuple()) for move in best],
+    }
+
+
+def run_corpus(corpus: List[dict], depth: int, time_limit: float, max_depth: int) -> Dict[str, dict]:
+    results = {}
+    for entry in corpus:
+        state = GameState.from_dict(entry["state"])
+        results[entry["name"]] = {
+            "fixed_depth": run_search(state, depth, time_limit=1e9),
+            "fixed_time": run_search(state, max_depth, time_limit),
+        }
+    return results
+
+
+def geometric_mean(values: List[float]) -> float:
+    values = [value for value in values if value > 0]
+    return math.exp(sum(math.log(value) for value in values) / len(values)) if values else 0.0
+
+
+def summarize(results: Dict[str, dict]) -> dict:
+    return {mode: geometric_mean([result[mode]["nodes_per_sec"] for result in results.values()])
+            for mode in ("fixed_depth", "fixed_time")}
+
+
+def compare(results: Dict[str, dict], baseline: dict, tolerance: float) -> List[str]:
+    """
+    Compare against a baseline.
+
+    Returns:
+        Failure messages: aggregate nodes/sec (geometric mean over the corpus)
+        more than tolerance percent below the baseline
+    """
+    failures = []
+    summary = summarize(results)
+    for mode, value in summary.items():
+        reference = baseline["summary"].get(mode)
+        if reference and value < reference * (1 - tolerance / 100):
+            failures.append(f"{mode} nodes/sec {value:.0f} is {100 * (1 - value / reference):.1f}% "
+                            f"below baseline {reference:.0f} (tolerance {tolerance:.0f}%)")
+    return failures
+
+
+def print_results(results: Dict[str, dict], baseline: dict = None):
+    print(f"{'position':<34} {'d':>2} {'nodes':>7} {'n/s':>7} {'ttd (s)':>22} {'ebf':>5}  "
+          f"{'timed d':>7} {'n/s':>7}  best move")
+    for name, result in results.items():
+        fixed, timed = result["fixed_depth"], result["fixed_time"]
+        ttd = " ".join(f"{t:.2f}" for t in fixed["time_to_depth"])
+        delta = ""
+        if baseline and name in baseline.get("positions", {}):
+            reference = baseline["positions"][name]["fixed_depth"]
+            delta = f" ({100 * (fixed['nodes_per_sec'] / reference['nodes_per_sec'] - 1):+.0f}%)"
+            if reference["nodes"] != fixed["nodes"]:
+                delta += f" nodes changed from {reference['nodes']}"
+        print(f"{name:<34} {fixed['depth']:>2} {fixed['nodes']:>7} {fixed['nodes_per_sec']:>7.0f} {ttd:>22} "
+              f"{fixed['ebf']:>5.1f}  {timed['depth']:>7} {timed['nodes_per_sec']:>7.0f}  "
+              f"{fixed['best_move']}{delta}")
+    summary = summarize(results)
+    print(f"\nGeometric mean nodes/sec: fixed depth {summary['fixed_depth']:.0f}, "
+          f"fixed time {summary['fixed_time']:.0f}")
+
+
+def main():
+    parser = ArgumentParser(description="Fixed-position search benchmark")
+    parser.add_argument("--depth", type=int, default=2, help="Fixed search depth")
+    parser.add_argument("--time-limit", type=float, default=1.0, help="Fixed search time")
+    parser.add_argument("--max-depth", type=int, default=8, help="Depth cap of the fixed-time search")
+    parser.add_argument("--corpus", default=str(CORPUS))
+    parser.add_argument("--baseline", default=str(BASELINE))
+    parser.add_argument("--tolerance", type=float, default=20.0,
+                        help="Allowed nodes/sec regression in percent")
+    parser.add_argument("--check", action="store_true", help="Exit with status 1 on regression")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--make-corpus", action="store_true")
+    parser.add_argument("--output", default=None, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    if args.make_corpus:
+        with contextlib.redirect_stdout(io.StringIO()):
+            corpus = build_corpus()
+        with open(args.corpus, "w") as f:
+            json.dump(corpus, f, indent=1)
+        print(f"Wrote {len(corpus)} positions to {args.corpus}")
+        return
+
+    with open(args.corpus) as f:
+        corpus = json.load(f)
+    baseline = None
+    if os.path.exists(args.baseline) and not args.update_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = run_corpus(corpus, args.depth, args.time_limit, args.max_depth)
+    print_results(results, baseline)
+    report = {"settings": {"depth": args.depth, "time_limit": args.time_limit, "max_depth": args.max_depth},
+              "summary": summarize(results), "positions": results}
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=1)
+    if args.update_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1)
+        print(f"Baseline written to {args.baseline}")
+        return
+    if baseline:
+        failures = compare(results, baseline, args.tolerance)
+        for failure in failures:
+            print(f"REGRESSION: {failure}")
+        if failures and args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Dispatch latency of the shared-memory search worker.
+
+Reports, in microseconds (median / 99th percentile / max):
+  - ping: round trip of an empty request through the segment
+  - dispatch: from writing a position's changed cells to the worker waking
+    up, over a self-play line on a map (--plies positions, depth-1
+    searches so the search itself stays out of the way)
+  - return: from the worker writing its result to the parent reading it
+  - pool: round trip of a GameState sent to a ProcessPoolExecutor worker
+    (pickled every turn), the alternative the shared segment replaces
+next to the resolution of time.time() and time.perf_counter().
+
+Usage:
+    python3 benchmarks/bench_search_worker.py --pings 2000 --plies 40 --map testmap2.xml
+"""
+import statistics
+import sys
+import time
+from argparse import ArgumentParser
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from maps import load_map
+from move_generator import apply_move_to_state
+from opening_book import opening_state, swap_sides
+from search_worker import SearchWorker
+
+
+def summary(seconds) -> str:
+    values = sorted(value * 1e6 for value in seconds)
+    p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+    return f"{statistics.median(values):>9.1f} {p99:>9.1f} {values[-1]:>9.1f}"
+
+
+def groups(state) -> int:
+    return len(state.get_our_groups())
+
+
+def main():
+    parser = ArgumentParser(description="Shared-memory search worker latency")
+    parser.add_argument("--pings", type=int, default=2000, help="Empty round trips")
+    parser.add_argument("--plies", type=int, default=40, help="Self-play positions dispatched")
+    parser.add_argument("--map", default="testmap2.xml", help="Map of the self-play line")
+    args = parser.parse_args()
+
+    for clock in ("time", "perf_counter"):
+        info = time.get_clock_info(clock)
+        print(f"time.{clock}(): resolution {info.resolution * 1e6:.3f}us ({info.implementation})")
+
+    state = opening_state(load_map(args.map))
+    start = time.perf_counter()
+    worker = SearchWorker(state.rows, state.cols, AlphaBetaSearch, max_depth=1, time_limit=1.8)
+    started = time.perf_counter() - start
+    dispatch, back, changed, line = [], [], [], []
+    with worker:
+        worker.ping()
+        pings = [worker.ping() for _ in range(args.pings)]
+        for _ in range(args.plies):
+            line.append(state)
+            moves = worker.search(state)
+            dispatch.append(worker.stats["dispatch_latency"])
+            back.append(worker.stats["return_latency"])
+            changed.append(worker.stats["changed_cells"])
+            if not moves:
+                break
+            state = swap_sides(apply_move_to_state(state, moves))
+
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        pool.submit(groups, line[0]).result()
+        pool_trips = []
+        for position in line:
+            start = time.perf_counter()
+            pool.submit(groups, position).result()
+            pool_trips.append(time.perf_counter() - start)
+
+    print(f"\nworker start (fork + engine): {started * 1e3:.1f}ms, "
+          f"{state.rows}x{state.cols} board, {statistics.mean(changed):.1f} changed cells per dispatch")
+    print(f"{'':<10} {'median us':>9} {'p99 us':>9} {'max us':>9}")
+    print(f"{'ping':<10} {summary(pings)}")
+    print(f"{'dispatch':<10} {summary(dispatch)}")
+    print(f"{'return':<10} {summary(back)}")
+    print(f"{'pool':<10} {summary(pool_trips)}")
+
+
+if __name__ == "__main__":
+    main()
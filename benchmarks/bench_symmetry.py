@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Cache hits gained by keying positions canonically over map symmetries.
+
+For each map, reports the symmetries found on the initial position, then:
+  - positions: every position reachable in --plies plies from the openings
+    of both sides, looked up in a position cache keyed the old way (absolute
+    species, as seen) and canonically (opening_book.canonical_key), with the
+    hit rate of each
+  - endgame: the endgame solver on a humanless position invariant under a
+    map symmetry (--endgame-plies deep), with and without the map's
+    symmetries: positions searched, memo hits and solve time
+
+Usage:
+    python3 benchmarks/bench_symmetry.py --plies 2 --sizes 8 12
+"""
+import sys
+from argparse import ArgumentParser
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import IDENTITY, transform_cell
+from endgame import EndgameSolver
+from maps import generate_map, list_maps, load_map
+from move_generator import generate_all_moves, apply_move_to_state
+from opening_book import canonical_key, opening_state, swap_sides
+
+
+def reachable(state, plies: int):
+    """Positions of the move tree from state (the side to move alternating), root included."""
+    yield state
+    if plies:
+        for combo in generate_all_moves(state):
+            yield from reachable(swap_sides(apply_move_to_state(state, combo)), plies - 1)
+
+
+def position_hits(game_map, plies: int) -> dict:
+    plain, canonical = set(), set()
+    lookups = 0
+    for side in (0, 1):
+        for state in reachable(opening_state(game_map, side), plies):
+            lookups += 1
+            plain.add((int(state.our_species), state.relative_layout()))
+            canonical.add(canonical_key(state)[0])
+    return {"lookups": lookups, "plain_hits": lookups - len(plain), "canonical_hits": lookups - len(canonical)}
+
+
+def endgame_position(game_map):
+    """
+    A humanless position invariant under the map's first non-trivial symmetry:
+    6 of ours on both starting cells, 3 of theirs on a mirrored pair of
+    human cells. None when the map has no symmetry.
+    """
+    state = opening_state(game_map)
+    if len(state.symmetries) == 1:
+        return None
+    symmetry = state.symmetries[1]
+    mirror = lambda x, y: transform_cell(symmetry, x, y, state.rows, state.cols)
+    humans = [(x, y) for x, row in enumerate(state.board) for y, cell in enumerate(row)
+              if cell.humans and mirror(x, y) != (x, y)]
+    starts = [(x, y) for x, row in enumerate(state.board) for y, cell in enumerate(row)
+              if cell.vampires or cell.werewolves]
+    for row in state.board:
+        for cell in row:
+            cell.humans = cell.vampires = cell.werewolves = 0
+    for x, y in starts:
+        state.board[x][y].set_count(state.our_species, 6)
+    for x, y in (humans[0], mirror(*humans[0])):
+        state.board[x][y].set_count(state.opponent_species, 3)
+    return state
+
+
+def endgame_hits(game_map, plies: int) -> dict:
+    """Solver memo with and without the symmetries, searching exactly `plies` plies."""
+    result = {}
+    for name, symmetric in (("plain", False), ("canonical", True)):
+        state = endgame_position(game_map)
+        if state is None:
+            return {}
+        if not symmetric:
+            state.symmetries = (IDENTITY,)
+        solver = EndgameSolver(max_plies=plies)
+        solved = solver.solve(state, time_limit=600)
+        result[name] = {"memo": len(solver.memo), "hits": solver.memo_hits, "positions": solved.positions,
+                        "time": solved.time, "result": solved.result}
+    return result
+
+
+def main():
+    parser = ArgumentParser(description="Cache hits of canonical symmetry keys")
+    parser.add_argument("--plies", type=int, default=2, help="Depth of the enumerated move tree")
+    parser.add_argument("--sizes", type=int, nargs="*", default=[8, 12], help="Generated square map sizes")
+    parser.add_argument("--seeds", type=int, default=3, help="Generated maps per size")
+    parser.add_argument("--endgame-plies", type=int, default=3, help="Endgame solver depth")
+    args = parser.parse_args()
+
+    maps = [load_map(path) for path in list_maps()]
+    maps += [generate_map(size, size, humans=6, monsters=6, seed=seed)
+             for size in args.sizes for seed in range(args.seeds)]
+    print(f"{'map':<22} {'symmetries':<10} {'lookups':>7} {'plain hit':>9} {'canon hit':>9} "
+          f"{'solver positions':>16} {'memo hits':>11} {'solve time':>13}")
+    for game_map in maps:
+        symmetries = opening_state(game_map).symmetries
+        positions = position_hits(game_map, args.plies)
+        endgame = endgame_hits(game_map, args.endgame_plies)
+        line = (f"{game_map.name:<22} {','.join(map(str, symmetries)):<10} {positions['lookups']:>7} "
+                f"{positions['plain_hits'] / positions['lookups']:>9.1%} "
+                f"{positions['canonical_hits'] / positions['lookups']:>9.1%}")
+        if endgame:
+            plain, canonical = endgame["plain"], endgame["canonical"]
+            line += (f" {plain['positions']:>7} -> {canonical['positions']:<6} {plain['hits']:>4} -> {canonical['hits']:<4}"
+                     f" {plain['time']:>5.2f} -> {canonical['time']:.2f}s")
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Tests for the asyncio game client."""
+import io
+import sys
+import time
+import asyncio
+import contextlib
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from async_client import AsyncClientSocket, AsyncGame
+from ai_player import AIPlayer
+from recorder import GameRecord, GameRecorder
+
+# thetrap.xml: 5 rows x 10 columns, cells as (x, y, humans, vampires, werewolves)
+TRAP_MAP = [(2, 2, 4, 0, 0), (9, 0, 2, 0, 0), (9, 2, 1, 0, 0), (9, 4, 2, 0, 0),
+            (4, 1, 0, 0, 4), (4, 3, 0, 4, 0)]
+
+
+def cells_message(command, cells):
+    return command.encode() + bytes([len(cells)]) + bytes(b for cell in cells for b in cell)
+
+
+class SlowPlayer(AIPlayer):
+    """AIPlayer whose search overruns the turn clock."""
+
+    def __init__(self, delay):
+        super().__init__(name="Slow", max_depth=1, time_limit=0.05)
+        self.delay = delay
+
+    def compute_move(self):
+        time.sleep(self.delay)
+        return super().compute_move()
+
+
+async def run_game(player, deadline, after_mov):
+    """
+    Serve the thetrap opening, play one turn and let after_mov decide the rest.
+
+    Returns:
+        (MOV bytes received, seconds from UPD to MOV, AsyncGame)
+    """
+    result = {}
+
+    async def serve(reader, writer):
+        name_length = (await reader.readexactly(4))[3]
+        await reader.readexactly(name_length)
+        writer.write(b"SET" + bytes([5, 10]) + cells_message("HUM", [(2, 2), (9, 0), (9, 2), (9, 4)]) +
+                     b"HME" + bytes([4, 3]) + cells_message("MAP", TRAP_MAP) + cells_message("UPD", []))
+        await writer.drain()
+        sent = time.perf_counter()
+        if after_mov == "end_during_search":
+            await asyncio.sleep(0.05)
+            writer.write(b"END")
+            await writer.drain()
+            result["end_sent"] = time.perf_counter()
+        header = await reader.read(4)
+        if len(header) == 4:
+            result["mov"] = header + await reader.readexactly(5 * header[3])
+            result["latency"] = time.perf_counter() - sent
+            if after_mov == "upd":
+                # Second turn while the first search may still be running
+                writer.write(cells_message("UPD", []))
+                await writer.drain()
+                sent = time.perf_counter()
+                header = await reader.readexactly(4)
+                result["second_mov"] = header + await reader.readexactly(5 * header[3])
+                result["second_latency"] = time.perf_counter() - sent
+            writer.write(b"END")
+            await writer.drain()
+        writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    client = await AsyncClientSocket.connect("127.0.0.1", port)
+    game = AsyncGame(player, client, deadline=deadline)
+    with contextlib.redirect_stdout(io.StringIO()):
+        await asyncio.wait_for(game.run(), timeout=10)
+        server.close()
+        await server.wait_closed()
+    result["finished"] = time.perf_counter()
+    return result, game
+
+
+class RecordingPlayer(SlowPlayer):
+    """SlowPlayer logging when searches run and when the state is updated."""
+    
+    def __init__(self, delay):
+        super().__init__(delay)
+        self.events = []
+    
+    def update_from_message(self, message):
+        self.events.append(message[0])
+        super().update_from_message(message)
+    
+    def compute_move(self):
+        self.events.append("search")
+        result = super().compute_move()
+        self.events.append("searched")
+        return result
+
+
+def test_async_game_sends_searched_move():
+    """A normal turn sends the searched move and the game stops on END."""
+    player = AIPlayer(name="Async", max_depth=2, time_limit=0.3)
+    result, game = asyncio.run(run_game(player, deadline=1.95, after_mov="end"))
+    mov = result["mov"]
+    assert mov[:3] == b"MOV" and mov[3] >= 1
+    assert game.turn == 1 and game.watchdog_fallbacks == 0
+    assert "send_latency" in player.last_turn_stats
+
+
+def test_watchdog_sends_fallback():
+    """A search that overruns the deadline is answered with the fallback move."""
+    player = SlowPlayer(delay=0.6)
+    result, game = asyncio.run(run_game(player, deadline=0.15, after_mov="end"))
+    assert result["mov"][:3] == b"MOV"
+    assert result["latency"] < 0.5
+    assert game.watchdog_fallbacks == 1
+
+
+def test_record_holds_the_sent_fallback():
+    """After a watchdog timeout the record has the fallback that was sent, not the abandoned search's move."""
+    player = SlowPlayer(delay=0.4)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "game.vvr")
+        player.recorder = GameRecorder(path)
+        result, game = asyncio.run(run_game(player, deadline=0.1, after_mov="end"))
+        # Let the abandoned search finish before closing the record
+        game.executor.shutdown(wait=True)
+        player.close()
+        sent = list(struct.iter_unpack("5B", result["mov"][4:]))
+        with GameRecord(path) as record:
+            moves, stats = record.move(1)
+        assert moves == sent and stats["depth"] == 0
+
+
+def test_abandoned_search_finishes_before_next_update():
+    """The next UPD is applied only once the search the watchdog gave up on is over."""
+    player = RecordingPlayer(delay=0.4)
+    result, game = asyncio.run(run_game(player, deadline=0.1, after_mov="upd"))
+    assert result["second_mov"][:3] == b"MOV" and game.turn == 2
+    updates = [index for index, event in enumerate(player.events) if event == "upd"]
+    assert player.events.index("searched") < updates[1]
+
+
+def test_wait_for_abandoned_search_counts_against_deadline():
+    """A turn whose deadline passed while waiting for the abandoned search sends the fallback at once."""
+    player = RecordingPlayer(delay=0.6)
+    result, game = asyncio.run(run_game(player, deadline=0.2, after_mov="upd"))
+    # The first search ends 0.4s after the second UPD, already past its 0.2s
+    assert game.watchdog_fallbacks == 2
+    assert result["second_latency"] < 0.5
+
+
+def test_held_messages_keep_their_order():
+    """Messages read while watching for END come back before later ones, in order."""
+    async def scenario():
+        game = AsyncGame(AIPlayer(name="Order", max_depth=1), client=None)
+        watcher = asyncio.ensure_future(game._peek_game_over())
+        await game.messages.put(["upd", 1])
+        await asyncio.sleep(0)
+        await game.messages.put(["upd", 2])
+        watcher.cancel()
+        await game.messages.put(["upd", 3])
+        return [(await game.next_message())[1] for _ in range(3)]
+    
+    assert asyncio.run(scenario()) == [1, 2, 3]
+
+
+def test_end_during_search():
+    """END arriving mid-search ends the game without waiting for the move."""
+    player = SlowPlayer(delay=0.6)
+    result, game = asyncio.run(run_game(player, deadline=1.95, after_mov="end_during_search"))
+    assert "mov" not in result
+    assert result["finished"] - result["end_sent"] < 0.4
+
+
+if __name__ == "__main__":
+    test_async_game_sends_searched_move()
+    test_watchdog_sends_fallback()
+    test_record_holds_the_sent_fallback()
+    test_abandoned_search_finishes_before_next_update()
+    test_wait_for_abandoned_search_counts_against_deadline()
+    test_held_messages_keep_their_order()
+    test_end_during_search()
+    print("All asyncio client tests passed! ✓")
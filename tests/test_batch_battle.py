@@ -0,0 +1,88 @@
+"""Statistical tests of the NumPy batch battle simulator against simulate_battle."""
+import sys
+import random
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from move_generator import simulate_battle, calculate_battle_probability
+from batch_battle import (simulate_battles, battle_probabilities, battle_odds,
+                          BattleSampler, make_rng)
+
+N = 20000
+CASES = [
+    (5, 5, False),
+    (8, 5, False),
+    (3, 7, False),
+    (40, 100, False),
+    (3, 5, True),
+    (12, 20, True),
+]
+
+
+def scalar_samples(attackers, defenders, is_human, n, seed):
+    """Draw n outcomes from the scalar simulator."""
+    random.seed(seed)
+    return np.array([simulate_battle(attackers, defenders, is_human) for _ in range(n)])
+
+
+def max_cdf_distance(a, b):
+    """Two-sample Kolmogorov-Smirnov statistic for integer samples."""
+    values = np.union1d(a, b)
+    cdf_a = np.searchsorted(np.sort(a), values, side="right") / len(a)
+    cdf_b = np.searchsorted(np.sort(b), values, side="right") / len(b)
+    return float(np.max(np.abs(cdf_a - cdf_b)))
+
+
+def test_probabilities_match_scalar():
+    """Vectorized probabilities equal calculate_battle_probability."""
+    attackers = np.array([1, 5, 8, 3, 40, 15])
+    defenders = np.array([4, 5, 5, 7, 100, 10])
+    expected = [calculate_battle_probability(a, d) for a, d in zip(attackers, defenders)]
+    assert np.allclose(battle_probabilities(attackers, defenders), expected)
+
+
+@pytest.mark.parametrize("attackers,defenders,is_human", CASES)
+def test_distribution_matches_scalar(attackers, defenders, is_human):
+    """Batch and scalar simulators agree on win rate, means and survivor distribution."""
+    scalar = scalar_samples(attackers, defenders, is_human, N, seed=1)
+    batch_att, batch_def = simulate_battles(attackers, defenders, is_human, n=N, rng=make_rng(1))
+    assert batch_att.shape == (N,) and batch_def.shape == (N,)
+
+    for column, batch in ((0, batch_att), (1, batch_def)):
+        a = scalar[:, column].astype(float)
+        b = batch.astype(float)
+        # Means within 5 standard errors of each other
+        stderr = np.sqrt(a.var() / N + b.var() / N) + 1e-9
+        assert abs(a.mean() - b.mean()) < 5 * stderr, (column, a.mean(), b.mean())
+        # Critical KS value at alpha=0.001 for two samples of size N is ~0.0195
+        assert max_cdf_distance(scalar[:, column], batch) < 0.0195
+
+
+def test_batched_arrays_and_seeding():
+    """Array inputs resolve one battle per entry and seeds are reproducible."""
+    attackers = np.array([10, 2, 30])
+    defenders = np.array([4, 9, 30])
+    first = simulate_battles(attackers, defenders, n=1000, rng=make_rng(7))
+    second = simulate_battles(attackers, defenders, n=1000, rng=make_rng(7))
+    assert first[0].shape == (1000, 3)
+    assert np.array_equal(first[0], second[0]) and np.array_equal(first[1], second[1])
+    # One side is always wiped out
+    assert np.all((first[0] == 0) | (first[1] == 0))
+
+
+def test_sampler_and_odds():
+    """The per-battle sampler and the odds helper agree with the scalar simulator."""
+    sampler = BattleSampler(seed=3)
+    sampled = np.array([sampler(12, 20, True) for _ in range(N)])
+    scalar = scalar_samples(12, 20, True, N, seed=3)
+    assert max_cdf_distance(sampled[:, 0], scalar[:, 0]) < 0.0195
+
+    odds = battle_odds(8, 5, n=N, seed=3)
+    p = calculate_battle_probability(8, 5)
+    assert abs(odds["win_rate"] - p) < 0.02
@@ -0,0 +1,134 @@
+"""Tests for the buffered protocol reader in ClientSocket."""
+import io
+import sys
+import time
+import socket
+import threading
+import contextlib
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from client import ClientSocket, EndException, BUFFER_SIZE, MAX_MOVES
+
+
+def make_client():
+    """ClientSocket on one end of a socketpair, plus the server end."""
+    server, client = socket.socketpair()
+    with contextlib.redirect_stdout(io.StringIO()):
+        return ClientSocket(sock=client), server
+
+
+def cells_message(command, cells):
+    return command.encode() + bytes([len(cells)]) + bytes(b for cell in cells for b in cell)
+
+
+def test_parse_shapes():
+    """Every command keeps the shape the player expects."""
+    client, server = make_client()
+    cells = [(1, 2, 3, 0, 0), (4, 5, 0, 6, 0), (7, 8, 0, 0, 9)]
+    server.sendall(b"SET" + bytes([5, 10]) + b"HUM" + bytes([2, 1, 2, 3, 4]) +
+                   b"HME" + bytes([4, 5]) + cells_message("MAP", cells) +
+                   cells_message("UPD", cells[:1]) + cells_message("UPD", []))
+
+    assert client.get_message() == ["set", [5, 10]]
+    assert client.get_message() == ["hum", [[1, 2], [3, 4]]]
+    assert client.get_message() == ["hme", [4, 5]]
+    assert client.get_message() == ["map", cells]
+    assert client.get_message() == ["upd", [(1, 2, 3, 0, 0)]]
+    assert client.get_message() == ["upd", []]
+    server.close()
+
+
+def test_message_split_across_packets():
+    """A message arriving a few bytes at a time is reassembled."""
+    client, server = make_client()
+    cells = [(x, x + 1, 0, x % 7, 0) for x in range(200)]
+    data = cells_message("MAP", cells)
+
+    def trickle():
+        for i in range(0, len(data), 3):
+            server.sendall(data[i:i + 3])
+            time.sleep(0.0001)
+
+    sender = threading.Thread(target=trickle)
+    sender.start()
+    assert client.get_message() == ["map", cells]
+    sender.join()
+    server.close()
+
+
+def test_buffer_wraps_around():
+    """Many full-size messages in a row cross the buffer boundary correctly."""
+    client, server = make_client()
+    cells = [(x % 250, x // 250, 1, 0, 0) for x in range(255)]
+    data = cells_message("UPD", cells)
+    rounds = 2 * BUFFER_SIZE // len(data) + 2
+    for _ in range(rounds):
+        server.sendall(data)
+        assert client.get_message() == ["upd", cells]
+    server.close()
+
+
+def test_end_and_closed_connection():
+    """END raises, and a closed connection yields None."""
+    client, server = make_client()
+    server.sendall(b"END")
+    try:
+        client.get_message()
+        assert False, "END should raise"
+    except EndException:
+        pass
+    server.close()
+    assert client.get_message() is None
+
+
+def read_exactly(sock, length):
+    data = b""
+    while len(data) < length:
+        data += sock.recv(length - len(data))
+    return data
+
+
+def test_send_mov_encoding():
+    """MOV bytes match the protocol, and the reused buffer is not leaking old moves."""
+    client, server = make_client()
+    client.send_mov(2, [(1, 2, 3, 4, 5), (6, 7, 8, 9, 10)])
+    assert read_exactly(server, 14) == b"MOV" + bytes([2, 1, 2, 3, 4, 5, 6, 7, 8, 9, 10])
+    assert client.last_sent_at is not None
+
+    client.send_mov(1, [(0, 0, 255, 1, 1)])
+    assert read_exactly(server, 9) == b"MOV" + bytes([1, 0, 0, 255, 1, 1])
+
+    moves = [(i % 256, 0, 1, 1, 0) for i in range(MAX_MOVES)]
+    client.send_mov(MAX_MOVES, moves)
+    data = read_exactly(server, 4 + 5 * MAX_MOVES)
+    assert data[3] == MAX_MOVES and data[4:9] == bytes(moves[0])
+    server.close()
+
+
+def test_tcp_nodelay():
+    """TCP connections disable Nagle's algorithm."""
+    listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listener.bind(("127.0.0.1", 0))
+    listener.listen(1)
+    with contextlib.redirect_stdout(io.StringIO()):
+        client = ClientSocket("127.0.0.1", listener.getsockname()[1])
+    server, _ = listener.accept()
+    assert client._socket.getsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY)
+
+    client.send_nme("AI")
+    assert read_exactly(server, 6) == b"NME" + bytes([2]) + b"AI"
+    server.close()
+    listener.close()
+
+
+if __name__ == "__main__":
+    test_parse_shapes()
+    test_message_split_across_packets()
+    test_buffer_wraps_around()
+    test_end_and_closed_connection()
+    test_send_mov_encoding()
+    test_tcp_nodelay()
+    print("All client tests passed! ✓")
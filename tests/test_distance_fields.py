@@ -0,0 +1,118 @@
+"""Tests for the human distance fields."""
+import random
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Move, Species
+from evaluation import evaluate_state
+from move_generator import generate_all_moves, order_moves, apply_move_to_state
+from distance_fields import build_fields
+
+
+def random_state(rows, cols, seed):
+    rng = random.Random(seed)
+    state = GameState(rows, cols)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    for _ in range(rng.randint(1, 8)):
+        state.board[rng.randrange(rows)][rng.randrange(cols)].humans = rng.randint(1, 12)
+    return state
+
+
+def test_fields_match_brute_force():
+    """Every bucket holds the Chebyshev distance to the nearest human group it can convert."""
+    for seed in range(20):
+        state = random_state(3 + seed % 7, 4 + seed % 5, seed)
+        fields = state.human_distance_fields()
+        humans = [(x, y, cell.humans) for x, row in enumerate(state.board) for y, cell in enumerate(row) if cell.humans]
+        for count in range(0, 14):
+            for x in range(state.rows):
+                for y in range(state.cols):
+                    winnable = [max(abs(x - hx), abs(y - hy)) for hx, hy, h in humans if h <= count]
+                    assert fields.steps_to_conversion(x, y, count) == (min(winnable) if winnable else None)
+                    assert fields.nearest(x, y) == min(max(abs(x - hx), abs(y - hy)) for hx, hy, _ in humans)
+
+
+def test_lazy_rebuild():
+    """Fields are reused until a human cell changes; clones inherit them."""
+    state = random_state(6, 6, 3)
+    fields = state.human_distance_fields()
+    assert state.human_distance_fields() is fields
+    state.board[0][0].vampires = 5
+    assert state.human_distance_fields() is fields
+    assert state.clone()._human_fields is fields
+
+    # Direct edits are seen after invalidate_moves()
+    x, y = next((x, y) for x, row in enumerate(state.board) for y, cell in enumerate(row) if cell.humans)
+    state.board[x][y].humans += 1
+    assert state.human_distance_fields() is fields
+    state.invalidate_moves()
+    rebuilt = state.human_distance_fields()
+    assert rebuilt is not fields and rebuilt.humans != fields.humans
+    state.board[x][y].humans -= 1
+    state.invalidate_moves()
+    assert state.human_distance_fields().humans == fields.humans
+
+    for row in state.board:
+        for cell in row:
+            cell.humans = 0
+    state.invalidate_moves()
+    assert state.human_distance_fields() is None
+
+
+def test_humans_marked_dirty_by_battles():
+    """Applying moves rescans the humans only after a battle on a human cell."""
+    state = random_state(6, 6, 3)
+    state.our_species, state.opponent_species = Species.VAMPIRE, Species.WEREWOLF
+    state.board[5][5].vampires = 20
+    fields = state.human_distance_fields()
+    quiet = [move for [move] in generate_all_moves(state) if not state.board[move.x_to][move.y_to].humans]
+    child = apply_move_to_state(state, [quiet[0]])
+    assert not child._humans_dirty and child.human_distance_fields() is fields
+    
+    state.board[5][4].humans = 3
+    state.invalidate_moves()
+    child = apply_move_to_state(state, [Move(5, 5, 5, 4, 20)])
+    assert child._humans_dirty and child.board[5][4].humans == 0
+    assert (5 * 6 + 4, 3) not in child.human_distance_fields().humans
+
+
+def test_evaluation_and_ordering_use_king_steps():
+    """A diagonal neighbour is one step away; ordering steps towards conversions."""
+    def position(our_x, our_y, humans=3):
+        state = GameState(5, 5)
+        state.our_species = Species.VAMPIRE
+        state.opponent_species = Species.WEREWOLF
+        state.board[0][0].humans = humans
+        state.board[4][4].werewolves = 2
+        state.board[our_x][our_y].vampires = 4
+        return state
+
+    # Human term only: 40 / (1 + 1 step) for a diagonal neighbour we convert for sure
+    assert evaluate_state(position(1, 1)) - evaluate_state(position(1, 1, humans=0)) == 20
+    # Too many humans next to us: penalized
+    assert evaluate_state(position(1, 1, humans=6)) - evaluate_state(position(1, 1, humans=0)) == -25
+
+    state = position(2, 2)
+    ordered = order_moves(state, generate_all_moves(state))
+    assert ordered[0] == [Move(2, 2, 1, 1, 4)]
+    child = apply_move_to_state(state, ordered[0])
+    assert child.human_distance_fields().steps_to_conversion(1, 1, 4) == 1
+
+
+def test_build_fields_cached():
+    state = random_state(8, 8, 11)
+    fields = state.human_distance_fields()
+    assert build_fields(state.rows, state.cols, fields.humans) is fields
+
+
+if __name__ == "__main__":
+    test_fields_match_brute_force()
+    test_lazy_rebuild()
+    test_humans_marked_dirty_by_battles()
+    test_evaluation_and_ordering_use_king_steps()
+    test_build_fields_cached()
+    print("All distance field tests passed! ✓")
@@ -0,0 +1,96 @@
+"""Tests for the humanless endgame mode."""
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Move, Species
+from alphabeta import AlphaBetaSearch
+from endgame import EndgameSolver, WIN, LOSS, UNKNOWN, evaluate_endgame, is_endgame
+
+
+def make_state(rows, cols, ours, theirs, humans=()):
+    """Werewolves (us) vs vampires; groups are (x, y, count) in internal coordinates."""
+    state = GameState(rows, cols)
+    state.our_species = Species.WEREWOLF
+    state.opponent_species = Species.VAMPIRE
+    for x, y, count in ours:
+        state.board[x][y].werewolves = count
+    for x, y, count in theirs:
+        state.board[x][y].vampires = count
+    for x, y, count in humans:
+        state.board[x][y].humans = count
+    return state
+
+
+def test_is_endgame():
+    assert is_endgame(make_state(3, 3, [(0, 0, 5)], [(2, 2, 5)]))
+    assert not is_endgame(make_state(3, 3, [(0, 0, 5)], [(2, 2, 5)], humans=[(1, 1, 2)]))
+
+
+def test_evaluation_rewards_pressure():
+    """A killable enemy is worth more close by; a threatening one costs more close by."""
+    far = evaluate_endgame(make_state(1, 8, [(0, 0, 9)], [(0, 7, 4)]))
+    near = evaluate_endgame(make_state(1, 8, [(0, 0, 9)], [(0, 2, 4)]))
+    assert near > far > 0
+    threatened_far = evaluate_endgame(make_state(1, 8, [(0, 0, 2)], [(0, 7, 4)]))
+    threatened_near = evaluate_endgame(make_state(1, 8, [(0, 0, 2)], [(0, 1, 4)]))
+    assert threatened_near < threatened_far < 0
+    assert evaluate_endgame(make_state(1, 8, [(0, 0, 2)], [])) == 10000.0
+
+
+def test_solver_win_and_loss():
+    solver = EndgameSolver()
+    state = make_state(3, 3, [(1, 1, 10)], [(0, 0, 3)])
+    solved = solver.solve(state, time_limit=5)
+    assert solved.result == WIN and solved.plies == 1
+    assert solved.move == [Move(1, 1, 0, 0, 10)] or solved.move[0].count >= 5
+
+    # Cornered 2 against 10: every line ends with our group killed
+    solved = EndgameSolver().solve(make_state(1, 2, [(0, 0, 2)], [(0, 1, 10)]), time_limit=5)
+    assert solved.result == LOSS and solved.plies == 3
+
+    # Equal groups can only fight random battles: nothing to prove
+    solved = EndgameSolver().solve(make_state(3, 3, [(0, 0, 4)], [(1, 1, 4)]), time_limit=1)
+    assert solved.result == UNKNOWN
+    assert solved.to_dict()["solved"] is False
+
+
+def test_search_uses_solver():
+    """The search plays a proven win at once and reports the endgame outcome."""
+    searcher = AlphaBetaSearch(max_depth=3, time_limit=5)
+    moves = searcher.search(make_state(3, 3, [(1, 1, 10)], [(0, 0, 3)]))
+    assert moves[0].x_to == 0 and moves[0].y_to == 0 and moves[0].count >= 5
+    assert searcher.stats["endgame"]["solved"] and searcher.stats["endgame"]["result"] == "win"
+    assert searcher.stats["endgame"]["proof_scope"] == "generate_all_moves"
+    assert searcher.stats["nodes"] == 0
+
+    searcher.search(make_state(4, 4, [(0, 0, 4)], [(3, 3, 4)], humans=[(1, 2, 1)]))
+    assert "endgame" not in searcher.stats
+
+    plain = AlphaBetaSearch(max_depth=2, time_limit=5, endgame=False)
+    plain.search(make_state(3, 3, [(1, 1, 10)], [(0, 0, 3)]))
+    assert "endgame" not in plain.stats
+
+
+def test_explicit_evaluation_kept_in_endgame():
+    """A caller's evaluation is not replaced by evaluate_endgame."""
+    calls = []
+    
+    def material(state):
+        calls.append(state)
+        return float(state.get_total_count(state.our_species) - state.get_total_count(state.opponent_species))
+    
+    searcher = AlphaBetaSearch(max_depth=2, time_limit=5, evaluate=material)
+    searcher.search(make_state(4, 6, [(0, 0, 4), (3, 5, 2)], [(3, 0, 4), (0, 5, 2)]))
+    assert "endgame" in searcher.stats and calls
+
+
+if __name__ == "__main__":
+    test_is_endgame()
+    test_evaluation_rewards_pressure()
+    test_solver_win_and_loss()
+    test_search_uses_solver()
+    test_explicit_evaluation_kept_in_endgame()
+    print("All endgame tests passed! ✓")
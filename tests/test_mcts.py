@@ -0,0 +1,105 @@
+"""Tests for the MCTS engine and the compact board."""
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Species
+from compact_board import CompactBoard, neighbor_table
+from mcts import MCTSSearch, find_best_move
+
+
+def make_state():
+    """Small board with one group per side and a human group."""
+    state = GameState(10, 10)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    state.board[5][5].vampires = 10
+    state.board[8][8].werewolves = 8
+    state.board[4][4].humans = 3
+    return state
+
+
+def test_compact_board_roundtrip():
+    """Loading a state into a compact board and back preserves every cell."""
+    print("Testing CompactBoard round trip...")
+    state = make_state()
+    board = CompactBoard.from_state(state)
+
+    assert board.total(Species.VAMPIRE) == 10
+    assert board.groups(Species.WEREWOLF) == [board.index(8, 8)]
+    assert board.coords(board.index(4, 4)) == (4, 4)
+
+    target = GameState(10, 10)
+    board.store_into(target)
+    for i in range(10):
+        for j in range(10):
+            a, b = state.board[i][j], target.board[i][j]
+            assert (a.humans, a.vampires, a.werewolves) == (b.humans, b.vampires, b.werewolves)
+    print("✓ CompactBoard test passed\n")
+
+
+def test_neighbor_table():
+    """Corner cells have 3 neighbours, interior cells have 8."""
+    table = neighbor_table(5, 6)
+    assert len(table[0]) == 3
+    assert len(table[2 * 6 + 3]) == 8
+    assert neighbor_table(5, 6) is table  # Cached per board size
+
+
+def test_rollout_does_not_touch_state():
+    """Rollouts run on the compact board only."""
+    print("Testing MCTS rollout...")
+    state = make_state()
+    searcher = MCTSSearch(seed=1)
+    board = CompactBoard.from_state(state)
+    reward = searcher.rollout(board, Species.VAMPIRE, Species.WEREWOLF, Species.VAMPIRE)
+
+    assert 0.0 <= reward <= 1.0
+    assert state.board[5][5].vampires == 10, "Rollout must not modify the GameState"
+    print(f"  Rollout reward: {reward:.3f}")
+    print("✓ Rollout test passed\n")
+
+
+def test_mcts_search():
+    """MCTS returns a legal move and reports its statistics."""
+    print("Testing MCTS search...")
+    state = make_state()
+    searcher = MCTSSearch(max_depth=4, time_limit=0.3, seed=0)
+    best_moves = searcher.search(state)
+
+    assert len(best_moves) == 1
+    move = best_moves[0]
+    assert (move.x_from, move.y_from) == (5, 5)
+    assert searcher.stats["playouts"] > 0
+    assert searcher.stats["tree_size"] > 1
+    print(f"  Best move: {best_moves}, stats: {searcher.stats}")
+
+    # A search that returns early does not keep the previous search's stats
+    state.our_species = None
+    assert searcher.search(state) == []
+    assert searcher.stats == {}
+    print("✓ MCTS test passed\n")
+
+
+def test_mcts_takes_free_conversion():
+    """MCTS converts a contested human group before the opponent can."""
+    state = GameState(6, 6)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    state.board[2][2].vampires = 6
+    state.board[2][3].humans = 4
+    state.board[2][4].werewolves = 5
+
+    best_moves = MCTSSearch(max_depth=3, time_limit=0.3, seed=0).search(state)
+    assert any(m.x_to == 2 and m.y_to == 3 for m in best_moves)
+
+
+if __name__ == "__main__":
+    test_compact_board_roundtrip()
+    test_neighbor_table()
+    test_rollout_does_not_touch_state()
+    test_mcts_search()
+    test_mcts_takes_free_conversion()
+    print("All MCTS tests passed! ✓")
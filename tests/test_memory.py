@@ -0,0 +1,98 @@
+"""Tests for pooled (allocation-light) search and GC control."""
+import gc
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Species, Move
+from move_generator import apply_move_to_state
+from alphabeta import AlphaBetaSearch
+from memory import StatePool, GCMonitor, gc_paused
+from ai_player import AIPlayer
+
+
+def make_state():
+    """Board with both species and two human groups."""
+    state = GameState(8, 8)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    state.board[1][1].vampires = 9
+    state.board[6][6].werewolves = 9
+    state.board[3][3].humans = 4
+    state.board[5][2].humans = 2
+    return state
+
+
+def test_apply_into_buffer():
+    """Applying into a pooled buffer gives the same result as cloning."""
+    state = make_state()
+    pool = StatePool(8, 8, 2)
+    moves = [Move(1, 1, 2, 2, 5)]
+
+    cloned = apply_move_to_state(state, moves)
+    pooled = apply_move_to_state(state, moves, out=pool.state(1))
+    assert pooled is pool.state(1)
+    for i in range(8):
+        for j in range(8):
+            a, b = cloned.board[i][j], pooled.board[i][j]
+            assert (a.humans, a.vampires, a.werewolves) == (b.humans, b.vampires, b.werewolves)
+    assert pooled.our_species == Species.VAMPIRE
+    assert state.board[1][1].vampires == 9
+
+
+def test_pooled_search_matches_regular():
+    """Pooled search finds the same move as the regular search at fixed depth."""
+    print("Testing pooled search...")
+    regular = AlphaBetaSearch(max_depth=3, time_limit=30.0)
+    pooled = AlphaBetaSearch(max_depth=3, time_limit=30.0, pooled=True)
+    expected = regular.search(make_state())
+    found = pooled.search(make_state())
+
+    assert found == expected
+    assert pooled.stats["nodes"] == regular.stats["nodes"]
+    assert "gc_tracked_per_node" in pooled.stats
+    assert gc.isenabled(), "Automatic GC must be restored after search"
+    print(f"  Regular: {regular.stats['alloc_blocks_per_node']:.2f} blocks/node, "
+          f"pooled: {pooled.stats['alloc_blocks_per_node']:.2f} blocks/node")
+    print("✓ Pooled search test passed\n")
+
+
+def test_gc_monitor_and_pause():
+    """The monitor sees explicit collections and gc_paused restores state."""
+    monitor = GCMonitor()
+    monitor.install()
+    try:
+        gc.collect()
+        assert monitor.collections >= 1
+        assert monitor.pause_time > 0.0
+        monitor.reset()
+        assert monitor.snapshot()["gc_collections"] == 0
+    finally:
+        monitor.uninstall()
+
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+
+def test_player_gc_callback_only_when_requested():
+    """Players add a GC callback only in pooled mode or with GC reporting, and close() removes it."""
+    callbacks = len(gc.callbacks)
+    plain = AIPlayer(max_depth=1, preprocess_budget=0)
+    assert plain.gc_monitor is None and len(gc.callbacks) == callbacks
+    plain.close()
+    for options in ({"gc_report": True}, {"pooled": True}):
+        player = AIPlayer(max_depth=1, preprocess_budget=0, **options)
+        assert len(gc.callbacks) == callbacks + 1
+        player.close()
+        assert len(gc.callbacks) == callbacks
+
+
+if __name__ == "__main__":
+    test_apply_into_buffer()
+    test_pooled_search_matches_regular()
+    test_gc_monitor_and_pause()
+    test_player_gc_callback_only_when_requested()
+    print("All memory tests passed! ✓")
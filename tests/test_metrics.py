@@ -0,0 +1,93 @@
+"""Tests for the Prometheus metrics endpoint."""
+import sys
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState
+from ai_player import AIPlayer
+from metrics import PlayerMetrics, MetricsServer
+
+
+def parse(text):
+    """Samples of a Prometheus text page, keyed by name{labels}."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    return samples
+
+
+def test_render():
+    """Turn stats become gauges, counters and a cumulative latency histogram."""
+    metrics = PlayerMetrics(buckets=(0.1, 1.0))
+    metrics.observe_turn({"depth": 3, "nodes": 300, "time": 0.05, "nodes_per_sec": 6000.0}, 0.05)
+    metrics.observe_turn({"depth": 5, "nodes": 900, "time": 0.95, "nodes_per_sec": 947.0}, 1.5)
+    metrics.observe_turn({"tree_depth": 4, "playouts": 50, "time": 0.5, "playouts_per_sec": 100.0}, 0.5)
+    metrics.observe_turn({"depth": 2, "nodes": 10, "time": 0.02, "nodes_per_sec": 500.0,
+                          "move_cache": {"reused": 5, "shared": 1, "generated": 2, "reuse_ratio": 0.75},
+                          "endgame": {"positions": 3, "memo_hits": 1}, "planner": {"cached": True}}, 0.02)
+    metrics.count_fallback()
+    metrics.count_exception()
+    metrics.add_cache("table", lambda: (3, 1))
+
+    samples = parse(metrics.render())
+    assert samples["vvw_turns_total"] == 4
+    assert samples["vvw_search_depth_last"] == 2
+    assert samples["vvw_search_depth_avg"] == 3.5
+    assert samples["vvw_nodes_per_second_last"] == 500.0
+    assert samples["vvw_nodes_per_second_avg"] == 1260 / 1.52
+    assert samples['vvw_move_latency_seconds_bucket{le="0.1"}'] == 2
+    assert samples['vvw_move_latency_seconds_bucket{le="1.0"}'] == 3
+    assert samples['vvw_move_latency_seconds_bucket{le="+Inf"}'] == 4
+    assert samples["vvw_move_latency_seconds_count"] == 4
+    assert samples["vvw_move_latency_seconds_sum"] == 2.07
+    assert samples["vvw_fallback_moves_total"] == 1
+    assert samples["vvw_exceptions_total"] == 1
+    assert samples['vvw_cache_hit_ratio{cache="table"}'] == 0.75
+    assert samples['vvw_cache_hit_ratio{cache="move_cache"}'] == 0.75
+    assert samples['vvw_cache_hits_total{cache="endgame_memo"}'] == 1
+    assert samples['vvw_cache_misses_total{cache="endgame_memo"}'] == 3
+    assert samples['vvw_cache_hit_ratio{cache="planner"}'] == 1.0
+
+
+def test_player_serves_metrics():
+    """A player started with a metrics port serves its turns over HTTP."""
+    player = AIPlayer(max_depth=1, time_limit=1, metrics_port=0)
+    try:
+        player.game_state = GameState()
+        player.game_state.initialize_from_messages((5, 10), [], [4, 1],
+                                                   [(2, 2, 4, 0, 0), (4, 1, 0, 0, 4), (4, 3, 0, 4, 0)])
+        player.compute_move()
+        url = f"http://127.0.0.1:{player.metrics_server.port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain")
+            samples = parse(response.read().decode())
+        assert samples["vvw_turns_total"] == 1
+        assert samples["vvw_search_depth_last"] == 1
+        assert 'vvw_cache_hit_ratio{cache="move_cache"}' in samples
+        try:
+            urllib.request.urlopen(f"{url}/other", timeout=5)
+            assert False, "expected 404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        player.close()
+    assert player.metrics_server is None
+
+
+def test_server_stop_releases_port():
+    server = MetricsServer(PlayerMetrics(), port=0).start()
+    server.stop()
+    MetricsServer(PlayerMetrics(), port=server.port).stop()
+
+
+if __name__ == "__main__":
+    test_render()
+    test_player_serves_metrics()
+    test_server_stop_releases_port()
+    print("All metrics tests passed! ✓")
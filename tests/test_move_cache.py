@@ -0,0 +1,96 @@
+"""Tests for the incremental per-cell move cache."""
+import random
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from compact_board import CompactBoard
+from game_state import GameState, Species
+from move_generator import (MOVE_CACHE_STATS, generate_all_moves, apply_move_to_state, apply_moves_in_place,
+                            clear_move_cache)
+from synthetic import generate_state
+
+
+def moves_of(combos):
+    return sorted((m.x_from, m.y_from, m.x_to, m.y_to, m.count) for combo in combos for m in combo)
+
+
+def test_cached_moves_match_along_random_lines():
+    """Cached generation equals a fresh one at every node of random move sequences."""
+    clear_move_cache()
+    for seed in range(4):
+        rng = random.Random(seed)
+        state = generate_state(10, 10, playout=6, seed=seed, groups=3, army=18, human_density=0.15)
+        for ply in range(12):
+            for_opponent = ply % 2 == 1
+            cached = generate_all_moves(state, for_opponent=for_opponent)
+            assert moves_of(cached) == moves_of(generate_all_moves(state, for_opponent=for_opponent, cache=False))
+            if cached == [[]]:
+                break
+            state = apply_move_to_state(state, rng.choice(cached), for_opponent=for_opponent)
+
+
+def test_dirty_cells_and_reuse():
+    """Only the cells around a move are regenerated; the parent keeps its table."""
+    clear_move_cache()
+    state = GameState(6, 6)
+    state.our_species, state.opponent_species = Species.VAMPIRE, Species.WEREWOLF
+    state.board[0][0].vampires = 4
+    state.board[5][5].vampires = 3
+    state.board[3][0].werewolves = 2
+    generate_all_moves(state)
+    table, dirty = state._moves_base[Species.VAMPIRE]
+    assert set(table) == {0, 35} and not dirty
+
+    moves = [move for combo in generate_all_moves(state, for_opponent=True) for move in combo
+             if move.x_to == 2 and move.y_to == 0 and move.count == 2]
+    child = apply_move_to_state(state, moves, for_opponent=True)
+    _, dirty = child._moves_base[Species.VAMPIRE]
+    # Source (3,0), target (2,0) and their neighbours; (0,0) is not next to either
+    assert {1 * 6 + 0, 2 * 6 + 0, 3 * 6 + 0, 4 * 6 + 1} <= dirty and 0 not in dirty and 35 not in dirty
+    assert not state._moves_base[Species.VAMPIRE][1]
+
+    before = dict(MOVE_CACHE_STATS)
+    generate_all_moves(child)
+    assert MOVE_CACHE_STATS["reused"] - before["reused"] == 2
+    assert MOVE_CACHE_STATS["generated"] == before["generated"]
+
+
+def test_direct_edits_invalidate():
+    """States edited outside apply_moves_in_place drop their tables."""
+    state = generate_state(8, 8, playout=4, seed=3, groups=2, human_density=0.2)
+    generate_all_moves(state)
+    x, y, count = state.get_our_groups()[0]
+    state.board[x][y].set_count(state.our_species, count + 5)
+    state.invalidate_moves()
+    assert moves_of(generate_all_moves(state)) == moves_of(generate_all_moves(state, cache=False))
+
+    generate_all_moves(state)
+    edited = state.clone()
+    apply_moves_in_place(edited, generate_all_moves(state)[0])
+    CompactBoard.from_state(edited).store_into(state)
+    assert state._moves_base == {}
+    assert moves_of(generate_all_moves(state)) == moves_of(generate_all_moves(state, cache=False))
+
+
+def test_search_same_with_and_without_cache():
+    state = generate_state(8, 8, playout=6, seed=5, groups=2, army=16, human_density=0.1)
+    results = []
+    for move_cache in (False, True):
+        searcher = AlphaBetaSearch(max_depth=3, time_limit=60.0, move_cache=move_cache)
+        best = searcher.search(state.clone())
+        results.append((searcher.stats["nodes"], [(m.x_from, m.y_from, m.x_to, m.y_to, m.count) for m in best]))
+    assert results[0] == results[1]
+    counts = searcher.stats["move_cache"]
+    assert counts["reused"] + counts["shared"] > 0 and 0.0 < counts["reuse_ratio"] <= 1.0
+
+
+if __name__ == "__main__":
+    test_cached_moves_match_along_random_lines()
+    test_dirty_cells_and_reuse()
+    test_direct_edits_invalidate()
+    test_search_same_with_and_without_cache()
+    print("All move cache tests passed! ✓")
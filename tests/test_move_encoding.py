@@ -0,0 +1,88 @@
+"""Tests for the slotted Move class and packed-integer move encoding."""
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import (GameState, Species, Move, pack_moves, unpack_moves,
+                        packed_move_indices, packed_move_to_tuple)
+from move_generator import generate_all_moves, generate_packed_moves
+
+
+def test_move_is_slotted():
+    """Moves carry no instance dict."""
+    move = Move(1, 2, 2, 3, 4)
+    assert not hasattr(move, "__dict__")
+    assert move == Move(1, 2, 2, 3, 4)
+    assert hash(move) == hash(Move(1, 2, 2, 3, 4))
+    assert move != Move(1, 2, 2, 3, 5)
+    assert move != (1, 2, 2, 3, 4)
+
+
+def test_pack_roundtrip_every_direction():
+    """Packing and unpacking preserves every direction, including board edges."""
+    cols = 29
+    for dx, dy in GameState.DIRECTIONS:
+        move = Move(7, 14, 7 + dx, 14 + dy, 200)
+        code = move.pack(cols)
+        assert 0 <= code < 2 ** 32
+        assert Move.from_packed(code, cols) == move
+        assert packed_move_to_tuple(code, cols) == move.to_tuple()
+        assert packed_move_indices(code, cols) == (7 * cols + 14, (7 + dx) * cols + 14 + dy, 200)
+
+
+def test_largest_protocol_board_fits_array():
+    """A move from the last cell of a 255x255 board still fits array('I')."""
+    move = Move(254, 254, 253, 253, 255)
+    codes = pack_moves([move], 255)
+    assert codes.typecode == 'I'
+    assert unpack_moves(codes, 255) == [move]
+
+
+def test_pack_rejects_large_counts():
+    """Counts above the 8-bit field raise instead of wrapping."""
+    with pytest.raises(ValueError):
+        Move(1, 1, 1, 2, 300).pack(10)
+    state = GameState(4, 4)
+    state.our_species = Species.VAMPIRE
+    state.board[1][1].vampires = 300
+    with pytest.raises(ValueError):
+        generate_packed_moves(state)
+
+
+def test_to_tuple_protocol_format():
+    """to_tuple keeps the server's (col, row, count, col, row) order."""
+    code = Move(3, 5, 4, 6, 9).pack(10)
+    assert packed_move_to_tuple(code, 10) == (5, 3, 9, 6, 4)
+
+
+def test_packed_generator_matches_move_generator():
+    """generate_packed_moves produces exactly the moves of generate_all_moves."""
+    state = GameState(8, 8)
+    state.our_species = Species.WEREWOLF
+    state.opponent_species = Species.VAMPIRE
+    state.board[3][1].werewolves = 10
+    state.board[0][0].werewolves = 3
+    state.board[2][2].humans = 5
+    state.board[7][7].vampires = 4
+
+    expected = {move for combo in generate_all_moves(state) for move in combo}
+    buffer = array('I')
+    packed = generate_packed_moves(state, out=buffer)
+    assert packed is buffer
+    assert set(unpack_moves(packed, state.cols)) == expected
+    assert len(packed) == len(expected)
+
+
+if __name__ == "__main__":
+    test_move_is_slotted()
+    test_pack_roundtrip_every_direction()
+    test_largest_protocol_board_fits_array()
+    test_pack_rejects_large_counts()
+    test_to_tuple_protocol_format()
+    test_packed_generator_matches_move_generator()
+    print("All move encoding tests passed! ✓")
@@ -0,0 +1,123 @@
+"""Tests for dominated and duplicate move elimination."""
+import sys
+from itertools import combinations
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from game_state import GameState, Move, Species
+from move_generator import generate_all_moves, apply_move_to_state, prune_moves, _outcome_key, PRUNE_RULES
+from synthetic import generate_state
+
+
+def make_state(cells):
+    """6x6 state, vampires to move: cells maps (x, y) to (humans, vampires, werewolves)."""
+    state = GameState(6, 6)
+    state.our_species, state.opponent_species = Species.VAMPIRE, Species.WEREWOLF
+    for (x, y), (humans, vampires, werewolves) in cells.items():
+        cell = state.board[x][y]
+        cell.humans, cell.vampires, cell.werewolves = humans, vampires, werewolves
+    return state
+
+
+def test_sure_loss_attacks_removed():
+    """Attacks on an enemy group at least 1.5x the attackers are dropped."""
+    state = make_state({(2, 2): (0, 8, 0), (2, 3): (0, 0, 6), (0, 0): (1, 0, 0)})
+    moves = generate_all_moves(state)
+    counts = {}
+    kept = prune_moves(state, moves, counts=counts)
+    attacks = {m.count for combo in kept for m in combo if (m.x_to, m.y_to) == (2, 3)}
+    # 8 and 6 vs 6 can win; 4, 2 and 1 die for sure (6 >= 1.5 * 4)
+    assert attacks == {8, 6}
+    assert counts["sure_loss"] == 3
+
+    # Same rule for the opponent's moves: only all 6 werewolves may attack 8
+    kept = prune_moves(state, generate_all_moves(state, for_opponent=True), for_opponent=True)
+    assert {m.count for combo in kept for m in combo if (m.x_to, m.y_to) == (2, 2)} == {6}
+
+
+def test_pointless_splits_removed():
+    """With the opt-in rule, splits to empty cells too small to convert or kill anything are dropped."""
+    state = make_state({(2, 2): (0, 8, 0), (5, 5): (3, 0, 0), (0, 5): (0, 0, 4), (1, 1): (0, 0, 0)})
+    moves = generate_all_moves(state)
+    assert prune_moves(state, moves) == moves
+    counts = {}
+    kept = prune_moves(state, moves, counts=counts, rules=PRUNE_RULES)
+    # Smallest useful fragment: 3 (converts the humans); 1 and 2 are pointless
+    amounts = {m.count for combo in kept for m in combo}
+    assert amounts == {8, 6, 4}
+    assert counts["pointless_split"] == 8 * 2
+
+    # Merging into a friendly group is never a pointless split
+    state.board[2][3].vampires = 2
+    kept = prune_moves(state, generate_all_moves(state), rules=PRUNE_RULES)
+    assert {m.count for combo in kept for m in combo if (m.x_to, m.y_to) == (2, 3)} == {8, 6, 4, 2, 1}
+
+
+def test_duplicate_positions_removed():
+    """Combinations reaching the same position as a kept one are dropped."""
+    state = make_state({(2, 2): (0, 8, 0), (4, 4): (0, 3, 0), (0, 5): (2, 0, 4)})
+    a, b = Move(2, 2, 2, 1, 8), Move(4, 4, 5, 4, 3)
+    counts = {}
+    kept = prune_moves(state, [[a, b], [b, a], [a], [a]], counts=counts)
+    assert kept == [[a, b], [a]]
+    assert counts == {"duplicate": 2}
+
+
+def test_outcome_keys_match_positions():
+    """Equal outcome keys exactly when the applied positions are equal."""
+    state = generate_state(8, 8, playout=8, seed=2, groups=3, army=18, human_density=0.15)
+    singles = generate_all_moves(state)
+    pairs = [[a[0], b[0]] for a, b in combinations(singles[:30], 2)
+             if (a[0].x_from, a[0].y_from) != (b[0].x_from, b[0].y_from)]
+    combos = singles + pairs
+    positions = [tuple((c.humans, c.vampires, c.werewolves) for row in apply_move_to_state(state, combo).board
+                       for c in row) for combo in combos]
+    keys = [_outcome_key(state, combo, state.our_species, state.opponent_species) for combo in combos]
+    for i in range(len(combos)):
+        for j in range(i + 1, len(combos)):
+            assert (keys[i] == keys[j]) == (positions[i] == positions[j])
+
+
+def test_nothing_kept_returns_moves():
+    state = make_state({(0, 0): (0, 2, 0), (0, 1): (0, 0, 5), (1, 0): (0, 0, 5), (1, 1): (0, 0, 5)})
+    moves = generate_all_moves(state)
+    assert all(m.count < 3 for combo in moves for m in combo)
+    counts = {}
+    assert prune_moves(state, moves, counts=counts) is moves
+    assert counts == {}
+
+
+def test_search_reports_pruning():
+    state = generate_state(8, 8, playout=6, seed=5, groups=2, army=16, human_density=0.1)
+    searcher = AlphaBetaSearch(max_depth=3, time_limit=60.0)
+    searcher.search(state)
+    pruning = searcher.stats["move_pruning"]
+    removed = pruning["sure_loss"] + pruning["pointless_split"] + pruning["duplicate"]
+    assert removed == pruning["generated"] - pruning["searched"] > 0
+    assert 0.0 < pruning["branching_reduction"] < 1.0
+    assert pruning["pointless_split"] == 0
+    # Root removals are not mixed with the leaves' remaining depth 0
+    assert 0 not in searcher.stats["pruning"]
+    assert sum(searcher.stats["pruning"]["root"].values()) > 0
+    
+    splits = AlphaBetaSearch(max_depth=3, time_limit=60.0, prune_splits=True)
+    splits.search(state)
+    assert splits.stats["move_pruning"]["pointless_split"] > 0
+
+    plain = AlphaBetaSearch(max_depth=3, time_limit=60.0, prune=False)
+    plain.search(state)
+    assert "move_pruning" not in plain.stats
+    assert plain.stats["nodes"] > searcher.stats["nodes"]
+
+
+if __name__ == "__main__":
+    test_sure_loss_attacks_removed()
+    test_pointless_splits_removed()
+    test_duplicate_positions_removed()
+    test_outcome_keys_match_positions()
+    test_nothing_kept_returns_moves()
+    test_search_reports_pruning()
+    print("All move pruning tests passed! ✓")
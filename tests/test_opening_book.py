@@ -0,0 +1,81 @@
+"""Tests for the opening book."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import Move
+from ai_player import AIPlayer
+from maps import load_map
+from referee import play_game
+from opening_book import (DEFAULT_BOOK, OpeningBook, opening_state, position_key, swap_sides,
+                          build_book)
+
+
+def test_key_depends_on_board_and_side():
+    state = opening_state(load_map("thetrap.xml"))
+    assert position_key(state) == position_key(state.clone())
+    assert position_key(swap_sides(state)) != position_key(state)
+    moved = state.clone()
+    moved.board[2][2].humans += 1
+    assert position_key(moved) != position_key(state)
+
+
+def test_save_load_lookup():
+    """Entries survive the file format; illegal stored moves are rejected."""
+    state = opening_state(load_map("thetrap.xml"))
+    x, y, _ = state.get_our_groups()[0]
+    book = OpeningBook()
+    book.add(state, 7, [Move(x, y, x, y + 1, 2), Move(x, y, x + 1, y, 2)])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.vvb")
+        book.save(path)
+        loaded = OpeningBook.load(path)
+    moves, depth = loaded.lookup(state)
+    assert depth == 7 and moves == [Move(x, y, x, y + 1, 2), Move(x, y, x + 1, y, 2)]
+    # thetrap mirrors its rows: the vampires' opening is the same entry, moves mirrored back
+    mirrored, _ = loaded.lookup(swap_sides(state))
+    assert mirrored == [Move(4 - x, y, 4 - x, y + 1, 2), Move(4 - x, y, 3 - x, y, 2)]
+    moved = state.clone()
+    moved.board[2][2].humans += 1
+    assert loaded.lookup(moved) is None
+    assert (loaded.hits, loaded.misses) == (2, 1)
+
+    book.add(state, 7, [Move(x, y, x, y + 1, 200)])
+    assert book.lookup(state) is None
+    # Too large for the packed count field: not booked
+    large = OpeningBook()
+    large.add(state, 7, [Move(x, y, x, y + 1, 300)])
+    assert len(large) == 0
+
+
+def test_build_book_covers_self_play():
+    """A small book answers the first turns of both sides in self-play."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "book.vvb")
+        build_book([Path("thetrap.xml")], plies=2, replies=2,
+                   max_depth=2, time_limit=5, workers=1, progress=False).save(path)
+        assert len(OpeningBook.load(path)) == 3
+        players = [AIPlayer(max_depth=2, time_limit=0.05, book_path=path) for _ in range(2)]
+        play_game(players, load_map("thetrap.xml"), max_rounds=3, seed=1)
+        for player in players:
+            player.close()
+        assert [player.book.hits for player in players] == [1, 1]
+
+
+def test_shipped_book_loads():
+    book = OpeningBook.load(DEFAULT_BOOK)
+    assert len(book) > 0
+    state = opening_state(load_map("testmap2.xml"))
+    assert book.lookup(state) is not None
+
+
+if __name__ == "__main__":
+    test_key_depends_on_board_and_side()
+    test_save_load_lookup()
+    test_build_book_covers_self_play()
+    test_shipped_book_loads()
+    print("All opening book tests passed! ✓")
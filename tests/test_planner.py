@@ -0,0 +1,132 @@
+"""Tests for the coarse planner and the map generator it is benchmarked on."""
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Move, Species
+from alphabeta import AlphaBetaSearch
+from maps import generate_map, parse_map
+from move_generator import generate_all_moves
+from opening_book import opening_state
+from planner import Planner, MacroPlan, MacroPlans, coarse_summary, plan_side, region_size
+
+
+def test_generate_map():
+    """Seeded, symmetric, and readable back from its XML."""
+    game_map = generate_map(20, 20, humans=10, monsters=10, seed=4)
+    assert game_map.to_xml() == generate_map(20, 20, humans=10, monsters=10, seed=4).to_xml()
+    assert game_map.to_xml() != generate_map(20, 20, humans=10, monsters=10, seed=5).to_xml()
+    assert len(game_map.groups(Species.HUMAN)) == 10
+    assert all(5 <= count < 15 for _, _, count in game_map.groups(Species.HUMAN))
+    assert [g[2] for g in game_map.groups(Species.WEREWOLF)] == [g[2] for g in game_map.groups(Species.VAMPIRE)] == [10]
+    assert parse_map(game_map.to_xml().encode()).cells == game_map.cells
+
+    wide = generate_map(15, 40, humans=8, monsters=6, seed=1)
+    humans = {(x, y): count for x, y, count in wide.groups(Species.HUMAN)}
+    assert all(humans[(x, 14 - y)] == count for (x, y), count in humans.items())
+
+
+def board(rows, cols, ours, theirs, humans):
+    state = GameState(rows, cols)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    for x, y, count in ours:
+        state.board[x][y].vampires = count
+    for x, y, count in theirs:
+        state.board[x][y].werewolves = count
+    for x, y, count in humans:
+        state.board[x][y].humans = count
+    return state
+
+
+def test_plans():
+    """Groups are sent to humans they convert or enemies they kill; risky targets score less."""
+    clusters = {(0, 0): [(1, 1, 4)], (3, 3): [(10, 10, 20)]}
+    plans = plan_side([(5, 5, 8)], [(18, 18, 3)], clusters, 3)
+    assert [(plan.kind, plan.target) for plan in plans] == [("humans", (1, 1)), ("attack", (18, 18))]
+    assert plans[0].score == 4 / 5
+
+    risky = plan_side([(5, 5, 8)], [(2, 2, 12)], clusters, 3)
+    assert risky[0].target == (1, 1) and risky[0].score == 4 / 5 * 0.5
+    assert plan_side([(5, 5, 2)], [], clusters, 3) == []
+
+
+def test_restrict():
+    """Kept: steps towards a plan target from (near) its region, and all captures."""
+    state = board(20, 20, [(5, 5, 8), (15, 15, 6)], [(19, 0, 2)], [(1, 1, 4), (15, 16, 3)])
+    plans = MacroPlans(3, [MacroPlan((1, 1), (1, 1), "humans", 1.0)], [])
+    kept = plans.restrict(state, generate_all_moves(state))
+    sources = {(move.x_from, move.y_from) for combo in kept for move in combo}
+    assert sources == {(5, 5), (15, 15)}
+    assert all(move.x_to < 5 or move.y_to < 5 for combo in kept for move in combo if move.x_from == 5)
+    assert [Move(15, 15, 15, 16, 6)] in kept
+    assert all(move.x_to == 15 and move.y_to == 16 for combo in kept for move in combo if move.x_from == 15)
+
+    # No plan for the side: nothing is pruned
+    opponent_moves = generate_all_moves(state, for_opponent=True)
+    assert plans.restrict(state, opponent_moves, for_opponent=True) is opponent_moves
+
+
+def test_plans_cached_across_turns():
+    state = board(20, 20, [(5, 5, 8)], [(19, 19, 8)], [(1, 1, 4)])
+    planner = Planner()
+    first = planner.plans(state)
+    assert planner.misses == 1 and not planner.last_cached
+    assert region_size(20, 20) == 3
+
+    # Moving inside its region keeps the coarse summary: plans reused
+    state.board[5][5].vampires, state.board[4][4].vampires = 0, 8
+    assert coarse_summary(state, 3) == coarse_summary(board(20, 20, [(5, 5, 8)], [(19, 19, 8)], [(1, 1, 4)]), 3)
+    assert planner.plans(state) is first and planner.hits == 1
+
+    # Crossing a region border replans
+    state.board[4][4].vampires, state.board[2][2].vampires = 0, 8
+    assert planner.plans(state) is not first and planner.misses == 2
+
+
+def test_search_on_large_map():
+    state = opening_state(generate_map(20, 20, humans=10, monsters=10, seed=2))
+    searcher = AlphaBetaSearch(max_depth=2, time_limit=10, planner=True)
+    moves = searcher.search(state)
+    assert moves and moves[0].count <= 10
+    assert searcher.stats["planner"]["moves_pruned"] > 0
+    assert searcher.stats["planner"]["ours"]
+
+    plain = AlphaBetaSearch(max_depth=2, time_limit=10)
+    plain.search(state)
+    assert "planner" not in plain.stats and plain.stats["nodes"] > searcher.stats["nodes"]
+
+    small = AlphaBetaSearch(max_depth=1, time_limit=10, planner=True)
+    small.search(board(5, 10, [(0, 0, 4)], [(4, 9, 4)], [(2, 2, 3)]))
+    assert "planner" not in small.stats
+
+
+def test_opponent_replies_not_restricted():
+    """Only our plies are restricted to the plans; the opponent's are searched in full."""
+    state = opening_state(generate_map(20, 20, humans=10, monsters=10, seed=2))
+    sides = []
+    restrict = MacroPlans.restrict
+    
+    def recording(self, state, moves, for_opponent=False):
+        sides.append(for_opponent)
+        return restrict(self, state, moves, for_opponent)
+    
+    MacroPlans.restrict = recording
+    try:
+        searcher = AlphaBetaSearch(max_depth=3, time_limit=10, planner=True)
+        searcher.search(state)
+    finally:
+        MacroPlans.restrict = restrict
+    assert searcher.stats["planner"]["theirs"] and sides and not any(sides)
+
+
+if __name__ == "__main__":
+    test_generate_map()
+    test_plans()
+    test_restrict()
+    test_plans_cached_across_turns()
+    test_search_on_large_map()
+    test_opponent_replies_not_restricted()
+    print("All planner tests passed! ✓")
@@ -0,0 +1,101 @@
+"""Tests for MAP-time preprocessing and its disk cache."""
+import sys
+import tempfile
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from ai_player import AIPlayer
+from game_state import Move
+from maps import load_map
+from referee import Referee
+from preprocess import analyze_map, load_or_analyze, map_key, STAGES
+
+
+def setup_player(map_name, **kwargs):
+    player = AIPlayer(**kwargs)
+    for message in Referee(load_map(map_name)).setup_messages(0):
+        player.update_from_message(message)
+    return player
+
+
+def initial_state(map_name):
+    player = setup_player(map_name, preprocess_budget=0)
+    player.close()
+    return player.game_state
+
+
+def test_tables():
+    """Distances match brute force; clusters merge nearby humans; flow approaches them."""
+    state = initial_state("thetrap.xml")
+    analysis = analyze_map(state, budget=10)
+    assert analysis.complete
+    for index, (hx, hy, _) in enumerate(analysis.humans):
+        for x in range(state.rows):
+            for y in range(state.cols):
+                assert analysis.distance(index, x, y) == max(abs(x - hx), abs(y - hy))
+
+    # thetrap: three human groups on the far column within 2 cells of each other
+    assert sorted(len(cluster["groups"]) for cluster in analysis.clusters) == [1, 3]
+    assert sum(cluster["total"] for cluster in analysis.clusters) == sum(h for _, _, h in analysis.humans)
+
+    for x in range(state.rows):
+        for y in range(state.cols):
+            step = analysis.next_step(x, y)
+            if step is None:
+                assert any((x, y) == (hx, hy) for hx, hy, _ in analysis.humans)
+                continue
+            assert max(abs(step[0] - x), abs(step[1] - y)) == 1
+            nearest = min(max(abs(x - hx), abs(y - hy)) for hx, hy, _ in analysis.humans)
+            assert min(max(abs(step[0] - hx), abs(step[1] - hy)) for hx, hy, _ in analysis.humans) <= nearest
+
+
+def test_budget_and_cache():
+    """An exhausted budget leaves stages empty and is not cached; complete results are."""
+    state = initial_state("testmap2.xml")
+    assert analyze_map(state, budget=0).completed == [STAGES[0]]
+    with tempfile.TemporaryDirectory() as tmp:
+        assert not load_or_analyze(state, budget=0, cache_dir=tmp).complete
+        assert list(Path(tmp).iterdir()) == []
+
+        built = load_or_analyze(state, budget=10, cache_dir=tmp)
+        assert built.complete and not built.from_cache
+        assert [path.name for path in Path(tmp).iterdir()] == [f"{map_key(state)}.pickle"]
+        cached = load_or_analyze(state, budget=0, cache_dir=tmp)
+        assert cached.from_cache and cached.complete
+        assert list(cached.flow) == list(built.flow)
+        assert cached.clusters == built.clusters
+
+        # Another map gets another entry
+        assert map_key(initial_state("thetrap.xml")) != map_key(state)
+
+
+def test_player_preprocesses_on_map():
+    with tempfile.TemporaryDirectory() as tmp:
+        player = setup_player("testmap2.xml", map_cache_dir=tmp)
+        player.close()
+        assert player.map_analysis is not None and player.map_analysis.complete
+        assert player.map_analysis.key == map_key(player.game_state)
+        assert len(list(Path(tmp).iterdir())) == 1
+    assert AIPlayer().map_cache_dir is None
+
+
+def test_fallback_follows_flow():
+    """The fallback move sends the largest group one step along the flow field."""
+    player = setup_player("thetrap.xml", preprocess_budget=10)
+    player.close()
+    x, y, count = max(player.game_state.get_our_groups(), key=lambda group: group[2])
+    step = player.map_analysis.next_step(x, y)
+    assert player.get_fallback_move() == [Move(x, y, step[0], step[1], count)]
+    
+    player.map_analysis = None
+    assert player.get_fallback_move()[0].count == max(1, count // 2)
+
+
+if __name__ == "__main__":
+    test_tables()
+    test_budget_and_cache()
+    test_player_preprocesses_on_map()
+    test_fallback_follows_flow()
+    print("All preprocessing tests passed! ✓")
@@ -0,0 +1,256 @@
+"""Tests for map loading and the headless referee."""
+import io
+import sys
+import time
+import threading
+import contextlib
+from argparse import Namespace
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import Species
+from maps import GameMap, load_map, parse_map, list_maps
+from referee import Referee, play_game, serve, PLAYER_SPECIES
+from ai_player import AIPlayer
+import ai_player
+from client import ClientSocket, EndException, ByeException
+
+
+def make_map(cells):
+    """Small map from (species, x, y, count) entries."""
+    game_map = GameMap(5, 6, "test")
+    for species, x, y, count in cells:
+        game_map.add(species, x, y, count)
+    return game_map
+
+
+def test_load_maps():
+    """The maps in maps/ load and survive an XML round trip."""
+    assert {path.name for path in list_maps()} >= {"thetrap.xml", "testmap2.xml"}
+    trap = load_map("thetrap.xml")
+    assert (trap.rows, trap.cols) == (5, 10)
+    assert trap.groups(Species.WEREWOLF) == [(4, 1, 4)]
+    assert trap.groups(Species.VAMPIRE) == [(4, 3, 4)]
+    assert len(trap.groups(Species.HUMAN)) == 4
+    assert parse_map(trap.to_xml().encode()).cells == trap.cells
+
+
+def test_setup_messages():
+    """Setup messages initialise an AIPlayer with the right species."""
+    referee = Referee(load_map("thetrap.xml"))
+    for player_id in range(2):
+        player = AIPlayer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            for message in referee.setup_messages(player_id):
+                player.update_from_message(message)
+        assert player.game_state.our_species == PLAYER_SPECIES[player_id]
+        assert player.game_state.get_total_count(Species.HUMAN) == 9
+
+
+def test_conversion_merge_and_kill():
+    """Sure conversions, merges and 1.5x kills are deterministic."""
+    referee = Referee(make_map([(Species.WEREWOLF, 1, 1, 6), (Species.WEREWOLF, 3, 1, 2),
+                                (Species.HUMAN, 2, 2, 5), (Species.VAMPIRE, 4, 4, 2)]),
+                      battle_fn=lambda *args: (_ for _ in ()).throw(AssertionError("no random battle")))
+    # Both groups land on the humans: 6 + 2 > 5 converts them all
+    assert referee.apply(0, [(1, 1, 6, 2, 2), (3, 1, 2, 2, 2)])
+    assert referee.cells == {(2, 2): [0, 0, 13], (4, 4): [0, 2, 0]}
+    referee.apply(1, [])
+    # 3 >= 1.5 * 2 kills the vampires
+    assert referee.apply(0, [(2, 2, 10, 3, 3)])
+    assert referee.apply(1, [])
+    assert referee.apply(0, [(3, 3, 3, 4, 4)])
+    assert referee.total(Species.VAMPIRE) == 0
+    assert referee.is_over() and referee.winner() == 0
+
+
+def test_random_battle_uses_battle_fn():
+    """Uncertain fights go through battle_fn."""
+    calls = []
+
+    def battle_fn(attackers, defenders, is_human):
+        calls.append((attackers, defenders, is_human))
+        return 0, 1
+
+    referee = Referee(make_map([(Species.WEREWOLF, 0, 0, 3), (Species.HUMAN, 1, 1, 4),
+                                (Species.VAMPIRE, 5, 4, 1)]), battle_fn=battle_fn)
+    assert referee.apply(0, [(0, 0, 3, 1, 1)])
+    assert calls == [(3, 4, True)]
+    assert referee.cells[(1, 1)] == [1, 0, 0]
+    assert referee.is_over() and referee.winner() == 1
+
+    # As many attackers as humans win only half the time (E1 == E2)
+    calls.clear()
+    referee = Referee(make_map([(Species.WEREWOLF, 0, 0, 4), (Species.HUMAN, 1, 1, 4),
+                                (Species.VAMPIRE, 5, 4, 1)]), battle_fn=battle_fn)
+    assert referee.apply(0, [(0, 0, 4, 1, 1)])
+    assert calls == [(4, 4, True)]
+
+
+def test_source_and_target_rule():
+    """Units moving into a cell vacated the same turn are destroyed."""
+    referee = Referee(make_map([(Species.WEREWOLF, 1, 1, 4), (Species.WEREWOLF, 2, 1, 3),
+                                (Species.VAMPIRE, 5, 4, 1)]))
+    assert referee.apply(0, [(1, 1, 4, 1, 2), (2, 1, 3, 1, 1)])
+    assert referee.total(Species.WEREWOLF) == 4
+
+
+def test_illegal_moves_rejected():
+    """Illegal MOVs leave the board unchanged and are counted."""
+    referee = Referee(make_map([(Species.WEREWOLF, 1, 1, 4), (Species.VAMPIRE, 5, 4, 1)]))
+    before = {cell: list(counts) for cell, counts in referee.cells.items()}
+    assert not referee.apply(0, [(1, 1, 5, 1, 2)])   # too many
+    assert not referee.apply(1, [(5, 4, 1, 5, 2)])   # not a neighbour
+    assert not referee.apply(0, [(1, 1, 2, 1, 2), (1, 1, 3, 2, 2)])  # sum too large
+    assert not referee.apply(1, [(5, 4, 1, 6, 4)])   # off the grid
+    assert referee.cells == before
+    assert referee.illegal_moves == [2, 2]
+
+
+def test_update_lists_changed_cells():
+    """UPD carries changed cells, including vacated ones as zeros."""
+    referee = Referee(make_map([(Species.WEREWOLF, 1, 1, 4), (Species.VAMPIRE, 5, 4, 1)]))
+    referee.setup_messages(0)
+    referee.setup_messages(1)
+    assert referee.update_message(0) == ["upd", []]
+    referee.apply(0, [(1, 1, 4, 2, 2)])
+    assert referee.update_message(1) == ["upd", [(1, 1, 0, 0, 0), (2, 2, 0, 0, 4)]]
+    assert referee.update_message(1) == ["upd", []]
+
+
+def test_turn_limit():
+    """Passing players stop at the round limit and the larger army wins."""
+    referee = Referee(make_map([(Species.WEREWOLF, 1, 1, 4), (Species.VAMPIRE, 5, 4, 2)]), max_rounds=3)
+    while not referee.is_over():
+        referee.apply(referee.to_move, [])
+    assert referee.turn == 6
+    assert referee.result()["winner_species"] == "werewolf"
+
+
+def test_play_game_in_process():
+    """Two AIPlayers play a full game on thetrap.xml."""
+    players = [AIPlayer(name=f"AI{i}", max_depth=2, time_limit=0.05) for i in range(2)]
+    result = play_game(players, load_map("thetrap.xml"), max_rounds=10, seed=3)
+    assert result["illegal_moves"] == [0, 0]
+    assert 1 <= result["rounds"] <= 10
+    assert len(result["move_times"][0]) >= len(result["move_times"][1]) >= 1
+
+
+def test_tcp_mode():
+    """The referee speaks the server protocol to the blocking client."""
+    results = {}
+    listening = threading.Event()
+
+    def on_listen(port):
+        results["port"] = port
+        listening.set()
+
+    def referee_thread():
+        results["game"] = serve(load_map("testmap2.xml"), port=0, max_rounds=3, seed=1, on_listen=on_listen)
+
+    def client_thread():
+        args = Namespace(ip="localhost", port=results["port"], engine="alphabeta",
+                         depth=2, time_limit=0.05, pooled=False)
+        try:
+            ai_player.play_game(args)
+        except (EndException, ByeException):
+            pass
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = threading.Thread(target=referee_thread)
+        server.start()
+        assert listening.wait(5)
+        clients = []
+        for _ in range(2):
+            client = threading.Thread(target=client_thread)
+            client.start()
+            clients.append(client)
+            # The first client to connect plays the werewolves
+            time.sleep(0.1)
+        server.join(timeout=30)
+        for client in clients:
+            client.join(timeout=30)
+    assert results["game"]["illegal_moves"] == [0, 0]
+    assert results["game"]["rounds"] == 3
+
+
+def test_tcp_late_moves_are_discarded():
+    """A MOV sent after the timeout, whole or half, is not taken for the next turn; a silent client is dropped."""
+    results = {}
+    listening = threading.Event()
+
+    def on_listen(port):
+        results["port"] = port
+        listening.set()
+
+    def referee_thread():
+        results["game"] = serve(load_map("testmap2.xml"), port=0, max_rounds=3, move_timeout=0.2,
+                                on_listen=on_listen)
+
+    def slow_client():
+        client = ClientSocket("localhost", results["port"])
+        client.send_nme("Slow")
+        turn = 0
+        try:
+            while True:
+                if client.get_message()[0] != "upd":
+                    continue
+                turn += 1
+                if turn == 1:
+                    # Too late, and illegal if it were applied to the next turn
+                    time.sleep(0.3)
+                    client.send_mov(1, [(0, 0, 255, 1, 1)])
+                elif turn == 2:
+                    # Half a MOV in time, the rest too late
+                    client._socket.sendall(b"MO")
+                    time.sleep(0.3)
+                    client._socket.sendall(b"V" + bytes([1]) + bytes([0, 0, 255, 1, 1]))
+                else:
+                    client.send_mov(0, [])
+        except (EndException, ByeException):
+            pass
+
+    def silent_client():
+        client = ClientSocket("localhost", results["port"])
+        client.send_nme("Silent")
+        try:
+            while True:
+                client.get_message()
+        except (EndException, ByeException):
+            pass
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        server = threading.Thread(target=referee_thread)
+        server.start()
+        assert listening.wait(5)
+        clients = []
+        for target in (slow_client, silent_client):
+            client = threading.Thread(target=target)
+            client.start()
+            clients.append(client)
+            # The first client to connect plays the werewolves
+            time.sleep(0.1)
+        server.join(timeout=30)
+        for client in clients:
+            client.join(timeout=30)
+    game = results["game"]
+    assert game["illegal_moves"] == [0, 0]
+    assert game["rounds"] == 3
+    assert game["dropped"] == [1]
+
+
+if __name__ == "__main__":
+    test_load_maps()
+    test_setup_messages()
+    test_conversion_merge_and_kill()
+    test_random_battle_uses_battle_fn()
+    test_source_and_target_rule()
+    test_illegal_moves_rejected()
+    test_update_lists_changed_cells()
+    test_turn_limit()
+    test_play_game_in_process()
+    test_tcp_mode()
+    test_tcp_late_moves_are_discarded()
+    print("All referee tests passed! ✓")
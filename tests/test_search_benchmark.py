@@ -0,0 +1,55 @@
+"""Tests for GameState serialization and the search benchmark's regression gate."""
+import json
+import sys
+from pathlib import Path
+
+# Add ai and benchmarks directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+sys.path.insert(0, str(Path(__file__).parent.parent / "benchmarks"))
+
+from game_state import GameState
+from recorder import board_cells
+import bench_search
+
+
+def test_state_dict_roundtrip():
+    """Every corpus position survives to_dict/from_dict, including through JSON."""
+    with open(bench_search.CORPUS) as f:
+        corpus = json.load(f)
+    assert corpus
+    for entry in corpus:
+        state = GameState.from_dict(json.loads(json.dumps(entry["state"])))
+        assert state.our_species is not None
+        assert state.to_dict() == entry["state"]
+        copy = GameState.from_dict(state.to_dict())
+        assert board_cells(copy) == board_cells(state)
+        assert copy.home_position == state.home_position
+
+
+def test_effective_branching_factor():
+    """EBF compares the node counts of the last two iterations."""
+    assert bench_search.effective_branching_factor([10, 60, 460]) == 400 / 50
+    assert bench_search.effective_branching_factor([10, 60]) == 5.0
+
+
+def fake_results(nodes_per_sec):
+    return {f"p{i}": {"fixed_depth": {"nodes_per_sec": nps}, "fixed_time": {"nodes_per_sec": nps}}
+            for i, nps in enumerate(nodes_per_sec)}
+
+
+def test_regression_gate():
+    """Only an aggregate slowdown beyond the tolerance fails."""
+    baseline = {"summary": bench_search.summarize(fake_results([1000, 4000]))}
+    assert bench_search.compare(fake_results([900, 3700]), baseline, tolerance=20) == []
+    # One noisy position is absorbed by the geometric mean
+    assert bench_search.compare(fake_results([750, 4200]), baseline, tolerance=20) == []
+    failures = bench_search.compare(fake_results([700, 2800]), baseline, tolerance=20)
+    assert len(failures) == 2
+    assert "30.0%" in failures[0]
+
+
+if __name__ == "__main__":
+    test_state_dict_roundtrip()
+    test_effective_branching_factor()
+    test_regression_gate()
+    print("All search benchmark tests passed! ✓")
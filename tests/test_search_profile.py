@@ -0,0 +1,85 @@
+"""Tests for the per-phase search profiler."""
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState
+from alphabeta import AlphaBetaSearch
+from ai_player import AIPlayer
+from maps import load_map
+from referee import play_game
+from search_profile import PHASES
+
+
+def trap_state():
+    """Opening of thetrap.xml, as werewolves."""
+    state = GameState()
+    state.initialize_from_messages((5, 10), [], [4, 1],
+                                   [(2, 2, 4, 0, 0), (9, 0, 2, 0, 0), (9, 2, 1, 0, 0), (9, 4, 2, 0, 0),
+                                    (4, 1, 0, 0, 4), (4, 3, 0, 4, 0)])
+    return state
+
+
+def test_profile_matches_plain_search():
+    """Profiling changes neither the move nor the tree, and counts add up."""
+    plain = AlphaBetaSearch(max_depth=3, time_limit=100)
+    profiled = AlphaBetaSearch(max_depth=3, time_limit=100, profile=True)
+    assert plain.profiler is None
+    assert plain.search(trap_state()) == profiled.search(trap_state())
+    assert "profile" not in plain.stats
+    assert profiled.stats["nodes"] == plain.stats["nodes"]
+
+    record = json.loads(json.dumps(profiled.stats["profile"]))
+    assert set(record["phases"]) == set(PHASES)
+    plies = record["plies"]
+    # Every node below the root goes through alpha_beta
+    assert sum(entry["nodes"] for entry in plies.values()) == record["nodes"]
+    assert plies["0"]["nodes"] == 0
+    assert sum(entry["evals"] for entry in plies.values()) == record["phases"]["eval"]["calls"]
+    assert sum(entry["applies"] for entry in plies.values()) == record["phases"]["apply"]["calls"]
+    assert plies["0"]["movegen_calls"] == 1
+    assert any(entry["cutoffs"] for entry in plies.values())
+    assert [it["depth"] for it in record["iterations"]] == [1, 2, 3]
+    assert record["timeouts"] == 0
+    assert record["phases"]["movegen"]["time"] > 0
+
+
+def test_profile_counts_timeouts_and_resets():
+    """A search stopped by the clock records a timeout; counters restart each search."""
+    searcher = AlphaBetaSearch(max_depth=8, time_limit=0.05, profile=True)
+    searcher.search(trap_state())
+    assert searcher.stats["profile"]["timeouts"] == 1
+    first_nodes = searcher.stats["profile"]["nodes"]
+    searcher.time_limit = 100
+    searcher.max_depth = 1
+    searcher.search(trap_state())
+    record = searcher.stats["profile"]
+    assert record["timeouts"] == 0
+    assert sum(entry["nodes"] for entry in record["plies"].values()) == record["nodes"] < first_nodes
+
+
+def test_player_profile_log():
+    """AIPlayer appends one JSON record per computed turn."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "profile.jsonl")
+        profiled = AIPlayer(max_depth=2, time_limit=0.05, profile_path=path)
+        opponent = AIPlayer(max_depth=2, time_limit=0.05)
+        play_game([profiled, opponent], load_map("testmap2.xml"), max_rounds=6, seed=3)
+        profiled.close()
+        opponent.close()
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+    assert [record["turn"] for record in records] == list(range(1, profiled.turns_computed + 1))
+    assert all(record["move_time"] > 0 and "phases" in record for record in records)
+
+
+if __name__ == "__main__":
+    test_profile_matches_plain_search()
+    test_profile_counts_timeouts_and_resets()
+    test_player_profile_log()
+    print("All search profile tests passed! ✓")
@@ -0,0 +1,106 @@
+"""Tests for late move reductions and ProbCut pruning in AlphaBetaSearch."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState, Species, Move
+from move_generator import generate_all_moves, order_moves, is_quiet_move
+from alphabeta import AlphaBetaSearch
+
+
+def make_trap_state():
+    """The thetrap.xml opening, seen from the vampires."""
+    state = GameState(5, 10)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    for x, y, count in [(2, 2, 4), (9, 0, 2), (9, 2, 1), (9, 4, 2)]:
+        state.board[y][x].humans = count
+    state.board[1][4].werewolves = 4
+    state.board[3][4].vampires = 4
+    return state
+
+
+def test_ordering_puts_captures_first():
+    """Sure conversions are ordered before quiet moves."""
+    state = GameState(6, 6)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    state.board[2][2].vampires = 6
+    state.board[2][3].humans = 4
+
+    moves = order_moves(state, generate_all_moves(state), for_opponent=False)
+    assert moves[0] == [Move(2, 2, 2, 3, 6)]
+    assert not is_quiet_move(state, moves[0])
+    assert is_quiet_move(state, moves[-1])
+
+
+def test_lmr_counts_reductions():
+    """LMR reduces late quiet moves and records per-depth counters."""
+    print("Testing late move reductions...")
+    searcher = AlphaBetaSearch(max_depth=4, time_limit=5.0)
+    best_moves = searcher.search(make_trap_state())
+
+    assert best_moves
+    assert searcher.stats["depth"] == 4
+    reductions = sum(c.get("reductions", 0) for c in searcher.stats["pruning"].values())
+    assert reductions > 0
+    for counters in searcher.stats["pruning"].values():
+        assert counters.get("re_searches", 0) <= counters.get("reductions", 0)
+    print(f"  Pruning stats: {searcher.stats['pruning']}")
+    print("✓ LMR test passed\n")
+
+
+def test_lmr_saves_nodes_at_fixed_depth():
+    """At the same depth, reductions explore fewer nodes than the full search."""
+    full = AlphaBetaSearch(max_depth=4, time_limit=30.0, lmr=False)
+    reduced = AlphaBetaSearch(max_depth=4, time_limit=30.0, lmr=True)
+    full.search(make_trap_state())
+    reduced.search(make_trap_state())
+    assert reduced.stats["nodes"] < full.stats["nodes"]
+
+
+def test_probcut_option():
+    """ProbCut cuts clearly won nodes when the margin is small."""
+    state = GameState(6, 6)
+    state.our_species = Species.VAMPIRE
+    state.opponent_species = Species.WEREWOLF
+    state.board[1][1].vampires = 30
+    state.board[4][4].werewolves = 3
+    state.board[0][5].humans = 2
+
+    searcher = AlphaBetaSearch(max_depth=3, time_limit=5.0, probcut=True,
+                               probcut_min_depth=2, probcut_margin=10.0, probcut_reduction=1)
+    assert searcher.search(state)
+    tries = sum(c.get("probcut_tries", 0) for c in searcher.stats["pruning"].values())
+    cuts = sum(c.get("probcut_cuts", 0) for c in searcher.stats["pruning"].values())
+    assert 0 < cuts <= tries
+
+
+def test_reductions_never_go_below_zero():
+    """Reductions deeper than the remaining depth stop at the leaves; reductions that do not shorten are rejected."""
+    corpus = json.loads((Path(__file__).parent.parent / "benchmarks" / "positions.json").read_text())
+    entry = next(entry for entry in corpus if entry["name"] == "testmap2-s1-t16-vampire")
+    for options in ({"lmr_min_depth": 1, "lmr_full_moves": 1},
+                    {"lmr_min_depth": 2, "lmr_full_moves": 1, "lmr_reduction": 2},
+                    {"probcut": True, "probcut_min_depth": 1, "probcut_reduction": 2, "probcut_margin": 0}):
+        searcher = AlphaBetaSearch(max_depth=3, time_limit=60.0, **options)
+        assert searcher.search(GameState.from_dict(entry["state"]))
+        assert searcher.stats["depth"] == 3
+    with pytest.raises(ValueError):
+        AlphaBetaSearch(probcut_reduction=0)
+    with pytest.raises(ValueError):
+        AlphaBetaSearch(lmr_reduction=-1)
+
+
+if __name__ == "__main__":
+    test_ordering_puts_captures_first()
+    test_lmr_counts_reductions()
+    test_lmr_saves_nodes_at_fixed_depth()
+    test_probcut_option()
+    test_reductions_never_go_below_zero()
+    print("All pruning tests passed! ✓")
@@ -0,0 +1,108 @@
+"""Tests for the shared-memory search worker."""
+import sys
+import time
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import pytest
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from alphabeta import AlphaBetaSearch
+from ai_player import AIPlayer
+from game_state import GameState, MOVE_COUNT_MASK, Species
+from maps import load_map
+from move_generator import apply_move_to_state
+from opening_book import opening_state, swap_sides
+from referee import Referee
+from search_worker import SearchWorker
+
+
+def test_worker_matches_in_process_search():
+    """Same moves as an in-process search, with only changed cells sent after the first turn."""
+    state = opening_state(load_map("testmap2.xml"))
+    with SearchWorker(state.rows, state.cols, AlphaBetaSearch, max_depth=2, time_limit=30.0) as worker:
+        for ply in range(4):
+            moves = worker.search(state)
+            expected = AlphaBetaSearch(max_depth=2, time_limit=30.0).search(GameState.from_dict(state.to_dict()))
+            assert moves == expected
+            assert worker.stats["depth"] == 2 and worker.stats["nodes"] > 0
+            if ply == 0:
+                occupied = sum(1 for row in state.board for cell in row
+                               if cell.humans or cell.vampires or cell.werewolves)
+                assert worker.stats["changed_cells"] == occupied
+            else:
+                assert worker.stats["changed_cells"] <= 2
+            assert 0.0 <= worker.stats["dispatch_latency"] < 1.0
+            state = swap_sides(apply_move_to_state(state, moves))
+
+
+def test_worker_returns_unpackable_moves():
+    """Moves too large for Move.pack come back as full tuples."""
+    state = GameState(5, 5)
+    state.our_species, state.opponent_species = Species.VAMPIRE, Species.WEREWOLF
+    state.board[2][2].vampires = 400
+    state.board[2][3].werewolves = 200
+    with SearchWorker(5, 5, AlphaBetaSearch, max_depth=2, time_limit=30.0) as worker:
+        moves = worker.search(state)
+        assert "moves" not in worker.stats and "dispatch_latency" in worker.stats
+    assert moves == AlphaBetaSearch(max_depth=2, time_limit=30.0).search(state.clone())
+    assert max(move.count for move in moves) > MOVE_COUNT_MASK
+
+
+def test_ping_busy_and_close():
+    with SearchWorker(5, 5, AlphaBetaSearch, max_depth=1) as worker:
+        assert 0.0 < worker.ping() < 1.0
+        with pytest.raises(ValueError):
+            worker.submit(GameState(6, 6))
+
+    state = opening_state(load_map("thetrap.xml"))
+    with SearchWorker(state.rows, state.cols, AlphaBetaSearch, max_depth=1) as worker:
+        worker.submit(state)
+        with pytest.raises(RuntimeError):
+            worker.submit(state)
+        assert worker.result()
+        name = worker.segment.name
+    assert not worker.process.is_alive()
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_result_bounded_by_deadline():
+    """result() stops waiting at the turn deadline, however long the search may take."""
+    state = opening_state(load_map("testmap2.xml"))
+    with SearchWorker(state.rows, state.cols, AlphaBetaSearch, max_depth=8, time_limit=5.0) as worker:
+        start = time.perf_counter()
+        with pytest.raises(TimeoutError):
+            worker.search(state, deadline=start + 0.1)
+        assert time.perf_counter() - start < 1.0
+        name = worker.segment.name
+    with pytest.raises(FileNotFoundError):
+        shared_memory.SharedMemory(name=name)
+
+
+def test_player_with_worker():
+    """AIPlayer(worker=True) starts the worker at MAP and stops it on close()."""
+    referee = Referee(load_map("thetrap.xml"))
+    player = AIPlayer(max_depth=2, time_limit=5.0, preprocess_budget=0, worker=True)
+    for message in referee.setup_messages(0):
+        player.update_from_message(message)
+    assert player.worker is not None and player.worker.process.is_alive()
+    count, moves = player.compute_move()
+    assert count == len(moves) > 0
+    assert "dispatch_latency" in player.last_turn_stats
+    # The in-process engine did not search this turn
+    assert player.last_search is None
+    process = player.worker.process
+    player.close()
+    assert player.worker is None and not process.is_alive()
+
+
+if __name__ == "__main__":
+    test_worker_matches_in_process_search()
+    test_worker_returns_unpackable_moves()
+    test_ping_busy_and_close()
+    test_result_bounded_by_deadline()
+    test_player_with_worker()
+    print("All search worker tests passed! ✓")
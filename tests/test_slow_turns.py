@@ -0,0 +1,98 @@
+"""Tests for slow-turn capture and replay."""
+import io
+import os
+import pstats
+import sys
+import tempfile
+import time
+from argparse import Namespace
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import GameState
+from alphabeta import find_best_move
+from ai_player import AIPlayer, player_from_args
+from recorder import board_cells
+from slow_turns import SlowTurnCapture, THRESHOLD_FACTOR, load_capture, replay
+
+
+def trap_state():
+    """Opening of thetrap.xml, as werewolves."""
+    state = GameState()
+    state.initialize_from_messages((5, 10), [], [4, 1],
+                                   [(2, 2, 4, 0, 0), (9, 0, 2, 0, 0), (9, 2, 1, 0, 0), (9, 4, 2, 0, 0),
+                                    (4, 1, 0, 0, 4), (4, 3, 0, 4, 0)])
+    return state
+
+
+def test_only_slow_turns_are_kept():
+    """Fast turns leave nothing behind; slow ones keep the position and the stacks."""
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = SlowTurnCapture(tmp, threshold=0.05, interval=0.001)
+        state = trap_state()
+        assert capture.run(lambda s: [], state, {"turn": 1}) == []
+        assert capture.captured == [] and os.listdir(tmp) == []
+
+        def slow_search(s):
+            time.sleep(0.1)
+            return find_best_move(s, max_depth=1, time_limit=10)
+
+        moves = capture.run(slow_search, state, {"turn": 2, "max_depth": 2, "time_limit": 10})
+        assert moves
+        [path] = capture.captured
+        loaded, info = load_capture(path)
+        assert board_cells(loaded) == board_cells(state)
+        assert loaded.our_species == state.our_species
+        assert info["turn"] == 2 and info["elapsed"] >= 0.1
+        with open(os.path.join(path, "stacks.folded")) as f:
+            assert "slow_search" in f.read()
+
+        # The replay searches the captured position with the captured settings
+        replayed, _ = replay(path, out=io.StringIO())
+        assert replayed == find_best_move(state, max_depth=2, time_limit=10)
+
+
+def test_rotation_and_cprofile():
+    """Only the newest captures are kept; cProfile captures load with pstats."""
+    with tempfile.TemporaryDirectory() as tmp:
+        capture = SlowTurnCapture(tmp, threshold=0.0, keep=2, profiler="cprofile")
+        for turn in range(1, 4):
+            capture.run(lambda s: find_best_move(s, max_depth=1, time_limit=10), trap_state(), {"turn": turn})
+            time.sleep(0.01)
+        remaining = sorted(os.listdir(tmp))
+        assert len(remaining) == 2
+        assert [load_capture(os.path.join(tmp, name))[1]["turn"] for name in remaining] == [2, 3]
+        stats = pstats.Stats(os.path.join(tmp, remaining[-1], "profile.prof"))
+        assert stats.total_calls > 0
+
+
+def test_player_captures_slow_turns():
+    """AIPlayer routes its searches through the capture when enabled."""
+    with tempfile.TemporaryDirectory() as tmp:
+        player = AIPlayer(max_depth=1, time_limit=1, slow_turn_dir=tmp, slow_turn_threshold=0.0)
+        player.game_state = trap_state()
+        player.compute_move()
+        player.close()
+        [path] = player.slow_turns.captured
+        _, info = load_capture(path)
+        assert info["turn"] == 1 and info["max_depth"] == 1
+
+        # Default threshold: just above the search time limit
+        player = AIPlayer(max_depth=1, time_limit=0.5, slow_turn_dir=tmp)
+        player.close()
+        assert player.slow_turns.threshold == 0.5 * THRESHOLD_FACTOR
+
+        # The command-line options reach the capture, cProfile mode included
+        player = player_from_args(Namespace(engine="alphabeta", depth=1, time_limit=0.5, pooled=False,
+                                            slow_turn_dir=tmp, slow_turn_profiler="cprofile"))
+        player.close()
+        assert player.slow_turns.profiler == "cprofile"
+
+
+if __name__ == "__main__":
+    test_only_slow_turns_are_kept()
+    test_rotation_and_cprofile()
+    test_player_captures_slow_turns()
+    print("All slow-turn capture tests passed! ✓")
@@ -0,0 +1,85 @@
+"""Tests for map symmetry detection and canonical positions."""
+import sys
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import (GameState, Species, FLIP_X, FLIP_Y, IDENTITY, TRANSFORMS, TRANSPOSE,
+                        inverse_transform, transform_cell)
+from endgame import EndgameSolver
+from maps import generate_map, load_map
+from move_generator import generate_all_moves
+from opening_book import canonical_key, opening_state, swap_sides
+
+
+def test_transforms_invert():
+    for rows, cols in ((4, 4), (3, 5)):
+        for transform in TRANSFORMS:
+            if transform & TRANSPOSE and rows != cols:
+                continue
+            cells = {transform_cell(transform, x, y, rows, cols) for x in range(rows) for y in range(cols)}
+            assert len(cells) == rows * cols
+            back = inverse_transform(transform)
+            for x in range(rows):
+                for y in range(cols):
+                    assert transform_cell(back, *transform_cell(transform, x, y, rows, cols), rows, cols) == (x, y)
+
+
+def test_detect_symmetries():
+    """Found once per map from the human layout, at MAP time."""
+    assert opening_state(load_map("thetrap.xml")).symmetries == (IDENTITY, FLIP_X)
+    assert opening_state(load_map("testmap2.xml")).symmetries == (IDENTITY, FLIP_X | FLIP_Y)
+    # A generated square map with a diagonal symmetry
+    seed = next(seed for seed in range(50) if TRANSPOSE in
+                opening_state(generate_map(9, 9, humans=8, monsters=5, seed=seed)).symmetries)
+    state = opening_state(generate_map(9, 9, humans=8, monsters=5, seed=seed))
+    assert state.clone().symmetries == state.symmetries
+    assert GameState.from_dict(state.to_dict()).symmetries == state.symmetries
+    assert GameState(5, 5).symmetries == (IDENTITY,)
+
+
+def test_canonical_positions_and_moves():
+    """Mirrored positions share a canonical form; moves map there and back."""
+    state = opening_state(load_map("testmap2.xml"))
+    mirrored = state.transformed(FLIP_X | FLIP_Y)
+    mirrored.symmetries = state.symmetries
+    assert mirrored.relative_layout() != state.relative_layout()
+    assert mirrored.canonical()[0].relative_layout() == state.canonical()[0].relative_layout()
+    assert canonical_key(mirrored)[0] == canonical_key(state)[0]
+
+    # thetrap: the vampires' opening is the mirror of the werewolves'
+    trap = opening_state(load_map("thetrap.xml"))
+    assert canonical_key(swap_sides(trap))[0] == canonical_key(trap)[0]
+
+    canonical, transform = mirrored.canonical()
+    back = inverse_transform(transform)
+    for combo in generate_all_moves(mirrored):
+        move = combo[0]
+        there = move.transformed(transform, mirrored.rows, mirrored.cols)
+        assert canonical.board[there.x_from][there.y_from].get_count(canonical.our_species) >= move.count
+        assert there.transformed(back, canonical.rows, canonical.cols) == move
+
+
+def test_endgame_memo_is_canonical():
+    """A position invariant under a symmetry is proven with half the positions."""
+    def position(symmetric):
+        state = GameState(3, 5)
+        state.our_species, state.opponent_species = Species.VAMPIRE, Species.WEREWOLF
+        state.board[0][4].vampires = state.board[2][4].vampires = 6
+        state.board[0][0].werewolves = state.board[2][0].werewolves = 3
+        state.symmetries = (IDENTITY, FLIP_X) if symmetric else (IDENTITY,)
+        return state
+
+    plain = EndgameSolver(max_plies=3).solve(position(False), time_limit=60)
+    canonical = EndgameSolver(max_plies=3).solve(position(True), time_limit=60)
+    assert canonical.result == plain.result
+    assert canonical.positions * 2 == plain.positions
+
+
+if __name__ == "__main__":
+    test_transforms_invert()
+    test_detect_symmetries()
+    test_canonical_positions_and_moves()
+    test_endgame_memo_is_canonical()
+    print("All symmetry tests passed! ✓")
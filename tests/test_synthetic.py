@@ -0,0 +1,78 @@
+"""Tests for the synthetic map and position generator."""
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from game_state import Species
+from alphabeta import find_best_move
+from maps import parse_map
+from move_generator import simulate_battle
+from synthetic import SPLIT_PATTERNS, split_counts, synthetic_map, random_playout, generate_state
+
+
+def test_split_counts():
+    rng = random.Random(0)
+    assert split_counts(10, 3, "even", rng) == [4, 3, 3]
+    assert split_counts(10, 3, "skewed", rng) == [5, 3, 2]
+    assert split_counts(4, 4, "skewed", rng) == [1, 1, 1, 1]
+    for pattern in SPLIT_PATTERNS:
+        for groups in range(1, 8):
+            counts = split_counts(7, groups, pattern, rng)
+            assert sum(counts) == 7 and len(counts) == groups and min(counts) >= 1
+    with pytest.raises(ValueError):
+        split_counts(3, 4, "even", rng)
+    with pytest.raises(ValueError):
+        split_counts(3, 2, "zigzag", rng)
+
+
+def test_synthetic_map():
+    """Seeded, sized as asked, and readable back from its XML."""
+    game_map = synthetic_map(30, 40, human_density=0.02, groups=3, opponent_groups=2, army=20,
+                             split="random", seed=7)
+    assert game_map.to_xml() == synthetic_map(30, 40, human_density=0.02, groups=3, opponent_groups=2,
+                                              army=20, split="random", seed=7).to_xml()
+    assert (game_map.rows, game_map.cols) == (30, 40)
+    assert len(game_map.groups(Species.HUMAN)) == 24
+    assert len(game_map.groups(Species.WEREWOLF)) == 3 and len(game_map.groups(Species.VAMPIRE)) == 2
+    assert sum(g[2] for g in game_map.groups(Species.WEREWOLF)) == sum(g[2] for g in game_map.groups(Species.VAMPIRE)) == 20
+    assert parse_map(game_map.to_xml().encode()).cells == game_map.cells
+    with pytest.raises(ValueError):
+        synthetic_map(2, 2, human_density=1.0)
+
+
+def test_playout_and_state():
+    """Mid-game positions are reproducible, keep both sides alive and are seen by the side to move."""
+    start = synthetic_map(12, 12, groups=2, seed=3)
+    position, to_move = random_playout(start, 15, seed=3)
+    again, _ = random_playout(start, 15, seed=3)
+    assert position.cells == again.cells and position.cells != start.cells
+    assert to_move == 1
+    assert position.groups(Species.WEREWOLF) and position.groups(Species.VAMPIRE)
+    # Battles draw from the seeded generator, not the random module
+    assert [simulate_battle(7, 5, True, random.Random(seed)) for seed in range(20)] == \
+        [simulate_battle(7, 5, True, random.Random(seed)) for seed in range(20)]
+
+    state = generate_state(12, 12, playout=15, seed=3, groups=2)
+    assert state.our_species == Species.VAMPIRE
+    assert sum(g[2] for g in state.get_our_groups()) == sum(g[2] for g in position.groups(Species.VAMPIRE))
+    assert generate_state(12, 12, playout=15, seed=3, groups=2, side=0).our_species == Species.WEREWOLF
+
+
+def test_find_best_move_reports_stats():
+    state = generate_state(10, 10, seed=1, groups=2)
+    stats = {}
+    moves = find_best_move(state, max_depth=2, time_limit=5, stats=stats)
+    assert moves and stats["depth"] == 2 and stats["nodes"] > 0
+
+
+if __name__ == "__main__":
+    test_split_counts()
+    test_synthetic_map()
+    test_playout_and_state()
+    test_find_best_move_reports_stats()
+    print("All synthetic generator tests passed! ✓")
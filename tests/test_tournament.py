@@ -0,0 +1,84 @@
+"""Tests for the self-play tournament runner."""
+import io
+import sys
+import csv
+import contextlib
+from pathlib import Path
+
+# Add ai directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "ai"))
+
+from maps import MAPS_DIR
+from tournament import (EngineConfig, schedule, run_tournament, build_report, write_csv,
+                        elo_estimate, percentile)
+
+
+def test_engine_config_parse():
+    """Specs set typed options and reject unknown ones."""
+    config = EngineConfig.parse("fast:depth=2,time_limit=0.05,evaluation=material,pooled=true,planner=1")
+    assert (config.name, config.depth, config.time_limit) == ("fast", 2, 0.05)
+    assert config.evaluation == "material" and config.pooled and config.planner
+    assert EngineConfig.parse("base").to_dict() == EngineConfig("base").to_dict()
+    try:
+        EngineConfig.parse("bad:width=3")
+        assert False, "unknown option should raise"
+    except ValueError:
+        pass
+
+
+def test_elo_and_percentiles():
+    """Elo is antisymmetric, 75% is about +191, and the CI contains the estimate."""
+    even = elo_estimate(5, 0, 5)
+    assert abs(even["elo"]) < 1e-9
+    strong = elo_estimate(15, 0, 5)
+    assert abs(strong["elo"] - 190.85) < 0.1
+    assert strong["ci_low"] < strong["elo"] < strong["ci_high"]
+    weak = elo_estimate(5, 0, 15)
+    assert abs(weak["elo"] + strong["elo"]) < 1e-9
+    # A perfect score stays finite
+    assert elo_estimate(10, 0, 0)["elo"] > 0
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 99) == 5
+    assert percentile([], 50) is None
+
+
+def test_schedule_alternates_sides():
+    """Each pairing plays both sides on every map."""
+    configs = [EngineConfig("a"), EngineConfig("b"), EngineConfig("c")]
+    jobs = schedule(configs, [Path("m1.xml"), Path("m2.xml")], games_per_pair=2)
+    assert len(jobs) == 3 * 2 * 2
+    ab = [(job[2]["name"], job[3]["name"]) for job in jobs if {job[2]["name"], job[3]["name"]} == {"a", "b"}]
+    assert ab.count(("a", "b")) == ab.count(("b", "a")) == 2
+    assert len({job[4] for job in jobs}) == len(jobs)
+
+
+def test_parallel_tournament_report(tmp_path=None):
+    """A small two-worker tournament produces a consistent report."""
+    configs = [EngineConfig("d1", depth=1, time_limit=0.02), EngineConfig("d2", depth=2, time_limit=0.02)]
+    with contextlib.redirect_stdout(io.StringIO()):
+        games = run_tournament(configs, [MAPS_DIR / "thetrap.xml"], games_per_pair=2,
+                               workers=2, max_rounds=3, seed=7)
+    assert [game["game"] for game in games] == [0, 1]
+    report = build_report(configs, games)
+    for name in ("d1", "d2"):
+        engine = report["engines"][name]
+        assert engine["games"] == 2
+        assert engine["wins"] + engine["draws"] + engine["losses"] == 2
+        assert engine["moves"] > 0
+        assert engine["latency_ms"]["p50"] <= engine["latency_ms"]["p99"]
+    assert report["engines"]["d1"]["wins"] == report["engines"]["d2"]["losses"]
+    assert len(report["pairs"]) == 1
+
+    out = Path(tmp_path or "/tmp") / "tournament_report.csv"
+    write_csv(report, out)
+    with open(out) as f:
+        rows = list(csv.DictReader(f))
+    assert [row["name"] for row in rows] == ["d1", "d2"]
+
+
+if __name__ == "__main__":
+    test_engine_config_parse()
+    test_elo_and_percentiles()
+    test_schedule_alternates_sides()
+    test_parallel_tournament_report()
+    print("All tournament tests passed! ✓")